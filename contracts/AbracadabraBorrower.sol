@@ -10,6 +10,7 @@ import {
     Address
 } from "@openzeppelin/contracts/token/ERC20/SafeERC20.sol";
 import "@openzeppelin/contracts/math/Math.sol";
+import "@openzeppelin/contracts/utils/SafeCast.sol";
 import "../libraries/BoringMath.sol";
 import "../libraries/BoringRebase.sol";
 import "./RouterStrategy.sol";
@@ -19,6 +20,7 @@ interface VaultAPI is IERC20 {
     function pricePerShare() external view returns (uint256);
     function token() external view returns (address);
     function deposit() external;
+    function deposit(uint256 amount) external;
     function withdraw(uint256 amount) external;
 }
 
@@ -86,12 +88,11 @@ interface IRouter {
         returns (uint256[] memory amounts);
 
     function swapExactETHForTokens(
-        uint256 amountIn,
         uint256 amountOutMin,
         address[] calldata path,
         address to,
         uint256 deadline
-    ) external returns (uint256[] memory amounts);
+    ) external payable returns (uint256[] memory amounts);
 
     function swapExactTokensForETH(
         uint256 amountIn,
@@ -107,6 +108,7 @@ interface IAbracadabra {
     // TODO: add view for bentoBox(), masterContract()
     function bentoBox() external returns (IBentoBoxV1);
     function masterContract() external returns (address);
+    function magicInternetMoney() external view returns (IERC20);
     function addCollateral(address to, bool skim, uint256 share) external;
     function removeCollateral(address to, uint256 share) external;
     function borrow(address to, uint256 amount) external returns (uint256 part, uint256 share);
@@ -117,9 +119,15 @@ interface IAbracadabra {
     function totalBorrow() external view returns (Rebase memory totals);
     function collateral() external view returns (address);
     function accrue() external;
+    function cook(
+        uint8[] calldata actions,
+        uint256[] calldata values,
+        bytes[] calldata datas
+    ) external payable returns (uint256 value1, uint256 value2);
 }
 
 interface IWETH is IERC20 {
+     function deposit() external payable;
      function withdraw(uint wad) external;
 }
 
@@ -128,6 +136,18 @@ interface ICurveFI {
     function exchange_underlying(int128 i, int128 j, uint256 dx, uint256 min_dy) external returns (uint256);
     function coins(uint256 i) external returns (address);
     function remove_liquidity_one_coin(uint256 _token_amount, int128 i, uint256 _min_amount) external returns (uint256);
+    function get_dy_underlying(int128 i, int128 j, uint256 dx) external view returns (uint256);
+}
+
+// Moves the collateral of one cauldron market to and from ETH for the borrower,
+// which does the ETH <> MIM leg itself. Adapters keep no state besides their
+// constructor arguments, so one deployment serves every clone of a market.
+interface ICollateralAdapter {
+    function collateral() external view returns (address);
+    // pulls `_amount` collateral from the caller and sends it the ETH it was worth
+    function unwrap(uint256 _amount) external returns (uint256 _ethOut);
+    // turns msg.value into collateral sent to the caller
+    function wrap() external payable returns (uint256 _collateralOut);
 }
 
 interface IFlashBorrower {
@@ -146,63 +166,133 @@ interface IFlashBorrower {
     ) external;
 }
 
+// External protocols used by the exchangers. Kept injectable so the borrower
+// can be wired to local stand-ins instead of the mainnet deployments.
+struct ExchangeAddresses {
+    address weth;
+    address dai;
+    address uniswapRouter;
+    address crvMIM;
+}
+
+// ETH <> MIM swap route: a UniswapV2-style router leg between WETH and `stable`,
+// then the Curve MIM pool leg between `stable` and MIM.
+struct SwapRoute {
+    address router;
+    address stable;
+    int128 mimPoolIndex; // underlying index of `stable` in the Curve MIM pool
+}
+
 contract AbracadabraBorrower is IFlashBorrower {
     using SafeERC20 for IERC20;
     using Address for address;
     using SafeMath for uint256;
+    using SafeCast for uint256;
 
+    // clone configuration, packed next to the address it is read with
     IAbracadabra private abracadabra;
+    uint96 internal minMIMToSell;
     IBentoBoxV1 private bentoBox;
-    uint256 public targetCollatRate;
-    uint256 private maxCollatRate;
-    uint256 internal minMIMToSell;
-    bool private underlying_is_lp;
+    uint32 public targetCollatRate;
+    uint32 internal maxCollatRate;
+    // c-rate band around targetCollatRate inside which the position is not rebalanced
+    uint32 public collatRateBandUp;
     IERC20 private collateral;
-    VaultAPI internal collateralAsVault;
+    uint32 public collatRateBandDown;
+    // max shortfall of a swap against the cauldron oracle, in bps
+    uint16 public swapSlippage;
+    // collateral <> ETH leg of the exchangers
+    ICollateralAdapter public collateralAdapter;
 
     uint256 private constant C_RATE_PRECISION = 1e5;
     uint256 private constant EXCHANGE_RATE_PRECISION = 1e18;
     uint256 internal constant DUST_THRESHOLD = 10_000;
 
-    IWETH public constant weth = IWETH(0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2);
-    IERC20 private constant dai = IERC20(0x6B175474E89094C44Da98b954EedeAC495271d0F);
-    IERC20 internal constant mim = IERC20(0x99D8a9C45b2ecA8864373A26D1459e3Dff1e17F3);
-    IRouter public constant uniswapRouter =
-        IRouter(0xd9e1cE17f2641f24aE83637ab66a2cca9C378B9F);
-    ICurveFI private constant crvMIM = ICurveFI(0x5a6A4D54456819380173272A5E8E9B9904BdF41B);
+    // Cauldron cook actions
+    uint8 private constant ACTION_REPAY = 2;
+    uint8 private constant ACTION_REMOVE_COLLATERAL = 4;
+    uint8 private constant ACTION_BORROW = 5;
+    uint8 private constant ACTION_GET_REPAY_SHARE = 6;
+    uint8 private constant ACTION_ADD_COLLATERAL = 10;
+    uint8 private constant ACTION_BENTO_DEPOSIT = 20;
+    uint8 private constant ACTION_BENTO_WITHDRAW = 21;
+    int256 private constant USE_VALUE1 = -1;
+    int256 private constant USE_VALUE2 = -2;
+    // BentoBox flash loan fee
+    uint256 private constant FLASH_LOAN_FEE = 50;
+    uint256 private constant FLASH_LOAN_FEE_PRECISION = 1e5;
+    // MIM lost to rounding when repaying through a BentoBox share
+    uint256 private constant REPAY_ROUNDING = 2;
+
+    IWETH public weth;
+    IERC20 private dai;
+    IERC20 internal mim;
+    IRouter public uniswapRouter;
+    ICurveFI private crvMIM;
+
+    SwapRoute[] public swapRoutes;
+
+    uint256 private constant MAX_BPS = 10_000;
+
+    // Cauldron and BentoBox state behind every position computation, read once per call
+    struct CauldronPosition {
+        uint256 exchangeRate;
+        uint256 borrowPart;
+        uint256 collateralShare;
+        Rebase totalBorrow;
+        Rebase collateralTotals;
+    }
+
+    enum RebalanceAction {Park, Lever, Deleverage}
 
-    ICurveFI private constant crvSTETH = ICurveFI(0xDC24316b9AE028F1497c275EB9192a3Ea0f67022);
+    event Rebalanced(RebalanceAction action, uint256 collatRate);
 
+    // settings a migration carries over to the new strategy, see borrowerConfig()
+    struct BorrowerConfig {
+        address abracadabra;
+        uint256 maxCollatRate;
+        uint256 targetCollatRate;
+        uint256 collatRateBandUp;
+        uint256 collatRateBandDown;
+        uint256 swapSlippage;
+        uint256 minMIMToSell;
+        address collateralAdapter;
+    }
+
+    // what a deleverage repays and takes out of the cauldron
+    struct DeleveragePlan {
+        uint256 part;
+        uint256 mimToRepay;
+        uint256 collateralShare;
+    }
 
-    function _initializeAbracadabraBorrower(address _abracadabra, uint256 _maxCollatRate, uint256 _targetCollatRate, bool _underlying_is_lp)
+    function _initializeAbracadabraBorrower(address _abracadabra, uint256 _maxCollatRate, uint256 _targetCollatRate, address _collateralAdapter, ExchangeAddresses memory _exchangeAddresses)
         internal
     {
         abracadabra = IAbracadabra(_abracadabra);
         bentoBox = IBentoBoxV1(abracadabra.bentoBox());
+        mim = abracadabra.magicInternetMoney();
+
+        weth = IWETH(_exchangeAddresses.weth);
+        dai = IERC20(_exchangeAddresses.dai);
+        uniswapRouter = IRouter(_exchangeAddresses.uniswapRouter);
+        crvMIM = ICurveFI(_exchangeAddresses.crvMIM);
         // TODO: maxCollatRate = abracadabra.COLLATERIZATION_RATE(); instead of initializing this yourself. Can be removed from constructor
-        maxCollatRate = _maxCollatRate;
-        // TODO: Should add a require(targetCollatRate < maxCollatRate);
+        maxCollatRate = _maxCollatRate.toUint32();
         // TODO: Also recommend adding an additional param
-        targetCollatRate = _targetCollatRate;
-        require(targetCollatRate < maxCollatRate);
+        _setCollatRates(_targetCollatRate, 2_500, 2_500);
         collateral = IERC20(abracadabra.collateral());
-        collateralAsVault = VaultAPI(address(collateral));
-
-        underlying_is_lp = _underlying_is_lp;
+        _setCollateralAdapter(_collateralAdapter);
 
-
-        minMIMToSell = 500*(10**18);
+        minMIMToSell = uint96(500*(10**18));
         bentoBox.setMasterContractApproval(address(this), abracadabra.masterContract(), true, 0,0,0);
 
         collateral.safeApprove(address(bentoBox), type(uint256).max);
         mim.safeApprove(address(bentoBox), type(uint256).max);
-        dai.safeApprove(address(uniswapRouter), type(uint256).max);
         mim.safeApprove(address(crvMIM), type(uint256).max);
-        if(underlying_is_lp) {
-            IERC20 lPtoken = IERC20(collateralAsVault.token());
-            lPtoken.safeApprove(address(collateralAsVault), uint256(-1));
-        }
 
+        _setSwapSlippage(100);
+        _addSwapRoute(SwapRoute(address(uniswapRouter), address(dai), 1));
     }
 
     function onFlashLoan(
@@ -212,101 +302,308 @@ contract AbracadabraBorrower is IFlashBorrower {
         uint256 fee,
         bytes calldata data
     ) external override {
-        repayMIM(amount);
-        uint256 collateralBalance = balanceOfCollateral();
-        uint256 exchangeRate = abracadabra.exchangeRate();
-        uint256 neededCollateral = mimToCollateral(amount.add(fee));
+        require(msg.sender == address(bentoBox) && sender == address(this));
+        _cookRepay(abi.decode(data, (DeleveragePlan)));
 
-        _exchangeCollateralToMIM(neededCollateral);
+        // the loan only covered the shortfall, sell freed collateral to pay it back
+        _exchangeCollateralToMIM(_collateralToRepayLoan(amount.add(fee)));
 
         mim.safeTransfer(msg.sender, amount.add(fee));
     }
 
     /*********************** Borrow and Repay Functions ***********************/
-    function repayMIM(uint256 _amountToRepay)
-        internal {
-        abracadabra.accrue();//need to compute pending interest
-        Rebase memory _totalBorrow = abracadabra.totalBorrow();
-        uint256 owed = borrowedAmount();
 
-        _amountToRepay = Math.min(_amountToRepay, owed);
+    // Repays the whole debt and takes out all the collateral in a single cook,
+    // flash loaning only the MIM the strategy does not hold.
+    function _unwind() internal {
+        if (balanceOfMIMInBentoBox() > 0) {
+            removeMIMFromBentoBox();
+        }
 
-        uint256 _amountToDepositInBB = _amountToRepay.sub(balanceOfMIMInBentoBox());
+        abracadabra.accrue();//need to compute pending interest
+        CauldronPosition memory _position = _loadPosition();
 
-        // if we don't have enough mim, we need a loan to repay
-        if(owed >= balanceOfMIM()){
-            bentoBox.flashLoan(this, address(this), mim, owed.sub(balanceOfMIM()), "");
+        DeleveragePlan memory _plan;
+        _plan.part = _position.borrowPart;
+        _plan.mimToRepay = _repayAmountOf(_position, _plan.part);
+        _plan.collateralShare = _position.collateralShare;
+        _deleverage(_plan);
+
+        if (balanceOfCollateralInBentoBox() > 0) {
+            removeCollateralFromBentoBox();
         }
+    }
 
-        _amountToDepositInBB = Math.min(_amountToDepositInBB, balanceOfMIM());
+    // Splits a collateral need between MIM held beyond the debt, which is sold,
+    // and collateral freed from the cauldron by repaying only the matching debt.
+    function _planLiquidation(uint256 _collateralNeeded, uint256 _mimAssets)
+        internal
+        returns (uint256 _mimToSell, DeleveragePlan memory _plan)
+    {
+        abracadabra.accrue();//need to compute pending interest
+        return _planLiquidationOf(_loadPosition(), _collateralNeeded, _mimAssets);
+    }
 
-        bentoBox.deposit(mim, address(this), address(this), _amountToDepositInBB, 0);
+    function _planLiquidationOf(CauldronPosition memory _position, uint256 _collateralNeeded, uint256 _mimAssets)
+        internal
+        view
+        returns (uint256 _mimToSell, DeleveragePlan memory _plan)
+    {
+        uint256 _borrowed = _borrowedAmountOf(_position);
+        if (_mimAssets > _borrowed) {
+            _mimToSell = Math.min(
+                _mimAssets.sub(_borrowed),
+                _collateralToMIM(_position.exchangeRate, _collateralNeeded)
+            );
+            uint256 _covered = _mimToCollateral(_position.exchangeRate, _mimToSell);
+            _collateralNeeded = _collateralNeeded > _covered ? _collateralNeeded.sub(_covered) : 0;
+        }
 
-        //repay receives a part, so we need to calculate the part to repay
-        uint256 part = RebaseLibrary.toBase(_totalBorrow, Math.min(_amountToRepay, balanceOfMIMInBentoBox()), true);
+        if (_collateralNeeded > 0) {
+            _plan = _planDeleverage(_position, _collateralNeeded);
+        }
+    }
 
-        abracadabra.repay(address(this), false, Math.min(part, abracadabra.userBorrowPart(address(this))));
+    // Repays just enough to keep the c-rate once `_collateralToFree` leaves the cauldron.
+    // Consumes `_position`.
+    function _planDeleverage(CauldronPosition memory _position, uint256 _collateralToFree)
+        internal
+        view
+        returns (DeleveragePlan memory _plan)
+    {
+        _plan.collateralShare = Math.min(
+            RebaseLibrary.toBase(_position.collateralTotals, _collateralToFree, true),
+            _position.collateralShare
+        );
 
-        // we need to withdraw enough to keep our c-rate
-        uint256 _collatRate = targetCollatRate == 0 ? (maxCollatRate-500):targetCollatRate;
+        if (_plan.collateralShare == _position.collateralShare) {
+            // nothing left to borrow against
+            _plan.part = _position.borrowPart;
+        } else {
+            _position.collateralShare = _position.collateralShare.sub(_plan.collateralShare);
+            uint256 _maxBorrow = _collateralAmountOf(_position).mul(_collatRateToKeep()).div(C_RATE_PRECISION);
+            uint256 _borrowed = _borrowedAmountOf(_position);
+            if (_borrowed > _maxBorrow) {
+                _plan.part = Math.min(
+                    RebaseLibrary.toBase(_position.totalBorrow, _borrowed.sub(_maxBorrow), true),
+                    _position.borrowPart
+                );
+            }
+        }
+        _plan.mimToRepay = _repayAmountOf(_position, _plan.part);
+    }
 
-        uint256 _neededCollateralAmount = borrowedAmount().div(_collatRate).mul(C_RATE_PRECISION);
-        uint256 _collateralAmount = collateralAmount();
-        uint256 amountFreeToWithdraw = (_collateralAmount >= _neededCollateralAmount) ? (_collateralAmount.sub(_neededCollateralAmount)):0;
-        uint256 collateralToWithdraw = bentoBox.toShare(collateral, mimToCollateral(amountFreeToWithdraw), true);
+    // MIM to hold for repaying `_part`, including the BentoBox share rounding
+    function _repayAmountOf(CauldronPosition memory _position, uint256 _part) internal pure returns (uint256) {
+        if (_part == 0) return 0;
+        return RebaseLibrary.toElastic(_position.totalBorrow, _part, true).add(REPAY_ROUNDING);
+    }
 
-        if(collateralToWithdraw > 0) {
-            abracadabra.removeCollateral(address(this), collateralToWithdraw);
-            bentoBox.withdraw(collateral, address(this), address(this), balanceOfCollateralInBentoBox(), 0);
+    function _deleverage(DeleveragePlan memory _plan) internal {
+        uint256 _balanceOfMIM = balanceOfMIM();
+        if (_plan.mimToRepay > _balanceOfMIM) {
+            // borrow only the shortfall, the callback repays and sells collateral for it
+            bentoBox.flashLoan(this, address(this), mim, _plan.mimToRepay.sub(_balanceOfMIM), abi.encode(_plan));
+        } else {
+            _cookRepay(_plan);
         }
     }
 
-    function borrowMIM(uint256 _amountToBorrow)
-        internal {
-        if (_amountToBorrow == 0) return;
-        // won't be able to borrow more than available supply
-        _amountToBorrow = Math.min(_amountToBorrow, bentoBox.balanceOf(mim, address(abracadabra)));
+    // grossed up so that even a sale at the slippage bound covers the loan
+    function _collateralToRepayLoan(uint256 _mimOwed) internal view returns (uint256) {
+        return mimToCollateral(_mimOwed).mul(MAX_BPS).div(MAX_BPS.sub(swapSlippage));
+    }
 
-        uint256 mimToBorrow = bentoBox.toShare(mim, _amountToBorrow, false);
+    function _flashLoanFee(uint256 _amount) internal pure returns (uint256) {
+        return _amount.mul(FLASH_LOAN_FEE).div(FLASH_LOAN_FEE_PRECISION);
+    }
 
-        abracadabra.borrow(address(this), mimToBorrow);
-        bentoBox.withdraw(mim, address(this), address(this), balanceOfMIMInBentoBox(), 0);
+    function _collatRateToKeep() internal view returns (uint256) {
+        return targetCollatRate == 0 ? (maxCollatRate-500):targetCollatRate;
     }
 
-    function borrowMIMToTargetCRate() internal {
+    // deposit, repay, remove and withdraw in a single cook
+    function _cookRepay(DeleveragePlan memory _plan) internal {
+        uint8[] memory actions = new uint8[](5);
+        bytes[] memory datas = new bytes[](5);
+        uint256 count;
+        if(_plan.part > 0) {
+            // deposit exactly the share the cauldron will pull for the part
+            actions[count] = ACTION_GET_REPAY_SHARE;
+            datas[count++] = abi.encode(int256(_plan.part));
+            actions[count] = ACTION_BENTO_DEPOSIT;
+            datas[count++] = abi.encode(mim, address(this), int256(0), USE_VALUE1);
+            actions[count] = ACTION_REPAY;
+            datas[count++] = abi.encode(int256(_plan.part), address(this), false);
+        }
+        if(_plan.collateralShare > 0) {
+            actions[count] = ACTION_REMOVE_COLLATERAL;
+            datas[count++] = abi.encode(int256(_plan.collateralShare), address(this));
+            actions[count] = ACTION_BENTO_WITHDRAW;
+            datas[count++] = abi.encode(
+                collateral,
+                address(this),
+                int256(0),
+                int256(balanceOfCollateralInBentoBox().add(_plan.collateralShare))
+            );
+        }
+        _cook(actions, datas, count);
+    }
+
+    // Only borrows when the c-rate, counting the idle collateral, leaves the band around the target.
+    // Returns the branch taken; Deleverage only parks the collateral, the caller frees MIM for _repayToCollatRate.
+    function _rebalance() internal returns (RebalanceAction _action) {
         uint256 _balanceOfCollateral = balanceOfCollateral();
-        // TODO: I think _balanceOfCollateral != shares?
-        // TODO: (uint256 amountOut, uint256 sharesOut) = bentoBox.deposit(collateral, address(this), address(this), _balanceOfCollateral, 0);
-        // TODO: abracadabra.addCollateral(address(this), false, sharesOut);
-        bentoBox.deposit(collateral, address(this), address(this), _balanceOfCollateral, 0);
-        abracadabra.addCollateral(address(this), false, _balanceOfCollateral);
+        CauldronPosition memory _position = _loadPositionWithDeposit(_balanceOfCollateral);
+        uint256 _collatRate = _collatRateOf(_position);
+
+        if (_collatRate > uint256(targetCollatRate).add(collatRateBandUp)) {
+            _action = RebalanceAction.Deleverage;
+        } else if (_collatRate.add(collatRateBandDown) < targetCollatRate) {
+            _action = RebalanceAction.Lever;
+        }
+        _addCollateralAndBorrow(_position, _balanceOfCollateral, _action == RebalanceAction.Lever);
+
+        emit Rebalanced(_action, _collatRate);
+    }
+
+    // `_position` must already account for `_collateralToAdd`, see _loadPositionWithDeposit
+    function _addCollateralAndBorrow(CauldronPosition memory _position, uint256 _collateralToAdd, bool _borrow) internal {
+        uint256 toBorrow;
+        if (_borrow) {
+            toBorrow = _borrowableOf(_position, targetCollatRate);
+            // won't be able to borrow more than available supply
+            toBorrow = Math.min(toBorrow, bentoBox.balanceOf(mim, address(abracadabra)));
+        }
+
+        // deposit, add collateral, borrow and withdraw in a single cook
+        uint8[] memory actions = new uint8[](4);
+        bytes[] memory datas = new bytes[](4);
+        uint256 count;
+        if(_collateralToAdd > 0) {
+            actions[count] = ACTION_BENTO_DEPOSIT;
+            datas[count++] = abi.encode(collateral, address(this), int256(_collateralToAdd), int256(0));
+            // the share minted by the deposit
+            actions[count] = ACTION_ADD_COLLATERAL;
+            datas[count++] = abi.encode(USE_VALUE2, address(this), false);
+        }
+        if(toBorrow > 0) {
+            actions[count] = ACTION_BORROW;
+            datas[count++] = abi.encode(int256(toBorrow), address(this));
+            // the share received from the borrow
+            actions[count] = ACTION_BENTO_WITHDRAW;
+            datas[count++] = abi.encode(mim, address(this), int256(0), USE_VALUE2);
+        }
+        _cook(actions, datas, count);
+    }
 
-        uint256 toBorrow = collateralAmount().mul(targetCollatRate).div(C_RATE_PRECISION).sub(borrowedAmount());
-        borrowMIM(toBorrow);
+    // MIM the position can still borrow before reaching `_collatRate`
+    function _borrowableOf(CauldronPosition memory _position, uint256 _collatRate) internal pure returns (uint256) {
+        uint256 _maxBorrow = _collateralAmountOf(_position).mul(_collatRate).div(C_RATE_PRECISION);
+        uint256 _borrowed = _borrowedAmountOf(_position);
+        return _maxBorrow > _borrowed ? _maxBorrow.sub(_borrowed) : 0;
+    }
+
+    // MIM the position owes beyond what `_collatRate` allows
+    function _excessDebtOf(CauldronPosition memory _position, uint256 _collatRate) internal pure returns (uint256) {
+        uint256 _maxBorrow = _collateralAmountOf(_position).mul(_collatRate).div(C_RATE_PRECISION);
+        uint256 _borrowed = _borrowedAmountOf(_position);
+        return _borrowed > _maxBorrow ? _borrowed.sub(_maxBorrow) : 0;
+    }
+
+    // repays, with the MIM held, as much of the debt above `_collatRate` as it covers
+    function _repayToCollatRate(uint256 _collatRate) internal {
+        abracadabra.accrue();//need to compute pending interest
+        _cookRepay(_planRepayToCollatRate(_loadPosition(), _collatRate, balanceOfMIM()));
+    }
+
+    // the part of the debt above `_collatRate` that `_balanceOfMIM` repays, nothing when it covers no part
+    function _planRepayToCollatRate(CauldronPosition memory _position, uint256 _collatRate, uint256 _balanceOfMIM)
+        internal
+        pure
+        returns (DeleveragePlan memory _plan)
+    {
+        if (_balanceOfMIM <= REPAY_ROUNDING) return _plan;
+        uint256 _toRepay = Math.min(_excessDebtOf(_position, _collatRate), _balanceOfMIM.sub(REPAY_ROUNDING));
+
+        _plan.part = Math.min(RebaseLibrary.toBase(_position.totalBorrow, _toRepay, false), _position.borrowPart);
+        _plan.mimToRepay = _repayAmountOf(_position, _plan.part);
+    }
+
+    function _cook(uint8[] memory _actions, bytes[] memory _datas, uint256 _count) internal {
+        if (_count == 0) return;
+        // trim the unused tail of the preallocated arrays
+        assembly {
+            mstore(_actions, _count)
+            mstore(_datas, _count)
+        }
+        abracadabra.cook(_actions, new uint256[](_count), _datas);
     }
 
 
     /*********************** Views Functions ***********************/
 
+    function exchangeAddresses() public view returns (ExchangeAddresses memory) {
+        return ExchangeAddresses(
+            address(weth),
+            address(dai),
+            address(uniswapRouter),
+            address(crvMIM)
+        );
+    }
+
     function currentCRate() public view returns (uint256 _collateralRate) {
-        if (collateralAmount() == 0) return 0;
-        _collateralRate = borrowedAmount().mul(C_RATE_PRECISION).div(collateralAmount());
+        _collateralRate = _collatRateOf(_loadPosition());
     }
 
     function collateralAmount() public view returns (uint256 _collateralAmount) {
-        uint256 collateralShare = abracadabra.userCollateralShare(address(this));
-        _collateralAmount = bentoBox.toAmount(
-            collateral,
-            collateralToMIM(collateralShare),
-            false
-        );
+        _collateralAmount = _collateralAmountOf(_loadPosition());
     }
 
     function borrowedAmount() public view returns (uint256 _borrowedAmount) {
-        uint256 borrowPart = abracadabra.userBorrowPart(address(this));
+        _borrowedAmount = _borrowedAmountOf(_loadPosition());
+    }
+
+    function _loadPosition() internal view returns (CauldronPosition memory _position) {
+        _position.exchangeRate = abracadabra.exchangeRate();
+        _position.borrowPart = abracadabra.userBorrowPart(address(this));
+        _position.collateralShare = abracadabra.userCollateralShare(address(this));
+        _position.totalBorrow = abracadabra.totalBorrow();
+        _position.collateralTotals = bentoBox.totals(collateral);
+    }
+
+    // the c-rate grows as the collateral price falls, this is the fall that takes it to maxCollatRate
+    function _liquidationDistanceOf(uint256 _collatRate) internal view returns (uint256) {
+        if (_collatRate >= maxCollatRate) return 0;
+        return C_RATE_PRECISION.sub(_collatRate.mul(C_RATE_PRECISION).div(maxCollatRate));
+    }
+
+    // the position once `_collateralToAdd` is deposited, accounted the same way BentoBox does
+    function _loadPositionWithDeposit(uint256 _collateralToAdd) internal view returns (CauldronPosition memory _position) {
+        _position = _loadPosition();
+        uint256 _collateralShare = RebaseLibrary.toBase(_position.collateralTotals, _collateralToAdd, false);
+        _position.collateralTotals = RebaseLibrary.add(_position.collateralTotals, _collateralToAdd, _collateralShare);
+        _position.collateralShare = _position.collateralShare.add(_collateralShare);
+    }
+
+    function _collatRateOf(CauldronPosition memory _position) internal pure returns (uint256) {
+        uint256 _collateralAmount = _collateralAmountOf(_position);
+        if (_collateralAmount == 0) return 0;
+        return _borrowedAmountOf(_position).mul(C_RATE_PRECISION).div(_collateralAmount);
+    }
+
+    // same as bentoBox.toAmount(collateral, collateralToMIM(collateralShare), false)
+    function _collateralAmountOf(CauldronPosition memory _position) internal pure returns (uint256) {
+        return RebaseLibrary.toElastic(
+            _position.collateralTotals,
+            _collateralToMIM(_position.exchangeRate, _position.collateralShare),
+            false
+        );
+    }
 
-        Rebase memory _totalBorrow = abracadabra.totalBorrow();
-        _borrowedAmount = borrowPart.mul(_totalBorrow.elastic) / _totalBorrow.base;
+    function _borrowedAmountOf(CauldronPosition memory _position) internal pure returns (uint256) {
+        if (_position.borrowPart == 0) return 0;
+        return _position.borrowPart.mul(_position.totalBorrow.elastic) / _position.totalBorrow.base;
     }
 
     function balanceOfCollateral() private view returns (uint256) {
@@ -326,15 +623,83 @@ contract AbracadabraBorrower is IFlashBorrower {
     }
 
     function mimToCollateral(uint256 _mimAmount) internal view returns (uint256){
-        return _mimAmount.mul(abracadabra.exchangeRate()).div(EXCHANGE_RATE_PRECISION);
+        return _mimToCollateral(abracadabra.exchangeRate(), _mimAmount);
     }
 
     function collateralToMIM(uint256 _collateralAmount) internal view returns (uint256){
-        return _collateralAmount.div(abracadabra.exchangeRate()).mul(EXCHANGE_RATE_PRECISION);
+        return _collateralToMIM(abracadabra.exchangeRate(), _collateralAmount);
+    }
+
+    function _mimToCollateral(uint256 _exchangeRate, uint256 _mimAmount) internal pure returns (uint256){
+        return _mimAmount.mul(_exchangeRate).div(EXCHANGE_RATE_PRECISION);
+    }
+
+    function _collateralToMIM(uint256 _exchangeRate, uint256 _collateralAmount) internal pure returns (uint256){
+        return _collateralAmount.div(_exchangeRate).mul(EXCHANGE_RATE_PRECISION);
     }
 
     /*********************** Other Functions ***********************/
 
+    function _setTargetCollatRate(uint256 _targetCollatRate) internal {
+        _setCollatRates(_targetCollatRate, collatRateBandUp, collatRateBandDown);
+    }
+
+    function _setCollatRateBands(uint256 _bandUp, uint256 _bandDown) internal {
+        _setCollatRates(targetCollatRate, _bandUp, _bandDown);
+    }
+
+    // the band must stay below the max c-rate and above zero whichever of them moves
+    function _setCollatRates(uint256 _targetCollatRate, uint256 _bandUp, uint256 _bandDown) internal {
+        require(_targetCollatRate.add(_bandUp) < maxCollatRate);
+        require(_bandDown <= _targetCollatRate);
+        targetCollatRate = uint32(_targetCollatRate);
+        collatRateBandUp = uint32(_bandUp);
+        collatRateBandDown = uint32(_bandDown);
+    }
+
+    function _setSwapSlippage(uint256 _swapSlippage) internal {
+        require(_swapSlippage <= MAX_BPS);
+        swapSlippage = uint16(_swapSlippage);
+    }
+
+    function borrowerConfig() public view returns (BorrowerConfig memory) {
+        return BorrowerConfig(
+            address(abracadabra),
+            maxCollatRate,
+            targetCollatRate,
+            collatRateBandUp,
+            collatRateBandDown,
+            swapSlippage,
+            minMIMToSell,
+            address(collateralAdapter)
+        );
+    }
+
+    // only between strategies borrowing from the same cauldron
+    function _applyBorrowerConfig(BorrowerConfig memory _config) internal {
+        require(_config.abracadabra == address(abracadabra));
+        maxCollatRate = _config.maxCollatRate.toUint32();
+        _setCollatRates(_config.targetCollatRate, _config.collatRateBandUp, _config.collatRateBandDown);
+        _setSwapSlippage(_config.swapSlippage);
+        minMIMToSell = _toUint96(_config.minMIMToSell);
+        _setCollateralAdapter(_config.collateralAdapter);
+    }
+
+    // SafeCast.toUint96, which OpenZeppelin 3.1.0 does not have yet
+    function _toUint96(uint256 _value) internal pure returns (uint96) {
+        require(_value < 2**96, "SafeCast: value doesn't fit in 96 bits");
+        return uint96(_value);
+    }
+
+    function _setCollateralAdapter(address _collateralAdapter) internal {
+        require(ICollateralAdapter(_collateralAdapter).collateral() == address(collateral));
+        if (address(collateralAdapter) != address(0)) {
+            collateral.safeApprove(address(collateralAdapter), 0);
+        }
+        collateralAdapter = ICollateralAdapter(_collateralAdapter);
+        _approveMax(collateral, _collateralAdapter);
+    }
+
     function removeMIMFromBentoBox() internal {
         bentoBox.withdraw(mim, address(this), address(this), balanceOfMIMInBentoBox(), 0);
     }
@@ -349,45 +714,118 @@ contract AbracadabraBorrower is IFlashBorrower {
     }
 
 
+    /*********************** Swap Routes Functions ***********************/
+
+    function swapRoutesLength() external view returns (uint256) {
+        return swapRoutes.length;
+    }
+
+    function _setSwapRoutes(SwapRoute[] memory _routes) internal {
+        require(_routes.length > 0);
+        delete swapRoutes;
+        for (uint256 i = 0; i < _routes.length; i++) {
+            _addSwapRoute(_routes[i]);
+        }
+    }
+
+    function _addSwapRoute(SwapRoute memory _route) internal {
+        swapRoutes.push(_route);
+        _approveMax(IERC20(_route.stable), _route.router);
+        _approveMax(IERC20(_route.stable), address(crvMIM));
+    }
+
+    function _approveMax(IERC20 _token, address _spender) internal {
+        if (_token.allowance(address(this), _spender) == 0) {
+            _token.safeApprove(_spender, type(uint256).max);
+        }
+    }
+
+    // Output of route `_route` for `_amount` ETH to MIM, or MIM to ETH; reverts when
+    // a leg cannot quote. External so the best-route search can try it as a whole.
+    function quoteSwapRoute(uint256 _route, uint256 _amount, bool _toMIM) external view returns (uint256) {
+        SwapRoute memory route = swapRoutes[_route];
+        address[] memory path = new address[](2);
+        if (_toMIM) {
+            path[0] = address(weth);
+            path[1] = route.stable;
+            uint256 _stableOut = IRouter(route.router).getAmountsOut(_amount, path)[1];
+            return crvMIM.get_dy_underlying(route.mimPoolIndex, 0, _stableOut);
+        }
+        path[0] = route.stable;
+        path[1] = address(weth);
+        return IRouter(route.router).getAmountsOut(crvMIM.get_dy_underlying(0, route.mimPoolIndex, _amount), path)[1];
+    }
+
+    // quotes every route with view calls; routes that cannot quote are skipped
+    function _bestRouteToMIM(uint256 _ethAmount) internal view returns (uint256 _best, uint256 _bestOut) {
+        return _bestRoute(_ethAmount, true);
+    }
+
+    function _bestRouteFromMIM(uint256 _mimAmount) internal view returns (uint256 _best, uint256 _bestOut) {
+        return _bestRoute(_mimAmount, false);
+    }
+
+    function _bestRoute(uint256 _amount, bool _toMIM) internal view returns (uint256 _best, uint256 _bestOut) {
+        for (uint256 i = 0; i < swapRoutes.length; i++) {
+            try this.quoteSwapRoute(i, _amount, _toMIM) returns (uint256 out) {
+                if (out > _bestOut) {
+                    _best = i;
+                    _bestOut = out;
+                }
+            } catch {}
+        }
+    }
+
+    function _withSlippage(uint256 _amount) internal view returns (uint256) {
+        return _amount.mul(MAX_BPS.sub(swapSlippage)).div(MAX_BPS);
+    }
+
     /*********************** Exchangers Functions ***********************/
 
     function _exchangeCollateralToMIM(uint256 _collateralToExchange) internal {
-        //1. unwrap from vault
-        collateralAsVault.withdraw(_collateralToExchange);
+        uint256 _minMIMOut = _withSlippage(collateralToMIM(_collateralToExchange));
 
-        //2. optional: break lp
-        IERC20 crvSTETHLPtoken = IERC20(collateralAsVault.token());
-        crvSTETH.remove_liquidity_one_coin(crvSTETHLPtoken.balanceOf(address(this)), 0, 0);
+        //1. collateral -> eth, through the market's adapter
+        uint256 _ethAmount = collateralAdapter.unwrap(_collateralToExchange);
 
-        //3. underlying token <> mim
+        //2. eth -> stable -> mim, through the best quoted route
+        (uint256 _best, uint256 _bestOut) = _bestRouteToMIM(_ethAmount);
+        require(_bestOut > 0, "!route");
+        SwapRoute memory route = swapRoutes[_best];
 
         address[] memory path = new address[](2);
         path[0] = address(weth);
-        path[1] = address(dai);
+        path[1] = route.stable;
 
-        uniswapRouter.swapExactETHForTokens(weth.balanceOf(address(this)), 0, path, address(this), now);
+        IRouter(route.router).swapExactETHForTokens{value: _ethAmount}(0, path, address(this), now);
 
-        crvMIM.exchange_underlying(int128(1), int128(0), dai.balanceOf(address(this)), 0);
+        // the oracle bound is enforced on the last leg
+        crvMIM.exchange_underlying(route.mimPoolIndex, int128(0), IERC20(route.stable).balanceOf(address(this)), _minMIMOut);
     }
 
     receive() external payable {}
     //sell mim function
-    // due to liquidity issues, the best path is mim -> 3crv -> dai -> eth
+    // mim -> 3crv -> stable -> eth, through the best quoted route, then eth -> collateral through the adapter
     function _exchangeMIMToCollateral(uint256 _mimToExchange) internal  {
 
         if (_mimToExchange > minMIMToSell) {
+            uint256 _minCollateralOut = _withSlippage(mimToCollateral(_mimToExchange));
+            uint256 _collateralBefore = balanceOfCollateral();
+
+            (uint256 _best, uint256 _bestOut) = _bestRouteFromMIM(_mimToExchange);
+            require(_bestOut > 0, "!route");
+            SwapRoute memory route = swapRoutes[_best];
+
             address[] memory path = new address[](2);
-            path[0] = address(dai);
+            path[0] = route.stable;
             path[1] = address(weth);
 
-            crvMIM.exchange_underlying(int128(0), int128(1), _mimToExchange, 0);
-
-            uniswapRouter.swapExactTokensForETH(dai.balanceOf(address(this)), 0, path, address(this), now);
-            crvSTETH.add_liquidity{value: address(this).balance}([address(this).balance, 0], 0);
+            crvMIM.exchange_underlying(int128(0), route.mimPoolIndex, _mimToExchange, 0);
 
-            IERC20 crvSTETHLPtoken = IERC20(collateralAsVault.token());
+            IRouter(route.router).swapExactTokensForETH(IERC20(route.stable).balanceOf(address(this)), 0, path, address(this), now);
+            collateralAdapter.wrap{value: address(this).balance}();
 
-            collateralAsVault.deposit();
+            require(balanceOfCollateral().sub(_collateralBefore) >= _minCollateralOut, "!slippage");
         }
     }
 }
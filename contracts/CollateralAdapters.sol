@@ -0,0 +1,161 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity 0.6.12;
+pragma experimental ABIEncoderV2;
+
+import {
+    SafeERC20,
+    SafeMath,
+    IERC20,
+    Address
+} from "@openzeppelin/contracts/token/ERC20/SafeERC20.sol";
+import "./AbracadabraBorrower.sol";
+
+interface ICurveETHPool {
+    function add_liquidity(uint256[2] calldata amounts, uint256 min_mint_amount) external payable returns (uint256);
+    function remove_liquidity_one_coin(uint256 _token_amount, int128 i, uint256 _min_amount) external returns (uint256);
+}
+
+// Adapters leave slippage to the borrower, which checks what it gets back
+// against the cauldron oracle.
+abstract contract CollateralAdapter is ICollateralAdapter {
+    using SafeERC20 for IERC20;
+    using Address for address payable;
+
+    address public immutable override collateral;
+
+    constructor(address _collateral) public {
+        collateral = _collateral;
+    }
+
+    receive() external payable {}
+
+    function unwrap(uint256 _amount) external override returns (uint256 _ethOut) {
+        IERC20(collateral).safeTransferFrom(msg.sender, address(this), _amount);
+        _ethOut = _toETH(_amount);
+        msg.sender.sendValue(_ethOut);
+    }
+
+    function wrap() external payable override returns (uint256 _collateralOut) {
+        _collateralOut = _fromETH(msg.value);
+        IERC20(collateral).safeTransfer(msg.sender, _collateralOut);
+    }
+
+    function _toETH(uint256 _amount) internal virtual returns (uint256);
+
+    function _fromETH(uint256 _ethAmount) internal virtual returns (uint256);
+}
+
+// yVault of a Curve ETH pool LP token, coin 0 being ETH (yvcrvSTETH)
+contract CurveLPYVaultAdapter is CollateralAdapter {
+    using SafeERC20 for IERC20;
+    using SafeMath for uint256;
+
+    ICurveETHPool public immutable curvePool;
+    IERC20 private immutable lpToken;
+
+    constructor(address _yVault, address _curvePool) public CollateralAdapter(_yVault) {
+        curvePool = ICurveETHPool(_curvePool);
+        lpToken = IERC20(VaultAPI(_yVault).token());
+        IERC20(VaultAPI(_yVault).token()).safeApprove(_yVault, type(uint256).max);
+    }
+
+    function _toETH(uint256 _amount) internal override returns (uint256) {
+        uint256 _lpBefore = lpToken.balanceOf(address(this));
+        VaultAPI(collateral).withdraw(_amount);
+        uint256 _ethBefore = address(this).balance;
+        curvePool.remove_liquidity_one_coin(lpToken.balanceOf(address(this)).sub(_lpBefore), 0, 0);
+        return address(this).balance.sub(_ethBefore);
+    }
+
+    function _fromETH(uint256 _ethAmount) internal override returns (uint256) {
+        uint256 _lpBefore = lpToken.balanceOf(address(this));
+        curvePool.add_liquidity{value: _ethAmount}([_ethAmount, 0], 0);
+        uint256 _collateralBefore = IERC20(collateral).balanceOf(address(this));
+        VaultAPI(collateral).deposit(lpToken.balanceOf(address(this)).sub(_lpBefore));
+        return IERC20(collateral).balanceOf(address(this)).sub(_collateralBefore);
+    }
+}
+
+// token <> ETH on a UniswapV2-style router, WETH itself is (un)wrapped directly
+abstract contract RouterAdapter is CollateralAdapter {
+    using SafeERC20 for IERC20;
+
+    IRouter public immutable router;
+    IWETH public immutable weth;
+
+    // `_token` is what the router trades for the collateral
+    constructor(address _collateral, address _token, address _router, address _weth)
+        public
+        CollateralAdapter(_collateral)
+    {
+        router = IRouter(_router);
+        weth = IWETH(_weth);
+        if (_token != _weth) {
+            IERC20(_token).safeApprove(_router, type(uint256).max);
+        }
+    }
+
+    function _tokenToETH(address _token, uint256 _amount) internal returns (uint256) {
+        if (_token == address(weth)) {
+            weth.withdraw(_amount);
+            return _amount;
+        }
+        return router.swapExactTokensForETH(_amount, 0, _path(_token, address(weth)), address(this), now)[1];
+    }
+
+    function _ethToToken(address _token, uint256 _ethAmount) internal returns (uint256) {
+        if (_token == address(weth)) {
+            weth.deposit{value: _ethAmount}();
+            return _ethAmount;
+        }
+        return router.swapExactETHForTokens{value: _ethAmount}(0, _path(address(weth), _token), address(this), now)[1];
+    }
+
+    function _path(address _from, address _to) private pure returns (address[] memory path) {
+        path = new address[](2);
+        path[0] = _from;
+        path[1] = _to;
+    }
+}
+
+// yVault of any token the router trades against WETH
+contract YVaultAdapter is RouterAdapter {
+    using SafeERC20 for IERC20;
+    using SafeMath for uint256;
+
+    address private immutable token;
+
+    constructor(address _yVault, address _router, address _weth)
+        public
+        RouterAdapter(_yVault, VaultAPI(_yVault).token(), _router, _weth)
+    {
+        address _token = VaultAPI(_yVault).token();
+        token = _token;
+        IERC20(_token).safeApprove(_yVault, type(uint256).max);
+    }
+
+    function _toETH(uint256 _amount) internal override returns (uint256) {
+        uint256 _tokenBefore = IERC20(token).balanceOf(address(this));
+        VaultAPI(collateral).withdraw(_amount);
+        return _tokenToETH(token, IERC20(token).balanceOf(address(this)).sub(_tokenBefore));
+    }
+
+    function _fromETH(uint256 _ethAmount) internal override returns (uint256) {
+        uint256 _collateralBefore = IERC20(collateral).balanceOf(address(this));
+        VaultAPI(collateral).deposit(_ethToToken(token, _ethAmount));
+        return IERC20(collateral).balanceOf(address(this)).sub(_collateralBefore);
+    }
+}
+
+// the collateral is the token itself
+contract ERC20Adapter is RouterAdapter {
+    constructor(address _token, address _router, address _weth) public RouterAdapter(_token, _token, _router, _weth) {}
+
+    function _toETH(uint256 _amount) internal override returns (uint256) {
+        return _tokenToETH(collateral, _amount);
+    }
+
+    function _fromETH(uint256 _ethAmount) internal override returns (uint256) {
+        return _ethToToken(collateral, _ethAmount);
+    }
+}
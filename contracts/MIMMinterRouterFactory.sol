@@ -4,6 +4,20 @@ pragma experimental ABIEncoderV2;
 
 import "./MIMMinterRouterStrategy.sol";
 
+// cloneMIMMinter arguments, for the deterministic and batch entry points
+struct CloneParams {
+    address vault;
+    address strategist;
+    address rewards;
+    address keeper;
+    address yVault;
+    address abracadabra;
+    uint256 maxCollatRate;
+    uint256 targetCollatRate;
+    address collateralAdapter;
+    string strategyName;
+}
+
 contract MIMMinterRouterFactory {
     address public immutable original;
 
@@ -16,14 +30,16 @@ contract MIMMinterRouterFactory {
     address _abracadabra,
     uint256 _maxCollatRate,
     uint256 _targetCollatRate,
-    bool _underlying_is_lp) public {
+    address _collateralAdapter,
+    ExchangeAddresses memory _exchangeAddresses) public {
         MIMMinterRouterStrategy _original = new MIMMinterRouterStrategy(_vault,
         _yVault,
         _strategyName,
         _abracadabra,
         _maxCollatRate,
         _targetCollatRate,
-        _underlying_is_lp);
+        _collateralAdapter,
+        _exchangeAddresses);
         emit Deployed(address(_original));
 
         original = address(_original);
@@ -53,39 +69,112 @@ contract MIMMinterRouterFactory {
         address _abracadabra,
         uint256 _maxCollatRate,
         uint256 _targetCollatRate,
-        bool _underlying_is_lp,
+        address _collateralAdapter,
         string memory _strategyName
     ) external returns (address payable newStrategy) {
-        // Copied from https://github.com/optionality/clone-factory/blob/master/contracts/CloneFactory.sol
-        bytes20 addressBytes = bytes20(original);
+        newStrategy = _clone();
+        _initializeClone(
+            newStrategy,
+            CloneParams(
+                _vault,
+                _strategist,
+                _rewards,
+                _keeper,
+                _yVault,
+                _abracadabra,
+                _maxCollatRate,
+                _targetCollatRate,
+                _collateralAdapter,
+                _strategyName
+            ),
+            // clones reuse the exchange wiring of the original
+            MIMMinterRouterStrategy(payable(original)).exchangeAddresses()
+        );
+    }
+
+    // Same as cloneMIMMinter, at predictDeterministicAddress(msg.sender, _salt)
+    function cloneMIMMinterDeterministic(CloneParams memory _params, bytes32 _salt)
+        external
+        returns (address payable newStrategy)
+    {
+        newStrategy = _cloneDeterministic(_salt);
+        _initializeClone(newStrategy, _params, MIMMinterRouterStrategy(payable(original)).exchangeAddresses());
+    }
+
+    // One deterministic clone per params/salt pair, in a single transaction
+    function cloneMIMMinterBatch(CloneParams[] memory _params, bytes32[] memory _salts)
+        external
+        returns (address payable[] memory newStrategies)
+    {
+        require(_params.length == _salts.length);
+        ExchangeAddresses memory _exchangeAddresses = MIMMinterRouterStrategy(payable(original)).exchangeAddresses();
+
+        newStrategies = new address payable[](_params.length);
+        for (uint256 i = 0; i < _params.length; i++) {
+            newStrategies[i] = _cloneDeterministic(_salts[i]);
+            _initializeClone(newStrategies[i], _params[i], _exchangeAddresses);
+        }
+    }
+
+    // Address of the clone `_deployer` gets for `_salt`, known before it is deployed
+    function predictDeterministicAddress(address _deployer, bytes32 _salt) external view returns (address) {
+        bytes32 _hash = keccak256(
+            abi.encodePacked(bytes1(0xff), address(this), _deployerSalt(_deployer, _salt), keccak256(_cloneCode()))
+        );
+        return address(uint160(uint256(_hash)));
+    }
+
+    // EIP-1167 minimal proxy to the original, see
+    // https://github.com/optionality/clone-factory/blob/master/contracts/CloneFactory.sol
+    function _cloneCode() internal view returns (bytes memory) {
+        return abi.encodePacked(
+            hex"3d602d80600a3d3981f3363d3d373d3d3d363d73",
+            original,
+            hex"5af43d82803e903d91602b57fd5bf3"
+        );
+    }
+
+    function _clone() internal returns (address payable newStrategy) {
+        bytes memory _code = _cloneCode();
+        assembly {
+            newStrategy := create(0, add(_code, 0x20), mload(_code))
+        }
+    }
+
+    function _cloneDeterministic(bytes32 _salt) internal returns (address payable newStrategy) {
+        bytes memory _code = _cloneCode();
+        bytes32 _deployedSalt = _deployerSalt(msg.sender, _salt);
         assembly {
-            // EIP-1167 bytecode
-            let clone_code := mload(0x40)
-            mstore(
-                clone_code,
-                0x3d602d80600a3d3981f3363d3d373d3d3d363d73000000000000000000000000
-            )
-            mstore(add(clone_code, 0x14), addressBytes)
-            mstore(
-                add(clone_code, 0x28),
-                0x5af43d82803e903d91602b57fd5bf30000000000000000000000000000000000
-            )
-            newStrategy := create(0, clone_code, 0x37)
+            newStrategy := create2(0, add(_code, 0x20), mload(_code), _deployedSalt)
         }
+        // salt already used
+        require(newStrategy != address(0));
+    }
+
+    // bound to the caller, so nobody else can take a predicted address
+    function _deployerSalt(address _deployer, bytes32 _salt) internal pure returns (bytes32) {
+        return keccak256(abi.encodePacked(_deployer, _salt));
+    }
 
-        MIMMinterRouterStrategy(newStrategy).initialize(
-            _vault,
-            _strategist,
-            _rewards,
-            _keeper,
-            _yVault,
-            _abracadabra,
-            _maxCollatRate,
-            _targetCollatRate,
-            _underlying_is_lp,
-            _strategyName
+    function _initializeClone(
+        address payable _newStrategy,
+        CloneParams memory _params,
+        ExchangeAddresses memory _exchangeAddresses
+    ) internal {
+        MIMMinterRouterStrategy(_newStrategy).initialize(
+            _params.vault,
+            _params.strategist,
+            _params.rewards,
+            _params.keeper,
+            _params.yVault,
+            _params.abracadabra,
+            _params.maxCollatRate,
+            _params.targetCollatRate,
+            _params.collateralAdapter,
+            _exchangeAddresses,
+            _params.strategyName
         );
 
-        emit Cloned(newStrategy);
+        emit Cloned(_newStrategy);
     }
 }
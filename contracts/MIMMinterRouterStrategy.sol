@@ -2,7 +2,7 @@
 pragma solidity 0.6.12;
 pragma experimental ABIEncoderV2;
 
-import {BaseStrategy} from "@yearnvaults/contracts/BaseStrategy.sol";
+import {BaseStrategy, StrategyParams} from "@yearnvaults/contracts/BaseStrategy.sol";
 import {
 SafeERC20,
 SafeMath,
@@ -13,6 +13,21 @@ import "@openzeppelin/contracts/math/Math.sol";
 import "./RouterStrategy.sol";
 import "./AbracadabraBorrower.sol";
 
+// Everything a monitor needs from one strategy, read from a single cauldron snapshot
+struct PositionInfo {
+    uint256 collatRate;
+    uint256 collateralAmount; // in MIM
+    uint256 borrowedAmount; // in MIM
+    uint256 valueOfInvestment; // in MIM
+    uint256 balanceOfWant;
+    uint256 balanceOfMIM;
+    uint256 balanceOfMIMInBentoBox;
+    uint256 balanceOfCollateralInBentoBox;
+    uint256 estimatedTotalAssets;
+    uint256 exchangeRate;
+    uint256 liquidationDistance; // collateral price drop, in c-rate precision, that hits maxCollatRate
+}
+
 // TODO: Note: It seems like this contract isn't benefiting much from inheriting from RouterStrategy
 // TODO: in fact, some accounting like delegatedAssets would be better off here where it has visibility to mimToCollat()
 contract MIMMinterRouterStrategy is RouterStrategy, AbracadabraBorrower {
@@ -28,9 +43,10 @@ contract MIMMinterRouterStrategy is RouterStrategy, AbracadabraBorrower {
         address _abracadabra,
         uint256 _maxCollatRate,
         uint256 _targetCollatRate,
-        bool _underlying_is_lp
+        address _collateralAdapter,
+        ExchangeAddresses memory _exchangeAddresses
     ) public RouterStrategy(_vault, _yVault, _strategyName) {
-        _initializeMIMMinterRouter(_abracadabra, _maxCollatRate, _targetCollatRate, _underlying_is_lp);
+        _initializeMIMMinterRouter(_abracadabra, _maxCollatRate, _targetCollatRate, _collateralAdapter, _exchangeAddresses);
     }
 
     function initialize(
@@ -42,7 +58,8 @@ contract MIMMinterRouterStrategy is RouterStrategy, AbracadabraBorrower {
         address _abracadabra,
         uint256 _maxCollatRate,
         uint256 _targetCollatRate,
-        bool _underlying_is_lp,
+        address _collateralAdapter,
+        ExchangeAddresses memory _exchangeAddresses,
         string memory _strategyName
     ) public {
         super.initialize(
@@ -53,35 +70,84 @@ contract MIMMinterRouterStrategy is RouterStrategy, AbracadabraBorrower {
             _yVault,
             _strategyName
         );
-        _initializeMIMMinterRouter(_abracadabra, _maxCollatRate, _targetCollatRate, _underlying_is_lp);
+        _initializeMIMMinterRouter(_abracadabra, _maxCollatRate, _targetCollatRate, _collateralAdapter, _exchangeAddresses);
     }
 
-    function _initializeMIMMinterRouter(address _abracadabra, uint256 _maxCollatRate, uint256 _targetCollatRate, bool _underlying_is_lp)
+    function _initializeMIMMinterRouter(address _abracadabra, uint256 _maxCollatRate, uint256 _targetCollatRate, address _collateralAdapter, ExchangeAddresses memory _exchangeAddresses)
     internal
     {
-        _initializeAbracadabraBorrower(_abracadabra, _maxCollatRate, _targetCollatRate, _underlying_is_lp);
+        _initializeAbracadabraBorrower(_abracadabra, _maxCollatRate, _targetCollatRate, _collateralAdapter, _exchangeAddresses);
 
         maxLoss = 1;
     }
 
-    // TODO: Critical: Need to override tendTrigger to check for state of collateral.
-    // TODO: Debt strategies heavily rely on keepers to maintain a healthy ratio.
+    // tend() only runs adjustPosition, which rebalances the cauldron position and parks idle MIM
+    function tendTrigger(uint256 callCostInWei) public view override returns (bool) {
+        if (emergencyExit || vault.strategies(address(this)).activation == 0) return false;
+
+        CauldronPosition memory _position = _loadPositionWithDeposit(balanceOfWant());
+        uint256 _collatRate = _collatRateOf(_position);
+
+        // debt above the band is a liquidation risk, repay it whatever the gas if there is MIM to repay it with
+        if (_collatRate >= maxCollatRate || _collatRate > uint256(targetCollatRate).add(collatRateBandUp)) {
+            return _planRepayToCollatRate(_position, targetCollatRate, _mimToRepayWith(_position)).part > 0;
+        }
+        if (_collatRate.add(collatRateBandDown) >= targetCollatRate) return false;
+
+        // levering up only pays off when the MIM put to work is worth the call
+        uint256 _toBorrow = _mimToCollateral(_position.exchangeRate, _borrowableOf(_position, targetCollatRate));
+        return profitFactor.mul(ethToWant(callCostInWei)) < _toBorrow;
+    }
+
+    // the MIM adjustPosition would repay `_position` with, the loose MIM and what it withdraws from the yVault
+    function _mimToRepayWith(CauldronPosition memory _position) internal view returns (uint256 _mim) {
+        uint256 _excessDebt = _excessDebtOf(_position, targetCollatRate);
+        _mim = balanceOfMIM();
+        if (_excessDebt > _mim) {
+            (, uint256 _freed) = _planYVaultWithdrawal(_excessDebt.sub(_mim).add(DUST_THRESHOLD));
+            _mim = _mim.add(_freed);
+        }
+    }
+
+    function harvestTrigger(uint256 callCostInWei) public view override returns (bool) {
+        StrategyParams memory params = vault.strategies(address(this));
+
+        if (params.activation == 0) return false;
+        if (block.timestamp.sub(params.lastReport) < minReportDelay) return false;
+        if (block.timestamp.sub(params.lastReport) >= maxReportDelay) return true;
+        if (vault.debtOutstanding() > debtThreshold) return true;
+        // a loss is reported whatever the gas, as in BaseStrategy
+        if (estimatedTotalAssets().add(debtThreshold) < params.totalDebt) return true;
+
+        // profit is what the yVault earned beyond the MIM debt
+        CauldronPosition memory _position = _loadPosition();
+        uint256 _borrowed = _borrowedAmountOf(_position);
+        uint256 _invested = valueOfInvestment();
+        uint256 _profit = _invested > _borrowed ? _mimToCollateral(_position.exchangeRate, _invested.sub(_borrowed)) : 0;
+
+        return profitFactor.mul(ethToWant(callCostInWei)) < vault.creditAvailable().add(_profit);
+    }
 
     function adjustPosition(uint256 _debtOutstanding) internal override {
         if (emergencyExit) {
             return;
         }
 
-        // TODO: Critical: Use currentCRate().
-        // TODO: Only borrow more if overcollateralized. Return borrowed if undercollateralized, otherwise it can get liquidated
-        uint256 balance = balanceOfWant();
-        if (balance > 0) {
-            _checkAllowance(address(yVault), address(mim), balance);
-            borrowMIMToTargetCRate();
-
-            if (balanceOfMIM() > DUST_THRESHOLD) {
-                yVault.deposit();
+        // inside the band around targetCollatRate new collateral is only parked
+        if (_rebalance() == RebalanceAction.Deleverage) {
+            uint256 _excessDebt = _excessDebtOf(_loadPosition(), targetCollatRate);
+            uint256 _looseMIM = balanceOfMIM();
+            if (_excessDebt > _looseMIM) {
+                // the buffer covers interest accrued before the repay
+                _withdrawFromYVault(_excessDebt.sub(_looseMIM).add(DUST_THRESHOLD));
             }
+            _repayToCollatRate(targetCollatRate);
+        }
+
+        uint256 _balanceOfMIM = balanceOfMIM();
+        if (_balanceOfMIM > DUST_THRESHOLD) {
+            _checkAllowance(address(yVault), address(mim), _balanceOfMIM);
+            yVault.deposit();
         }
     }
 
@@ -97,14 +163,22 @@ contract MIMMinterRouterStrategy is RouterStrategy, AbracadabraBorrower {
             return (_amountNeeded, 0);
         }
 
-        //need to convert _amountNeeded from collateral to yVault token
-        uint256 _amountToWithdaw = collateralToMIM(_amountNeeded.sub(wantBal));
-        _withdrawFromYVault(_amountToWithdaw);
+        // sell MIM beyond the debt first, then free collateral repaying only its share of the debt
+        (uint256 _mimToSell, DeleveragePlan memory _plan) = _planLiquidation(
+            _amountNeeded.sub(wantBal),
+            valueOfInvestment().add(balanceOfMIM()).add(balanceOfMIMInBentoBox())
+        );
 
-        if (_amountToWithdaw > balanceOfMIM()) {
-            repayMIM(balanceOfMIM());
+        uint256 _mimNeeded = _mimToSell.add(_plan.mimToRepay);
+        uint256 _balanceOfMIM = balanceOfMIM();
+        if (_mimNeeded > _balanceOfMIM) {
+            // exact shares, yVault rounding leaves no dust shortfall
+            _withdrawFromYVault(_mimNeeded.sub(_balanceOfMIM));
         }
 
+        // flash loans whatever the yVault could not cover
+        _deleverage(_plan);
+
         uint256 bbRemainingBalance = balanceOfMIMInBentoBox();
         if (bbRemainingBalance > minMIMToSell) {
             removeMIMFromBentoBox();
@@ -122,32 +196,141 @@ contract MIMMinterRouterStrategy is RouterStrategy, AbracadabraBorrower {
         }
     }
 
+    // liquidatePosition at the oracle price, before the interest not yet accrued
+    function _previewLiquidatePosition(uint256 _amountNeeded, HarvestPreview memory _preview)
+    internal
+    view
+    override
+    returns (uint256 _liquidatedAmount, uint256 _loss)
+    {
+        uint256 wantBal = balanceOfWant();
+        if (wantBal >= _amountNeeded) {
+            return (_amountNeeded, 0);
+        }
+
+        CauldronPosition memory _position = _loadPosition();
+        uint256 _mimAssets = valueOfInvestment().add(balanceOfMIM()).add(balanceOfMIMInBentoBox());
+        (uint256 _mimToSell, DeleveragePlan memory _plan) = _planLiquidationOf(_position, _amountNeeded.sub(wantBal), _mimAssets);
+        _preview.mimToRepay = _plan.mimToRepay;
+
+        uint256 looseWant = wantBal.add(RebaseLibrary.toElastic(_position.collateralTotals, _plan.collateralShare, false));
+        if (_plan.mimToRepay > _mimAssets) {
+            // the flash loaned shortfall is paid back with freed collateral
+            uint256 _shortfall = _plan.mimToRepay.sub(_mimAssets);
+            _preview.collateralToSell = _collateralToRepayLoan(_shortfall.add(_flashLoanFee(_shortfall)));
+            looseWant = looseWant > _preview.collateralToSell ? looseWant.sub(_preview.collateralToSell) : 0;
+        } else {
+            // MIM left after the repayment is sold for collateral
+            uint256 _mimLeft = Math.min(_mimToSell.add(_plan.mimToRepay), _mimAssets).sub(_plan.mimToRepay);
+            if (_mimLeft > minMIMToSell) {
+                looseWant = looseWant.add(mimToCollateral(_mimLeft));
+            }
+        }
+
+        if (_amountNeeded > looseWant) {
+            _liquidatedAmount = looseWant;
+            _loss = _amountNeeded.sub(looseWant);
+        } else {
+            _liquidatedAmount = _amountNeeded;
+        }
+    }
+
+    // liquidateAllPositions at the oracle price, before the interest not yet accrued
+    function _previewLiquidateAllPositions(HarvestPreview memory _preview)
+    internal
+    view
+    override
+    returns (uint256 _amountFreed)
+    {
+        CauldronPosition memory _position = _loadPosition();
+        uint256 _mimAssets = valueOfInvestment().add(balanceOfMIM()).add(balanceOfMIMInBentoBox());
+        _preview.mimToRepay = _repayAmountOf(_position, _position.borrowPart);
+
+        // every share comes out, the cauldron's and the idle one in the BentoBox
+        uint256 _collateralShare = _position.collateralShare.add(balanceOfCollateralInBentoBox());
+        _amountFreed = balanceOfWant().add(RebaseLibrary.toElastic(_position.collateralTotals, _collateralShare, false));
+
+        uint256 _mimLeft;
+        if (_preview.mimToRepay > _mimAssets) {
+            // the flash loaned shortfall and its fee are paid back with freed collateral,
+            // sold with the slippage margin, the MIM over the loan is what is left
+            uint256 _owed = _preview.mimToRepay.sub(_mimAssets);
+            _owed = _owed.add(_flashLoanFee(_owed));
+            _preview.collateralToSell = _collateralToRepayLoan(_owed);
+            _amountFreed = _amountFreed > _preview.collateralToSell ? _amountFreed.sub(_preview.collateralToSell) : 0;
+            uint256 _mimOut = collateralToMIM(_preview.collateralToSell);
+            _mimLeft = _mimOut > _owed ? _mimOut.sub(_owed) : 0;
+        } else {
+            _mimLeft = _mimAssets.sub(_preview.mimToRepay);
+        }
+
+        // whatever MIM remains is sold back for collateral
+        if (_mimLeft > minMIMToSell) {
+            _amountFreed = _amountFreed.add(mimToCollateral(_mimLeft));
+        }
+    }
+
     function liquidateAllPositions()
     internal
     override
     returns (uint256 _amountFreed)
     {
-        liquidatePosition(estimatedTotalAssets());
+        _unwindPosition();
+        // the flash loan sold collateral for the shortfall only, MIM left over goes back to want
+        _exchangeMIMToCollateral(balanceOfMIM());
 
         _amountFreed = balanceOfWant();
     }
 
+    // closes the cauldron position in one transaction: every yVault share out,
+    // one repay of the whole debt, at most one collateral sale for what they did not cover
+    function _unwindPosition() internal {
+        _withdrawAllFromYVault();
+        _unwind();
+    }
+
     //event new_values(uint256 collateralAmount, uint256 borrowedAmount);
     function estimatedTotalAssets() public view override returns (uint256)  {
-        uint256 balanceOfMIMInBB = balanceOfMIMInBentoBox();
+        return _estimatedTotalAssets(_loadPosition(), valueOfInvestment(), balanceOfMIMInBentoBox(), balanceOfWant());
+    }
 
-        uint256 remainingCollateral = collateralAmount() == 0 ? 0 : collateralAmount().sub(borrowedAmount());
-        uint256 totalMIM = valueOfInvestment().add(balanceOfMIMInBB).add(remainingCollateral);
+    function _estimatedTotalAssets(
+        CauldronPosition memory _position,
+        uint256 _valueOfInvestment,
+        uint256 _balanceOfMIMInBB,
+        uint256 _balanceOfWant
+    ) internal pure returns (uint256) {
+        uint256 _collateralAmount = _collateralAmountOf(_position);
+        uint256 remainingCollateral = _collateralAmount == 0 ? 0 : _collateralAmount.sub(_borrowedAmountOf(_position));
+        uint256 totalMIM = _valueOfInvestment.add(_balanceOfMIMInBB).add(remainingCollateral);
 
         return
-        balanceOfWant().add(mimToCollateral(totalMIM));
+        _balanceOfWant.add(_mimToCollateral(_position.exchangeRate, totalMIM));
     }
 
-    function prepareMigration(address _newStrategy) internal override {
-        targetCollatRate = 0;
+    function positionInfo() external view returns (PositionInfo memory _info) {
+        CauldronPosition memory _position = _loadPosition();
+
+        _info.collatRate = _collatRateOf(_position);
+        _info.collateralAmount = _collateralAmountOf(_position);
+        _info.borrowedAmount = _borrowedAmountOf(_position);
+        _info.valueOfInvestment = valueOfInvestment();
+        _info.balanceOfWant = balanceOfWant();
+        _info.balanceOfMIM = balanceOfMIM();
+        _info.balanceOfMIMInBentoBox = balanceOfMIMInBentoBox();
+        _info.balanceOfCollateralInBentoBox = balanceOfCollateralInBentoBox();
+        _info.estimatedTotalAssets = _estimatedTotalAssets(
+            _position,
+            _info.valueOfInvestment,
+            _info.balanceOfMIMInBentoBox,
+            _info.balanceOfWant
+        );
+        _info.exchangeRate = _position.exchangeRate;
+        _info.liquidationDistance = _liquidationDistanceOf(_info.collatRate);
+    }
 
-        _withdrawFromYVault(collateralAmount());
-        repayMIM(collateralAmount());
+    function prepareMigration(address _newStrategy) internal override {
+        _unwindPosition();
 
         uint256 _balanceOfMIM = balanceOfMIM();
         if (_balanceOfMIM > 0) {
@@ -156,30 +339,49 @@ contract MIMMinterRouterStrategy is RouterStrategy, AbracadabraBorrower {
                 _balanceOfMIM
             );
         }
-        if (balanceOfMIMInBentoBox() > 0) {
-            transferAllBentoBalance(_newStrategy);
-        }
         super.prepareMigration(_newStrategy);
     }
 
-    function _ethToWant(uint256 _amount) internal view returns (uint256) {
-        address[] memory path = new address[](2);
-        path[0] = address(weth);
-        path[1] = collateralAsVault.token();
-        uint256[] memory amounts =
-        uniswapRouter.getAmountsOut(_amount, path);
+    // priced through the best ETH -> MIM route, then the cauldron oracle
+    function ethToWant(uint256 _amtInWei) public view override returns (uint256) {
+        (, uint256 _mimOut) = _bestRouteToMIM(_amtInWei);
+        return mimToCollateral(_mimOut);
+    }
+
+    /*********************** Setters Functions ***********************/
 
-        return _fromUnderlyingTokenToYVVault(amounts[amounts.length - 1]);
+    function setTargetCollateralRate(uint256 _targetCollatRate) public onlyVaultManagers {
+        _setTargetCollatRate(_targetCollatRate);
     }
 
-    function _fromUnderlyingTokenToYVVault(uint256 _amount) internal view returns (uint256) {
-        // TODO: missing return
-        _amount.mul(10 ** collateralAsVault.decimals()).div(collateralAsVault.pricePerShare());
+    function setCollateralRateBands(uint256 _bandUp, uint256 _bandDown) public onlyVaultManagers {
+        _setCollatRateBands(_bandUp, _bandDown);
     }
 
-    /*********************** Setters Functions ***********************/
+    function setSwapRoutes(SwapRoute[] memory _routes) public onlyVaultManagers {
+        _setSwapRoutes(_routes);
+    }
 
-    function setTargetCollateralRate(uint256 _targetCollatRate) public onlyVaultManagers {
-        targetCollatRate = _targetCollatRate;
+    function setSwapSlippage(uint256 _swapSlippage) public onlyVaultManagers {
+        _setSwapSlippage(_swapSlippage);
+    }
+
+    function setCollateralAdapter(address _collateralAdapter) public onlyVaultManagers {
+        _setCollateralAdapter(_collateralAdapter);
+    }
+
+    // Takes the c-rates, bands, slippage, collateral adapter, swap routes and maxLoss of the strategy being migrated from
+    function copyConfigurationFrom(address _strategy) external onlyVaultManagers {
+        MIMMinterRouterStrategy _from = MIMMinterRouterStrategy(payable(_strategy));
+        _applyBorrowerConfig(_from.borrowerConfig());
+
+        SwapRoute[] memory _routes = new SwapRoute[](_from.swapRoutesLength());
+        for (uint256 i = 0; i < _routes.length; i++) {
+            (address _router, address _stable, int128 _mimPoolIndex) = _from.swapRoutes(i);
+            _routes[i] = SwapRoute(_router, _stable, _mimPoolIndex);
+        }
+        _setSwapRoutes(_routes);
+
+        _setMaxLoss(_from.maxLoss());
     }
 }
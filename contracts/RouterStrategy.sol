@@ -21,6 +21,14 @@ interface IVault is IERC20 {
 
     function pricePerShare() external view returns (uint256);
 
+    function totalAssets() external view returns (uint256);
+
+    function lockedProfit() external view returns (uint256);
+
+    function lockedProfitDegradation() external view returns (uint256);
+
+    function lastReport() external view returns (uint256);
+
     function withdraw(
         uint256 amount,
         address account,
@@ -28,6 +36,15 @@ interface IVault is IERC20 {
     ) external returns (uint256);
 }
 
+// What the next harvest would report, see previewHarvest()
+struct HarvestPreview {
+    uint256 profit;
+    uint256 loss;
+    uint256 debtPayment;
+    uint256 mimToRepay;
+    uint256 collateralToSell;
+}
+
 contract RouterStrategy is BaseStrategy {
     using SafeERC20 for IERC20;
     using Address for address;
@@ -35,9 +52,13 @@ contract RouterStrategy is BaseStrategy {
 
     string internal strategyName;
     IVault public yVault; // TODO: Reccommended rename delegatedVault instead
-    uint256 public maxLoss;
+    uint16 public maxLoss; // in bps, packed with yVault
     bool internal isOriginal = true;
 
+    uint256 private constant MAX_LOSS_BPS = 10_000;
+    // yVault locked profit degradation precision
+    uint256 private constant DEGRADATION_COEFFICIENT = 1e18;
+
     constructor(
         address _vault,
         address _yVault,
@@ -144,7 +165,14 @@ contract RouterStrategy is BaseStrategy {
             _debtOutstanding.add(_profit)
         );
         _debtPayment = Math.min(_debtOutstanding, _amountFreed);
+        (_profit, _loss) = _netProfitAndLoss(_profit, _loss);
+    }
 
+    function _netProfitAndLoss(uint256 _profit, uint256 _loss)
+        internal
+        pure
+        returns (uint256, uint256)
+    {
         if (_loss > _profit) {
             // Example:
             // debtOutstanding 100, profit 50, _amountFreed 100, _loss 50
@@ -160,6 +188,45 @@ contract RouterStrategy is BaseStrategy {
             _profit = _profit.sub(_loss);
             _loss = 0;
         }
+        return (_profit, _loss);
+    }
+
+    // Dry run of harvest(), following BaseStrategy.harvest and prepareReturn
+    // without changing state. Meant for keepers and eth_call.
+    function previewHarvest()
+        external
+        view
+        returns (HarvestPreview memory _preview)
+    {
+        uint256 _debtOutstanding = vault.debtOutstanding();
+
+        if (emergencyExit) {
+            uint256 _amountFreed = _previewLiquidateAllPositions(_preview);
+            if (_amountFreed < _debtOutstanding) {
+                _preview.loss = _debtOutstanding.sub(_amountFreed);
+            } else if (_amountFreed > _debtOutstanding) {
+                _preview.profit = _amountFreed.sub(_debtOutstanding);
+            }
+            _preview.debtPayment = _debtOutstanding.sub(_preview.loss);
+        } else {
+            uint256 _totalDebt = vault.strategies(address(this)).totalDebt;
+            uint256 _totalAsset = estimatedTotalAssets();
+            uint256 _profit;
+            if (_totalDebt <= _totalAsset) {
+                _profit = _totalAsset.sub(_totalDebt);
+            }
+
+            (uint256 _amountFreed, uint256 _loss) =
+                _previewLiquidatePosition(
+                    _debtOutstanding.add(_profit),
+                    _preview
+                );
+            _preview.debtPayment = Math.min(_debtOutstanding, _amountFreed);
+            (_preview.profit, _preview.loss) = _netProfitAndLoss(
+                _profit,
+                _loss
+            );
+        }
     }
 
     function adjustPosition(uint256 _debtOutstanding) internal virtual override {
@@ -197,20 +264,111 @@ contract RouterStrategy is BaseStrategy {
         }
     }
 
-    function _withdrawFromYVault(uint256 _amount) internal {
-        if (_amount == 0) {
-            return;
+    // liquidatePosition without state changes, may fill in the position fields of `_preview`
+    function _previewLiquidatePosition(
+        uint256 _amountNeeded,
+        HarvestPreview memory
+    )
+        internal
+        view
+        virtual
+        returns (uint256 _liquidatedAmount, uint256 _loss)
+    {
+        uint256 balance = balanceOfWant();
+        uint256 looseWant = _amountNeeded;
+        if (balance < _amountNeeded) {
+            (, uint256 _freed) = _planYVaultWithdrawal(_amountNeeded.sub(balance));
+            looseWant = Math.min(balance.add(_freed), _amountNeeded);
+        }
+        _liquidatedAmount = looseWant;
+        _loss = _amountNeeded.sub(looseWant);
+    }
+
+    // liquidateAllPositions without state changes, may fill in the position fields of `_preview`
+    function _previewLiquidateAllPositions(HarvestPreview memory _preview)
+        internal
+        view
+        virtual
+        returns (uint256 _amountFreed)
+    {
+        (_amountFreed, ) = _previewLiquidatePosition(estimatedTotalAssets(), _preview);
+    }
+
+    function _withdrawFromYVault(uint256 _amount) internal returns (uint256) {
+        (uint256 _shares, ) = _planYVaultWithdrawal(_amount);
+        if (_shares == 0) {
+            return 0;
         }
 
+        return yVault.withdraw(_shares, address(this), maxLoss);
+    }
+
+    // Shares _withdrawFromYVault(_amount) redeems and the tokens they return
+    function previewWithdrawFromYVault(uint256 _amount)
+        external
+        view
+        returns (uint256 _shares, uint256 _freed)
+    {
+        return _planYVaultWithdrawal(_amount);
+    }
+
+    // The fewest shares worth `_amount` at the exact share value yVault.withdraw()
+    // rounds down to, capped at the balance. Beyond what the yVault holds, tokens
+    // come from its strategies, which may lose up to maxLoss of them on the way
+    // out: that part is grossed up by maxLoss, and `_freed` is before such losses.
+    function _planYVaultWithdrawal(uint256 _amount)
+        internal
+        view
+        returns (uint256 _shares, uint256 _freed)
+    {
         uint256 _balanceOfYShares = yVault.balanceOf(address(this));
-        uint256 sharesToWithdraw =
-            Math.min(_investmentTokenToYShares(_amount), _balanceOfYShares);
+        if (_amount == 0 || _balanceOfYShares == 0) {
+            return (0, 0);
+        }
 
-        if (sharesToWithdraw == 0) {
-            return;
+        uint256 _totalSupply = yVault.totalSupply();
+        uint256 _freeFunds = _yVaultFreeFunds();
+
+        uint256 _idle = IERC20(yVault.token()).balanceOf(address(yVault));
+        if (_amount > _idle && maxLoss == MAX_LOSS_BPS) {
+            _amount = uint256(-1);
+        } else if (_amount > _idle && maxLoss > 0) {
+            _amount = _idle.add(_divUp(_amount.sub(_idle).mul(MAX_LOSS_BPS), MAX_LOSS_BPS - maxLoss));
         }
 
-        yVault.withdraw(sharesToWithdraw, address(this), maxLoss);
+        if (_totalSupply == 0 || _amount >= _freeFunds) {
+            _shares = _balanceOfYShares;
+        } else {
+            // rounded up, so the shares are worth at least `_amount`
+            _shares = Math.min(_divUp(_amount.mul(_totalSupply), _freeFunds), _balanceOfYShares);
+        }
+        _freed = _totalSupply == 0 ? _shares : _shares.mul(_freeFunds).div(_totalSupply);
+    }
+
+    // totalAssets() less the profit still unlocking, what yVault shares are priced on
+    function _yVaultFreeFunds() internal view returns (uint256) {
+        uint256 _lockedFundsRatio =
+            block.timestamp.sub(yVault.lastReport()).mul(yVault.lockedProfitDegradation());
+        uint256 _lockedProfit;
+        if (_lockedFundsRatio < DEGRADATION_COEFFICIENT) {
+            _lockedProfit = yVault.lockedProfit();
+            _lockedProfit = _lockedProfit.sub(_lockedFundsRatio.mul(_lockedProfit).div(DEGRADATION_COEFFICIENT));
+        }
+        return yVault.totalAssets().sub(_lockedProfit);
+    }
+
+    function _divUp(uint256 _a, uint256 _b) private pure returns (uint256) {
+        return _a == 0 ? 0 : _a.sub(1).div(_b).add(1);
+    }
+
+    // every share, so no rounding dust is left in the yVault
+    function _withdrawAllFromYVault() internal returns (uint256) {
+        uint256 _balanceOfYShares = yVault.balanceOf(address(this));
+        if (_balanceOfYShares == 0) {
+            return 0;
+        }
+
+        return yVault.withdraw(_balanceOfYShares, address(this), maxLoss);
     }
 
     function liquidateAllPositions()
@@ -219,12 +377,7 @@ contract RouterStrategy is BaseStrategy {
         virtual
         returns (uint256 _amountFreed)
     {
-        return
-            yVault.withdraw(
-                yVault.balanceOf(address(this)),
-                address(this),
-                maxLoss
-            );
+        return _withdrawAllFromYVault();
     }
 
     function prepareMigration(address _newStrategy) internal override virtual {
@@ -255,7 +408,12 @@ contract RouterStrategy is BaseStrategy {
     }
 
     function setMaxLoss(uint256 _maxLoss) public onlyVaultManagers {
-        maxLoss = _maxLoss;
+        _setMaxLoss(_maxLoss);
+    }
+
+    function _setMaxLoss(uint256 _maxLoss) internal {
+        require(_maxLoss <= MAX_LOSS_BPS);
+        maxLoss = uint16(_maxLoss);
     }
 
     function _checkAllowance(
@@ -273,14 +431,6 @@ contract RouterStrategy is BaseStrategy {
         return want.balanceOf(address(this));
     }
 
-    function _investmentTokenToYShares(uint256 amount)
-        internal
-        view
-        returns (uint256)
-    {
-        return amount.mul(10**yVault.decimals()).div(yVault.pricePerShare());
-    }
-
     // Denominated in mim
     function valueOfInvestment() public view returns (uint256) {
         return
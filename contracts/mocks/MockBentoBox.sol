@@ -0,0 +1,139 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity 0.6.12;
+pragma experimental ABIEncoderV2;
+
+import {
+    SafeERC20,
+    SafeMath,
+    IERC20
+} from "@openzeppelin/contracts/token/ERC20/SafeERC20.sol";
+import "../../libraries/BoringRebase.sol";
+import "../AbracadabraBorrower.sol";
+
+// Minimal BentoBoxV1 stand-in: share accounting, master contract approvals
+// and flash loans. Tokens never leave the box, so elastic only moves on
+// deposit, withdraw and flash loan fees.
+contract MockBentoBox {
+    using SafeERC20 for IERC20;
+    using SafeMath for uint256;
+    using RebaseLibrary for Rebase;
+
+    uint256 private constant FLASH_LOAN_FEE = 50; // 0.05%
+    uint256 private constant FLASH_LOAN_FEE_PRECISION = 1e5;
+
+    mapping(IERC20 => Rebase) internal _totals;
+    mapping(IERC20 => mapping(address => uint256)) public balanceOf;
+    mapping(address => address) public masterContractOf;
+    mapping(address => mapping(address => bool)) public masterContractApproved;
+
+    modifier allowed(address from) {
+        if (from != msg.sender && from != address(this)) {
+            address masterContract = masterContractOf[msg.sender];
+            require(masterContract != address(0), "BentoBox: no masterContract");
+            require(masterContractApproved[masterContract][from], "BentoBox: Transfer not approved");
+        }
+        _;
+    }
+
+    function totals(IERC20 token) external view returns (Rebase memory) {
+        return _totals[token];
+    }
+
+    function registerProtocol() external {
+        masterContractOf[msg.sender] = msg.sender;
+    }
+
+    function setMasterContractApproval(
+        address user,
+        address masterContract,
+        bool approved,
+        uint8,
+        bytes32,
+        bytes32
+    ) external {
+        require(user == msg.sender, "BentoBox: user not sender");
+        masterContractApproved[masterContract][user] = approved;
+    }
+
+    function toShare(IERC20 token, uint256 amount, bool roundUp) external view returns (uint256 share) {
+        share = _totals[token].toBase(amount, roundUp);
+    }
+
+    function toAmount(IERC20 token, uint256 share, bool roundUp) external view returns (uint256 amount) {
+        amount = _totals[token].toElastic(share, roundUp);
+    }
+
+    function deposit(
+        IERC20 token,
+        address from,
+        address to,
+        uint256 amount,
+        uint256 share
+    ) external payable allowed(from) returns (uint256 amountOut, uint256 shareOut) {
+        require(to != address(0), "BentoBox: to not set");
+        Rebase memory total = _totals[token];
+        if (share == 0) {
+            share = total.toBase(amount, false);
+        } else {
+            amount = total.toElastic(share, true);
+        }
+
+        balanceOf[token][to] = balanceOf[token][to].add(share);
+        _totals[token] = total.add(amount, share);
+        token.safeTransferFrom(from, address(this), amount);
+
+        amountOut = amount;
+        shareOut = share;
+    }
+
+    function withdraw(
+        IERC20 token,
+        address from,
+        address to,
+        uint256 amount,
+        uint256 share
+    ) external allowed(from) returns (uint256 amountOut, uint256 shareOut) {
+        require(to != address(0), "BentoBox: to not set");
+        Rebase memory total = _totals[token];
+        if (share == 0) {
+            share = total.toBase(amount, true);
+        } else {
+            amount = total.toElastic(share, false);
+        }
+
+        balanceOf[token][from] = balanceOf[token][from].sub(share);
+        _totals[token] = total.sub(amount, share);
+        token.safeTransfer(to, amount);
+
+        amountOut = amount;
+        shareOut = share;
+    }
+
+    function transfer(
+        IERC20 token,
+        address from,
+        address to,
+        uint256 share
+    ) external allowed(from) {
+        require(to != address(0), "BentoBox: to not set");
+        balanceOf[token][from] = balanceOf[token][from].sub(share);
+        balanceOf[token][to] = balanceOf[token][to].add(share);
+    }
+
+    function flashLoan(
+        IFlashBorrower borrower,
+        address receiver,
+        IERC20 token,
+        uint256 amount,
+        bytes calldata data
+    ) external {
+        uint256 fee = amount.mul(FLASH_LOAN_FEE) / FLASH_LOAN_FEE_PRECISION;
+        token.safeTransfer(receiver, amount);
+
+        borrower.onFlashLoan(msg.sender, token, amount, fee, data);
+
+        Rebase memory total = _totals[token];
+        require(token.balanceOf(address(this)) >= uint256(total.elastic).add(fee), "BentoBox: Wrong amount");
+        _totals[token].addElastic(fee);
+    }
+}
@@ -0,0 +1,18 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity 0.6.12;
+pragma experimental ABIEncoderV2;
+
+import "../AbracadabraBorrower.sol";
+
+// Strategy stand-in for copyConfigurationFrom, its borrowerConfig() is whatever was set.
+contract MockBorrowerConfig {
+    AbracadabraBorrower.BorrowerConfig internal _config;
+
+    function setBorrowerConfig(AbracadabraBorrower.BorrowerConfig memory _newConfig) external {
+        _config = _newConfig;
+    }
+
+    function borrowerConfig() external view returns (AbracadabraBorrower.BorrowerConfig memory) {
+        return _config;
+    }
+}
@@ -0,0 +1,255 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity 0.6.12;
+pragma experimental ABIEncoderV2;
+
+import {SafeMath, IERC20} from "@openzeppelin/contracts/token/ERC20/SafeERC20.sol";
+import "../../libraries/BoringMath.sol";
+import "../../libraries/BoringRebase.sol";
+import "../AbracadabraBorrower.sol";
+import "./MockBentoBox.sol";
+
+// Cauldron V2 stand-in. Keeps the same accounting (collateral shares, borrow
+// parts over a Rebase, opening fee, interest accrual and solvency checks)
+// with a settable exchange rate instead of an oracle.
+contract MockCauldron {
+    using SafeMath for uint256;
+    using BoringMath for uint256;
+    using RebaseLibrary for Rebase;
+
+    uint256 private constant EXCHANGE_RATE_PRECISION = 1e18;
+    uint256 private constant COLLATERIZATION_RATE_PRECISION = 1e5;
+    uint256 private constant BORROW_OPENING_FEE_PRECISION = 1e5;
+
+    // cook action codes, as in CauldronV2
+    uint8 internal constant ACTION_REPAY = 2;
+    uint8 internal constant ACTION_REMOVE_COLLATERAL = 4;
+    uint8 internal constant ACTION_BORROW = 5;
+    uint8 internal constant ACTION_GET_REPAY_SHARE = 6;
+    uint8 internal constant ACTION_GET_REPAY_PART = 7;
+    uint8 internal constant ACTION_ACCRUE = 8;
+    uint8 internal constant ACTION_ADD_COLLATERAL = 10;
+    uint8 internal constant ACTION_BENTO_DEPOSIT = 20;
+    uint8 internal constant ACTION_BENTO_WITHDRAW = 21;
+    uint8 internal constant ACTION_BENTO_TRANSFER = 22;
+
+    int256 internal constant USE_VALUE1 = -1;
+    int256 internal constant USE_VALUE2 = -2;
+
+    IBentoBoxV1 public bentoBox;
+    address public masterContract;
+    IERC20 public collateral;
+    IERC20 public magicInternetMoney;
+
+    uint256 public exchangeRate;
+    uint256 public COLLATERIZATION_RATE;
+    uint256 public BORROW_OPENING_FEE;
+    uint256 public INTEREST_PER_SECOND;
+    uint256 public lastAccrued;
+
+    uint256 public totalCollateralShare;
+    Rebase internal _totalBorrow;
+    mapping(address => uint256) public userCollateralShare;
+    mapping(address => uint256) public userBorrowPart;
+
+    constructor(
+        address _bentoBox,
+        IERC20 _collateral,
+        IERC20 _magicInternetMoney,
+        uint256 _exchangeRate,
+        uint256 _collaterizationRate
+    ) public {
+        bentoBox = IBentoBoxV1(_bentoBox);
+        masterContract = address(this);
+        collateral = _collateral;
+        magicInternetMoney = _magicInternetMoney;
+        exchangeRate = _exchangeRate;
+        COLLATERIZATION_RATE = _collaterizationRate;
+        lastAccrued = block.timestamp;
+        MockBentoBox(_bentoBox).registerProtocol();
+    }
+
+    function totalBorrow() external view returns (Rebase memory) {
+        return _totalBorrow;
+    }
+
+    function setExchangeRate(uint256 _exchangeRate) external {
+        exchangeRate = _exchangeRate;
+    }
+
+    function setInterestPerSecond(uint256 _interestPerSecond) external {
+        accrue();
+        INTEREST_PER_SECOND = _interestPerSecond;
+    }
+
+    function setBorrowOpeningFee(uint256 _borrowOpeningFee) external {
+        BORROW_OPENING_FEE = _borrowOpeningFee;
+    }
+
+    function accrue() public {
+        uint256 elapsedTime = block.timestamp - lastAccrued;
+        if (elapsedTime == 0) {
+            return;
+        }
+        lastAccrued = block.timestamp;
+
+        if (_totalBorrow.base == 0) {
+            return;
+        }
+        uint256 extraAmount =
+            uint256(_totalBorrow.elastic).mul(INTEREST_PER_SECOND).mul(elapsedTime) / 1e18;
+        _totalBorrow.elastic = uint256(_totalBorrow.elastic).add(extraAmount).to128();
+    }
+
+    function isSolvent(address user) public view returns (bool) {
+        uint256 borrowPart = userBorrowPart[user];
+        if (borrowPart == 0) return true;
+        uint256 collateralShare = userCollateralShare[user];
+        if (collateralShare == 0) return false;
+
+        return
+            bentoBox.toAmount(
+                collateral,
+                collateralShare.mul(EXCHANGE_RATE_PRECISION / COLLATERIZATION_RATE_PRECISION).mul(COLLATERIZATION_RATE),
+                false
+            ) >=
+            borrowPart.mul(_totalBorrow.elastic).mul(exchangeRate) / _totalBorrow.base;
+    }
+
+    function addCollateral(address to, bool skim, uint256 share) public {
+        _addCollateral(to, skim, share);
+    }
+
+    function _addCollateral(address to, bool skim, uint256 share) internal {
+        userCollateralShare[to] = userCollateralShare[to].add(share);
+        uint256 oldTotalCollateralShare = totalCollateralShare;
+        totalCollateralShare = oldTotalCollateralShare.add(share);
+        if (skim) {
+            require(
+                share <= bentoBox.balanceOf(collateral, address(this)).sub(oldTotalCollateralShare),
+                "Cauldron: Skim too much"
+            );
+        } else {
+            bentoBox.transfer(collateral, msg.sender, address(this), share);
+        }
+    }
+
+    function removeCollateral(address to, uint256 share) public {
+        accrue();
+        _removeCollateral(to, share);
+        require(isSolvent(msg.sender), "Cauldron: user insolvent");
+    }
+
+    function _removeCollateral(address to, uint256 share) internal {
+        userCollateralShare[msg.sender] = userCollateralShare[msg.sender].sub(share);
+        totalCollateralShare = totalCollateralShare.sub(share);
+        bentoBox.transfer(collateral, address(this), to, share);
+    }
+
+    function borrow(address to, uint256 amount) public returns (uint256 part, uint256 share) {
+        accrue();
+        (part, share) = _borrow(to, amount);
+        require(isSolvent(msg.sender), "Cauldron: user insolvent");
+    }
+
+    function _borrow(address to, uint256 amount) internal returns (uint256 part, uint256 share) {
+        uint256 feeAmount = amount.mul(BORROW_OPENING_FEE) / BORROW_OPENING_FEE_PRECISION;
+        (_totalBorrow, part) = _totalBorrow.add(amount.add(feeAmount), true);
+        userBorrowPart[msg.sender] = userBorrowPart[msg.sender].add(part);
+
+        share = bentoBox.toShare(magicInternetMoney, amount, false);
+        bentoBox.transfer(magicInternetMoney, address(this), to, share);
+    }
+
+    function repay(address to, bool skim, uint256 part) public returns (uint256 amount) {
+        accrue();
+        amount = _repay(to, skim, part);
+    }
+
+    function _repay(address to, bool skim, uint256 part) internal returns (uint256 amount) {
+        (_totalBorrow, amount) = _totalBorrow.sub(part, true);
+        userBorrowPart[to] = userBorrowPart[to].sub(part);
+
+        uint256 share = bentoBox.toShare(magicInternetMoney, amount, true);
+        bentoBox.transfer(magicInternetMoney, skim ? address(bentoBox) : msg.sender, address(this), share);
+    }
+
+    function _num(int256 inNum, uint256 value1, uint256 value2) internal pure returns (uint256 outNum) {
+        outNum = inNum >= 0 ? uint256(inNum) : (inNum == USE_VALUE1 ? value1 : value2);
+    }
+
+    function _bentoDeposit(
+        bytes memory data,
+        uint256 value,
+        uint256 value1,
+        uint256 value2
+    ) internal returns (uint256, uint256) {
+        (IERC20 token, address to, int256 amount, int256 share) = abi.decode(data, (IERC20, address, int256, int256));
+        return bentoBox.deposit{value: value}(token, msg.sender, to, _num(amount, value1, value2), _num(share, value1, value2));
+    }
+
+    function _bentoWithdraw(
+        bytes memory data,
+        uint256 value1,
+        uint256 value2
+    ) internal returns (uint256, uint256) {
+        (IERC20 token, address to, int256 amount, int256 share) = abi.decode(data, (IERC20, address, int256, int256));
+        return bentoBox.withdraw(token, msg.sender, to, _num(amount, value1, value2), _num(share, value1, value2));
+    }
+
+    struct CookStatus {
+        bool needsSolvencyCheck;
+        bool hasAccrued;
+    }
+
+    /// @notice Executes a set of actions, with a single solvency check at the end like CauldronV2.
+    function cook(
+        uint8[] calldata actions,
+        uint256[] calldata values,
+        bytes[] calldata datas
+    ) external payable returns (uint256 value1, uint256 value2) {
+        CookStatus memory status;
+        for (uint256 i = 0; i < actions.length; i++) {
+            uint8 action = actions[i];
+            if (!status.hasAccrued && action < 10) {
+                accrue();
+                status.hasAccrued = true;
+            }
+            if (action == ACTION_ADD_COLLATERAL) {
+                (int256 share, address to, bool skim) = abi.decode(datas[i], (int256, address, bool));
+                _addCollateral(to, skim, _num(share, value1, value2));
+            } else if (action == ACTION_REPAY) {
+                (int256 part, address to, bool skim) = abi.decode(datas[i], (int256, address, bool));
+                _repay(to, skim, _num(part, value1, value2));
+            } else if (action == ACTION_REMOVE_COLLATERAL) {
+                (int256 share, address to) = abi.decode(datas[i], (int256, address));
+                _removeCollateral(to, _num(share, value1, value2));
+                status.needsSolvencyCheck = true;
+            } else if (action == ACTION_BORROW) {
+                (int256 amount, address to) = abi.decode(datas[i], (int256, address));
+                (value1, value2) = _borrow(to, _num(amount, value1, value2));
+                status.needsSolvencyCheck = true;
+            } else if (action == ACTION_GET_REPAY_SHARE) {
+                int256 part = abi.decode(datas[i], (int256));
+                value1 = bentoBox.toShare(magicInternetMoney, _totalBorrow.toElastic(_num(part, value1, value2), true), true);
+            } else if (action == ACTION_GET_REPAY_PART) {
+                int256 amount = abi.decode(datas[i], (int256));
+                value1 = _totalBorrow.toBase(_num(amount, value1, value2), false);
+            } else if (action == ACTION_ACCRUE) {
+                accrue();
+            } else if (action == ACTION_BENTO_DEPOSIT) {
+                (value1, value2) = _bentoDeposit(datas[i], values[i], value1, value2);
+            } else if (action == ACTION_BENTO_WITHDRAW) {
+                (value1, value2) = _bentoWithdraw(datas[i], value1, value2);
+            } else if (action == ACTION_BENTO_TRANSFER) {
+                (IERC20 token, address to, int256 share) = abi.decode(datas[i], (IERC20, address, int256));
+                bentoBox.transfer(token, msg.sender, to, _num(share, value1, value2));
+            } else {
+                revert("Cauldron: unsupported action");
+            }
+        }
+
+        if (status.needsSolvencyCheck) {
+            require(isSolvent(msg.sender), "Cauldron: user insolvent");
+        }
+    }
+}
@@ -0,0 +1,103 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity 0.6.12;
+
+import {
+    SafeERC20,
+    SafeMath,
+    IERC20
+} from "@openzeppelin/contracts/token/ERC20/SafeERC20.sol";
+import "./MockERC20.sol";
+
+// Curve MIM-3CRV metapool stand-in. Swaps underlying coins 1:1 after
+// normalising decimals, out of whatever reserves were minted to the pool.
+contract MockCurveMetaPool {
+    using SafeERC20 for IERC20;
+    using SafeMath for uint256;
+
+    address[] public underlying_coins;
+
+    constructor(address[] memory _underlyingCoins) public {
+        underlying_coins = _underlyingCoins;
+    }
+
+    function coins(uint256 i) external view returns (address) {
+        return underlying_coins[i];
+    }
+
+    function get_dy_underlying(int128 i, int128 j, uint256 dx) public view returns (uint256) {
+        uint256 decimalsIn = MockERC20(underlying_coins[uint256(i)]).decimals();
+        uint256 decimalsOut = MockERC20(underlying_coins[uint256(j)]).decimals();
+        return dx.mul(10**decimalsOut).div(10**decimalsIn);
+    }
+
+    function exchange_underlying(int128 i, int128 j, uint256 dx, uint256 min_dy) external returns (uint256 dy) {
+        dy = get_dy_underlying(i, j, dx);
+        require(dy >= min_dy, "Exchange resulted in fewer coins than expected");
+
+        IERC20(underlying_coins[uint256(i)]).safeTransferFrom(msg.sender, address(this), dx);
+        IERC20(underlying_coins[uint256(j)]).safeTransfer(msg.sender, dy);
+    }
+}
+
+// Curve ETH/stETH pool stand-in. LP tokens are minted and burnt at a settable
+// virtual price; coin 0 is native ETH like the real pool.
+contract MockCurveStETHPool {
+    using SafeERC20 for IERC20;
+    using SafeMath for uint256;
+
+    address private constant ETH = 0xEeeeeEeeeEeEeeEeEeEeeEEEeeeeEeeeeeeeEEeE;
+
+    MockERC20 public lp_token;
+    IERC20 public steth;
+    uint256 public virtualPrice = 1e18;
+
+    constructor(address _steth) public {
+        steth = IERC20(_steth);
+        lp_token = new MockERC20("Curve.fi ETH/stETH", "steCRV", 18);
+    }
+
+    receive() external payable {}
+
+    function coins(uint256 i) external view returns (address) {
+        return i == 0 ? ETH : address(steth);
+    }
+
+    function setVirtualPrice(uint256 _virtualPrice) external {
+        virtualPrice = _virtualPrice;
+    }
+
+    function get_virtual_price() external view returns (uint256) {
+        return virtualPrice;
+    }
+
+    function calc_token_amount(uint256[2] calldata amounts, bool) public view returns (uint256) {
+        return amounts[0].add(amounts[1]).mul(1e18).div(virtualPrice);
+    }
+
+    function calc_withdraw_one_coin(uint256 _token_amount, int128) public view returns (uint256) {
+        return _token_amount.mul(virtualPrice).div(1e18);
+    }
+
+    function add_liquidity(uint256[2] calldata amounts, uint256 min_mint_amount) external payable returns (uint256 minted) {
+        require(msg.value == amounts[0], "Invalid ETH amount");
+        minted = calc_token_amount(amounts, true);
+        require(minted >= min_mint_amount, "Slippage screwed you");
+
+        if (amounts[1] > 0) {
+            steth.safeTransferFrom(msg.sender, address(this), amounts[1]);
+        }
+        lp_token.mint(msg.sender, minted);
+    }
+
+    function remove_liquidity_one_coin(uint256 _token_amount, int128 i, uint256 _min_amount) external returns (uint256 dy) {
+        dy = calc_withdraw_one_coin(_token_amount, i);
+        require(dy >= _min_amount, "Not enough coins removed");
+
+        lp_token.burn(msg.sender, _token_amount);
+        if (i == 0) {
+            msg.sender.transfer(dy);
+        } else {
+            steth.safeTransfer(msg.sender, dy);
+        }
+    }
+}
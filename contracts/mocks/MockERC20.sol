@@ -0,0 +1,21 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity 0.6.12;
+
+import "@openzeppelin/contracts/token/ERC20/ERC20.sol";
+
+contract MockERC20 is ERC20 {
+    constructor(string memory _name, string memory _symbol, uint8 _decimals)
+        public
+        ERC20(_name, _symbol)
+    {
+        _setupDecimals(_decimals);
+    }
+
+    function mint(address _to, uint256 _amount) external {
+        _mint(_to, _amount);
+    }
+
+    function burn(address _from, uint256 _amount) external {
+        _burn(_from, _amount);
+    }
+}
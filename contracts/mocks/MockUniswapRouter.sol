@@ -0,0 +1,84 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity 0.6.12;
+
+import {
+    SafeERC20,
+    SafeMath,
+    IERC20
+} from "@openzeppelin/contracts/token/ERC20/SafeERC20.sol";
+
+// UniswapV2Router02 stand-in. Every pair trades at a settable rate
+// (1e18 precision) out of the router's own token and ETH reserves.
+contract MockUniswapRouter {
+    using SafeERC20 for IERC20;
+    using SafeMath for uint256;
+
+    address public immutable WETH;
+    mapping(address => mapping(address => uint256)) public rates;
+
+    constructor(address _weth) public {
+        WETH = _weth;
+    }
+
+    receive() external payable {}
+
+    function setRate(address _tokenIn, address _tokenOut, uint256 _rate) external {
+        rates[_tokenIn][_tokenOut] = _rate;
+    }
+
+    function getAmountsOut(uint256 amountIn, address[] memory path) public view returns (uint256[] memory amounts) {
+        require(path.length >= 2, "UniswapV2Library: INVALID_PATH");
+        amounts = new uint256[](path.length);
+        amounts[0] = amountIn;
+        for (uint256 i; i < path.length - 1; i++) {
+            uint256 rate = rates[path[i]][path[i + 1]];
+            require(rate > 0, "UniswapV2Library: INSUFFICIENT_LIQUIDITY");
+            amounts[i + 1] = amounts[i].mul(rate).div(1e18);
+        }
+    }
+
+    function swapExactTokensForTokens(
+        uint256 amountIn,
+        uint256 amountOutMin,
+        address[] calldata path,
+        address to,
+        uint256 deadline
+    ) external returns (uint256[] memory amounts) {
+        require(deadline >= block.timestamp, "UniswapV2Router: EXPIRED");
+        amounts = getAmountsOut(amountIn, path);
+        require(amounts[amounts.length - 1] >= amountOutMin, "UniswapV2Router: INSUFFICIENT_OUTPUT_AMOUNT");
+
+        IERC20(path[0]).safeTransferFrom(msg.sender, address(this), amountIn);
+        IERC20(path[path.length - 1]).safeTransfer(to, amounts[amounts.length - 1]);
+    }
+
+    function swapExactETHForTokens(
+        uint256 amountOutMin,
+        address[] calldata path,
+        address to,
+        uint256 deadline
+    ) external payable returns (uint256[] memory amounts) {
+        require(deadline >= block.timestamp, "UniswapV2Router: EXPIRED");
+        require(path[0] == WETH, "UniswapV2Router: INVALID_PATH");
+        amounts = getAmountsOut(msg.value, path);
+        require(amounts[amounts.length - 1] >= amountOutMin, "UniswapV2Router: INSUFFICIENT_OUTPUT_AMOUNT");
+
+        IERC20(path[path.length - 1]).safeTransfer(to, amounts[amounts.length - 1]);
+    }
+
+    function swapExactTokensForETH(
+        uint256 amountIn,
+        uint256 amountOutMin,
+        address[] calldata path,
+        address to,
+        uint256 deadline
+    ) external returns (uint256[] memory amounts) {
+        require(deadline >= block.timestamp, "UniswapV2Router: EXPIRED");
+        require(path[path.length - 1] == WETH, "UniswapV2Router: INVALID_PATH");
+        amounts = getAmountsOut(amountIn, path);
+        require(amounts[amounts.length - 1] >= amountOutMin, "UniswapV2Router: INSUFFICIENT_OUTPUT_AMOUNT");
+
+        IERC20(path[0]).safeTransferFrom(msg.sender, address(this), amountIn);
+        payable(to).transfer(amounts[amounts.length - 1]);
+    }
+}
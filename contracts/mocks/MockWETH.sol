@@ -0,0 +1,21 @@
+// SPDX-License-Identifier: AGPL-3.0
+pragma solidity 0.6.12;
+
+import "./MockERC20.sol";
+
+contract MockWETH is MockERC20 {
+    constructor() public MockERC20("Wrapped Ether", "WETH", 18) {}
+
+    receive() external payable {
+        deposit();
+    }
+
+    function deposit() public payable {
+        _mint(msg.sender, msg.value);
+    }
+
+    function withdraw(uint256 wad) external {
+        _burn(msg.sender, wad);
+        msg.sender.transfer(wad);
+    }
+}
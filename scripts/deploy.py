@@ -1,13 +1,53 @@
+import json
+import os
+from functools import lru_cache
 from pathlib import Path
 
-from brownie import Strategy, accounts, config, network, project, web3
+from brownie import (
+    Contract,
+    MIMMinterRouterFactory,
+    MIMMinterRouterStrategy,
+    accounts,
+    config,
+    network,
+    project,
+    web3,
+)
 from eth_utils import is_checksum_address
 import click
+import yaml
 
 API_VERSION = config["dependencies"][0].split("@")[-1]
-Vault = project.load(
-    Path.home() / ".brownie" / "packages" / config["dependencies"][0]
-).Vault
+
+# the part of the Yearn Vault ABI a batch deployment checks
+VAULT_ABI = [
+    {
+        "name": "apiVersion",
+        "type": "function",
+        "stateMutability": "view",
+        "inputs": [],
+        "outputs": [{"name": "", "type": "string"}],
+    }
+]
+
+# manifest keys of each strategy, in CloneParams order without the roles and name
+STRATEGY_KEYS = [
+    "vault",
+    "yVault",
+    "abracadabra",
+    "max_collat_rate",
+    "target_collat_rate",
+    "collateral_adapter",
+]
+EXCHANGE_KEYS = ["weth", "dai", "uniswap_router", "crv_mim"]
+
+
+@lru_cache(maxsize=None)
+def vault_container():
+    # loading the Yearn project compiles it, only the interactive flow needs it
+    return project.load(
+        Path.home() / ".brownie" / "packages" / config["dependencies"][0]
+    ).Vault
 
 
 def get_address(msg: str, default: str = None) -> str:
@@ -30,12 +70,14 @@ def get_address(msg: str, default: str = None) -> str:
 
 
 def main():
+    from brownie import Strategy
+
     print(f"You are using the '{network.show_active()}' network")
     dev = accounts.load(click.prompt("Account", type=click.Choice(accounts.load())))
     print(f"You are using: 'dev' [{dev.address}]")
 
     if input("Is there a Vault for this strategy already? y/[N]: ").lower() == "y":
-        vault = Vault.at(get_address("Deployed Vault: "))
+        vault = vault_container().at(get_address("Deployed Vault: "))
         assert vault.apiVersion() == API_VERSION
     else:
         print("You should deploy one vault using scripts from Vault project")
@@ -56,3 +98,179 @@ def main():
         return
 
     strategy = Strategy.deploy(vault, {"from": dev}, publish_source=publish_source)
+
+
+def load_manifest(path):
+    path = Path(path)
+    with path.open() as fp:
+        manifest = json.load(fp) if path.suffix == ".json" else yaml.safe_load(fp)
+
+    defaults = manifest.get("defaults", {})
+    manifest["strategies"] = [{**defaults, **s} for s in manifest["strategies"]]
+    names = [s["name"] for s in manifest["strategies"]]
+    if len(set(names)) != len(names):
+        raise ValueError("strategy names must be unique, they are the resume keys")
+
+    for entry in manifest["strategies"] + [manifest["factory"]]:
+        missing = [key for key in STRATEGY_KEYS + ["name"] if key not in entry]
+        if missing and "address" not in entry:
+            raise ValueError(f"{entry.get('name')}: missing {', '.join(missing)}")
+    return manifest
+
+
+class DeploymentState:
+    """
+    What a batch deployment has done so far on each network, saved after every
+    transaction so that a failed run picks up where it stopped.
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.networks = json.loads(self.path.read_text()) if self.path.exists() else {}
+        self.data = self.networks.setdefault(network.show_active(), {})
+        self.data.setdefault("strategies", {})
+        self.data.setdefault("verified", [])
+
+    @property
+    def factory(self):
+        return self.data.get("factory")
+
+    @factory.setter
+    def factory(self, address):
+        self.data["factory"] = address
+        self.save()
+
+    @property
+    def strategies(self):
+        return self.data["strategies"]
+
+    def add_strategy(self, name, address):
+        self.strategies[name] = address
+        self.save()
+
+    def verified(self, address):
+        self.data["verified"].append(address)
+        self.save()
+
+    def save(self):
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(json.dumps(self.networks, indent=2, sort_keys=True))
+        tmp.replace(self.path)
+
+
+def _account(manifest):
+    account = manifest.get("account", 0)
+    if isinstance(account, int):
+        return accounts[account]
+    # no prompt, the keystore password comes from the environment
+    return accounts.load(account, password=os.environ.get("DEPLOYER_PASSWORD"))
+
+
+def _salt(name):
+    return web3.keccak(text=name)
+
+
+def _clone_params(entry, dev):
+    return (
+        entry["vault"],
+        entry.get("strategist", dev.address),
+        entry.get("rewards", dev.address),
+        entry.get("keeper", dev.address),
+        *[entry[key] for key in STRATEGY_KEYS[1:]],
+        entry["name"],
+    )
+
+
+def _check_vaults(entries):
+    for vault in {entry["vault"] for entry in entries}:
+        version = Contract.from_abi("Vault", vault, VAULT_ABI).apiVersion()
+        if version != API_VERSION:
+            raise ValueError(f"vault {vault} is on {version}, expected {API_VERSION}")
+
+
+def _deploy_factory(manifest, state, dev):
+    if state.factory:
+        return MIMMinterRouterFactory.at(state.factory)
+
+    entry = manifest["factory"]
+    if "address" in entry:
+        factory = MIMMinterRouterFactory.at(entry["address"])
+    else:
+        _check_vaults([entry])
+        exchange = tuple(manifest["exchange"][key] for key in EXCHANGE_KEYS)
+        factory = MIMMinterRouterFactory.deploy(
+            entry["vault"],
+            entry["yVault"],
+            entry["name"],
+            *[entry[key] for key in STRATEGY_KEYS[2:]],
+            exchange,
+            {"from": dev},
+        )
+    state.factory = factory.address
+    return factory
+
+
+def batch(manifest_path, state_path=None):
+    """
+    Deploys every strategy of a manifest without prompts:
+
+        brownie run deploy batch deployments.yml --network mainnet
+
+    The factory is deployed once, strategies are cloned `batch_size` at a time at
+    CREATE2 addresses salted with their name, and sources are verified at the end.
+    Progress goes to `<manifest>.state.json`, rerunning resumes from it.
+    """
+    manifest = load_manifest(manifest_path)
+    state = DeploymentState(state_path or f"{manifest_path}.state.json")
+    dev = _account(manifest)
+    print(f"Deploying on '{network.show_active()}' from {dev.address}")
+
+    factory = _deploy_factory(manifest, state, dev)
+    print(f"factory: {factory.address}")
+
+    pending = []
+    for entry in manifest["strategies"]:
+        if entry["name"] in state.strategies:
+            continue
+        predicted = factory.predictDeterministicAddress(dev, _salt(entry["name"]))
+        if web3.eth.get_code(predicted):
+            # mined by a run that failed before saving it
+            state.add_strategy(entry["name"], predicted)
+        else:
+            pending.append(entry)
+    _check_vaults(pending)
+
+    batch_size = manifest.get("batch_size", 10)
+    for i in range(0, len(pending), batch_size):
+        chunk = pending[i : i + batch_size]
+        tx = factory.cloneMIMMinterBatch(
+            [_clone_params(entry, dev) for entry in chunk],
+            [_salt(entry["name"]) for entry in chunk],
+            {"from": dev},
+        )
+        for entry, event in zip(chunk, tx.events["Cloned"]):
+            state.add_strategy(entry["name"], event["clone"])
+            print(f"{entry['name']}: {event['clone']}")
+
+    if manifest.get("publish_source", False):
+        _verify(factory, state)
+
+    return state.strategies
+
+
+def _verify(factory, state):
+    # clones are EIP-1167 proxies, verifying the original covers them
+    original = MIMMinterRouterStrategy.at(factory.original())
+    for container, contract in [
+        (MIMMinterRouterFactory, factory),
+        (MIMMinterRouterStrategy, original),
+    ]:
+        if contract.address in state.data["verified"]:
+            continue
+        try:
+            container.publish_source(contract)
+        except Exception as e:
+            # the deployment stands, a rerun retries the verification only
+            print(f"verification of {contract.address} failed: {e}")
+            continue
+        state.verified(contract.address)
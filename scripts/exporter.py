@@ -0,0 +1,197 @@
+import time
+
+from brownie import network, web3
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    start_http_server,
+)
+
+from scripts.indexer import EventIndexer
+from scripts.monitor import FleetMonitor
+
+C_RATE_PRECISION = 1e5
+# amounts are exported in tokens, as the monitor prints them
+WAD = 1e18
+
+GAS_BUCKETS = (
+    250_000,
+    500_000,
+    750_000,
+    1_000_000,
+    1_500_000,
+    2_000_000,
+    3_000_000,
+    4_000_000,
+)
+SECONDS_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 15, 30, 60, 120, 300)
+
+
+class Metrics:
+    """The exporter's metrics, in their own registry so several can live in one process."""
+
+    def __init__(self, registry=None):
+        self.registry = registry or CollectorRegistry()
+        labels = ["strategy", "vault"]
+
+        def gauge(name, doc, extra=()):
+            return Gauge(name, doc, labels + list(extra), registry=self.registry)
+
+        self.collat_rate = gauge(
+            "mim_strategy_collat_rate", "Current c-rate, as a ratio"
+        )
+        self.liquidation_distance = gauge(
+            "mim_strategy_liquidation_distance",
+            "Collateral price drop that takes the c-rate to maxCollatRate, as a ratio",
+        )
+        self.estimated_total_assets = gauge(
+            "mim_strategy_estimated_total_assets", "estimatedTotalAssets"
+        )
+        self.value_of_investment = gauge(
+            "mim_strategy_value_of_investment", "MIM value of the yVault shares"
+        )
+        self.borrowed = gauge("mim_strategy_borrowed", "MIM owed to the cauldron")
+        self.total_debt = gauge("mim_strategy_total_debt", "Vault debt of the strategy")
+        self.bentobox_dust = gauge(
+            "mim_strategy_bentobox_balance", "Tokens left in BentoBox", ["token"]
+        )
+        self.seconds_since_report = gauge(
+            "mim_strategy_seconds_since_report",
+            "Time since the last harvest reported to the vault",
+        )
+
+        self.harvests = Counter(
+            "mim_strategy_harvests",
+            "Harvests seen on chain",
+            ["strategy"],
+            registry=self.registry,
+        )
+        self.harvest_profit = Counter(
+            "mim_strategy_harvest_profit",
+            "Profit reported by harvests",
+            ["strategy"],
+            registry=self.registry,
+        )
+        self.harvest_loss = Counter(
+            "mim_strategy_harvest_loss",
+            "Loss reported by harvests",
+            ["strategy"],
+            registry=self.registry,
+        )
+        self.harvest_gas = Histogram(
+            "mim_strategy_harvest_gas",
+            "Gas used by each harvest",
+            ["strategy"],
+            buckets=GAS_BUCKETS,
+            registry=self.registry,
+        )
+        self.confirmation_seconds = Histogram(
+            "mim_keeper_confirmation_seconds",
+            "Time from sending a keeper transaction to its confirmation",
+            ["action"],
+            buckets=SECONDS_BUCKETS,
+            registry=self.registry,
+        )
+        self.rpc_seconds = Histogram(
+            "mim_exporter_rpc_seconds",
+            "Latency of the JSON-RPC requests of this process",
+            ["method"],
+            buckets=SECONDS_BUCKETS,
+            registry=self.registry,
+        )
+        self.block = Gauge(
+            "mim_exporter_block", "Block of the last scrape", registry=self.registry
+        )
+
+    def rpc_middleware(self, make_request, w3):
+        """web3 middleware timing every request, see web3.middleware_onion"""
+
+        def middleware(method, params):
+            start = time.perf_counter()
+            try:
+                return make_request(method, params)
+            finally:
+                self.rpc_seconds.labels(method).observe(time.perf_counter() - start)
+
+        return middleware
+
+
+class Exporter:
+    """
+    Scrapes a MIMMinterRouterFactory fleet into Metrics. Positions are read with
+    one Multicall per scrape, harvests come from an EventIndexer so each is
+    counted once, however often it is scraped.
+    """
+
+    def __init__(
+        self,
+        factory_address,
+        metrics=None,
+        db_path="indexer.db",
+        from_block=0,
+        confirmations=0,
+    ):
+        self.metrics = metrics or Metrics()
+        self.monitor = FleetMonitor(factory_address, from_block)
+        self.indexer = EventIndexer(factory_address, db_path, from_block)
+        self.confirmations = confirmations
+        self._last_harvest = 0
+
+    def scrape(self):
+        rows = self.monitor.poll()
+        block = rows[0]["block"]
+        timestamp = web3.eth.get_block(block).timestamp
+
+        m = self.metrics
+        for strategy, row in zip(self.monitor.strategies, rows):
+            labels = (strategy.address, self.monitor.vaults[strategy.address].address)
+            m.collat_rate.labels(*labels).set(row["collatRate"] / C_RATE_PRECISION)
+            m.liquidation_distance.labels(*labels).set(
+                row["liquidationDistance"] / C_RATE_PRECISION
+            )
+            m.estimated_total_assets.labels(*labels).set(
+                row["estimatedTotalAssets"] / WAD
+            )
+            m.value_of_investment.labels(*labels).set(row["valueOfInvestment"] / WAD)
+            m.borrowed.labels(*labels).set(row["borrowedAmount"] / WAD)
+            m.total_debt.labels(*labels).set(row["totalDebt"] / WAD)
+            m.bentobox_dust.labels(*labels, "mim").set(
+                row["balanceOfMIMInBentoBox"] / WAD
+            )
+            m.bentobox_dust.labels(*labels, "collateral").set(
+                row["balanceOfCollateralInBentoBox"] / WAD
+            )
+            if row["lastReport"]:
+                m.seconds_since_report.labels(*labels).set(
+                    timestamp - row["lastReport"]
+                )
+
+        self.indexer.sync(confirmations=self.confirmations)
+        for rowid, strategy, profit, loss, gas_used in self.indexer.db.execute(
+            "SELECT rowid, strategy, profit, loss, gas_used FROM harvests WHERE rowid > ? ORDER BY rowid",
+            (self._last_harvest,),
+        ):
+            m.harvests.labels(strategy).inc()
+            m.harvest_profit.labels(strategy).inc(int(profit) / WAD)
+            m.harvest_loss.labels(strategy).inc(int(loss) / WAD)
+            m.harvest_gas.labels(strategy).observe(gas_used)
+            self._last_harvest = rowid
+
+        m.block.set(block)
+        return rows
+
+
+def main(factory_address, port=9100, interval=15, db_path="indexer.db", from_block=0):
+    """brownie run exporter main <factory> [port] [interval] [indexer.db] [from_block] --network mainnet"""
+    print(f"You are using the '{network.show_active()}' network")
+    metrics = Metrics()
+    web3.middleware_onion.add(metrics.rpc_middleware, "metrics")
+    exporter = Exporter(factory_address, metrics, db_path, from_block, confirmations=5)
+
+    start_http_server(int(port), registry=metrics.registry)
+    print(f"serving metrics on :{port}/metrics")
+    while True:
+        exporter.scrape()
+        time.sleep(int(interval))
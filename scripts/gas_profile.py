@@ -0,0 +1,123 @@
+"""
+Breaks the gas of one transaction, typically a harvest, down by call frame.
+
+Every external call (Cauldron cook/accrue, BentoBox, Curve, Uniswap, yVault, ...)
+and every internal function brownie can map from the source (_unwind,
+_exchangeCollateralToMIM, ...) is a frame. Output is a table of the heaviest
+frames and a collapsed-stack file for flamegraph.pl / speedscope / inferno.
+
+    brownie run gas_profile main <tx_hash> [harvest.folded] --network mainnet-fork
+"""
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from brownie import chain
+
+
+@dataclass
+class Frame:
+    key: tuple  # (depth, jumpDepth) of its steps
+    label: str
+    start_gas: int
+    external: bool
+    children: int = 0
+
+
+@dataclass
+class GasProfile:
+    gas_used: int
+    # self gas per stack, "outer;inner;innermost" -> gas
+    stacks: dict = field(default_factory=lambda: defaultdict(int))
+    # inclusive / self gas and call count per frame label
+    inclusive: dict = field(default_factory=lambda: defaultdict(int))
+    self_gas: dict = field(default_factory=lambda: defaultdict(int))
+    calls: dict = field(default_factory=lambda: defaultdict(int))
+    external: set = field(default_factory=set)
+
+    @property
+    def traced_gas(self):
+        return sum(self.stacks.values())
+
+    def collapsed(self):
+        """Collapsed-stack lines, one `frame;frame;frame gas` per stack"""
+        lines = [
+            f"{stack} {gas}" for stack, gas in sorted(self.stacks.items()) if gas > 0
+        ]
+        # intrinsic cost and refunds are not part of any frame
+        overhead = self.gas_used - self.traced_gas
+        if overhead > 0:
+            lines.append(f"[intrinsic] {overhead}")
+        return "\n".join(lines) + "\n"
+
+    def table(self, limit=30):
+        rows = sorted(self.inclusive.items(), key=lambda item: item[1], reverse=True)[
+            :limit
+        ]
+        lines = [f"{'frame':<60} {'calls':>6} {'inclusive':>10} {'self':>10}"]
+        for label, gas in rows:
+            kind = "" if label in self.external else "  "
+            lines.append(
+                f"{kind + label:<60} {self.calls[label]:>6} {gas:>10} {self.self_gas[label]:>10}"
+            )
+        lines.append(f"{'gas used':<60} {'':>6} {self.gas_used:>10}")
+        return "\n".join(lines)
+
+
+def _label(step):
+    fn = step.get("fn") or "<unknown>"
+    # brownie already prefixes internal and external functions with the contract
+    if "." in fn:
+        return fn
+    return f"{step.get('contractName') or step.get('address')}.{fn}"
+
+
+def profile(tx):
+    """GasProfile of a brownie TransactionReceipt, from its debug trace"""
+    trace = tx.trace
+    result = GasProfile(gas_used=tx.gas_used)
+    stack = []
+
+    def pop(end_gas):
+        frame = stack.pop()
+        inclusive = frame.start_gas - end_gas
+        own = inclusive - frame.children
+        path = ";".join(f.label for f in stack + [frame])
+        result.stacks[path] += own
+        result.self_gas[frame.label] += own
+        # recursion would count the same gas twice in inclusive
+        if frame.label not in (f.label for f in stack):
+            result.inclusive[frame.label] += inclusive
+        result.calls[frame.label] += 1
+        if stack:
+            stack[-1].children += inclusive
+
+    for i, step in enumerate(trace):
+        key = (step["depth"], step.get("jumpDepth", 0))
+        while stack and stack[-1].key > key:
+            pop(step["gas"])
+
+        if not stack or stack[-1].key < key:
+            external = not stack or key[0] > stack[-1].key[0]
+            # an external frame is measured in its caller's gas, so it includes the call itself
+            start_gas = trace[i - 1]["gas"] if external and stack else step["gas"]
+            label = _label(step)
+            stack.append(Frame(key, label, start_gas, external))
+            if external:
+                result.external.add(label)
+
+    if trace:
+        end_gas = trace[-1]["gas"] - trace[-1]["gasCost"]
+        while stack:
+            pop(end_gas)
+
+    return result
+
+
+def main(tx_hash, output="harvest.folded"):
+    tx = chain.get_transaction(tx_hash)
+    result = profile(tx)
+
+    print(result.table())
+    with open(output, "w") as fp:
+        fp.write(result.collapsed())
+    print(f"\ncollapsed stacks written to {output}")
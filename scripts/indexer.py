@@ -0,0 +1,305 @@
+import sqlite3
+
+from brownie import (
+    MIMMinterRouterFactory,
+    MIMMinterRouterStrategy,
+    chain,
+    network,
+    web3,
+)
+from eth_utils import event_abi_to_log_topic
+
+# the part of the Yearn Vault ABI the indexer reads
+VAULT_ABI = [
+    {
+        "name": "StrategyReported",
+        "type": "event",
+        "anonymous": False,
+        "inputs": [
+            {"name": "strategy", "type": "address", "indexed": True},
+            {"name": "gain", "type": "uint256", "indexed": False},
+            {"name": "loss", "type": "uint256", "indexed": False},
+            {"name": "debtPaid", "type": "uint256", "indexed": False},
+            {"name": "totalGain", "type": "uint256", "indexed": False},
+            {"name": "totalLoss", "type": "uint256", "indexed": False},
+            {"name": "totalDebt", "type": "uint256", "indexed": False},
+            {"name": "debtAdded", "type": "uint256", "indexed": False},
+            {"name": "debtRatio", "type": "uint256", "indexed": False},
+        ],
+    }
+]
+
+# token amounts overflow SQLite integers, they are stored as decimal text
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    factory TEXT PRIMARY KEY,
+    block INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS strategies (
+    address TEXT PRIMARY KEY,
+    factory TEXT NOT NULL,
+    vault TEXT NOT NULL,
+    is_original INTEGER NOT NULL,
+    block INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS harvests (
+    strategy TEXT NOT NULL,
+    block INTEGER NOT NULL,
+    tx_hash TEXT NOT NULL,
+    log_index INTEGER NOT NULL,
+    profit TEXT NOT NULL,
+    loss TEXT NOT NULL,
+    debt_payment TEXT NOT NULL,
+    debt_outstanding TEXT NOT NULL,
+    gas_used INTEGER NOT NULL,
+    PRIMARY KEY (tx_hash, log_index)
+);
+CREATE TABLE IF NOT EXISTS rebalances (
+    strategy TEXT NOT NULL,
+    block INTEGER NOT NULL,
+    tx_hash TEXT NOT NULL,
+    log_index INTEGER NOT NULL,
+    action INTEGER NOT NULL,
+    collat_rate INTEGER NOT NULL,
+    PRIMARY KEY (tx_hash, log_index)
+);
+CREATE TABLE IF NOT EXISTS reports (
+    strategy TEXT NOT NULL,
+    vault TEXT NOT NULL,
+    block INTEGER NOT NULL,
+    tx_hash TEXT NOT NULL,
+    log_index INTEGER NOT NULL,
+    gain TEXT NOT NULL,
+    loss TEXT NOT NULL,
+    debt_paid TEXT NOT NULL,
+    total_debt TEXT NOT NULL,
+    debt_ratio INTEGER NOT NULL,
+    PRIMARY KEY (tx_hash, log_index)
+);
+CREATE INDEX IF NOT EXISTS harvests_strategy ON harvests (strategy, block);
+CREATE INDEX IF NOT EXISTS rebalances_strategy ON rebalances (strategy, block);
+CREATE INDEX IF NOT EXISTS reports_strategy ON reports (strategy, block);
+"""
+
+
+def _events(abi, names):
+    contract = web3.eth.contract(abi=abi)
+    return {
+        web3.toHex(event_abi_to_log_topic(item)): getattr(
+            contract.events, item["name"]
+        )()
+        for item in abi
+        if item["type"] == "event" and item["name"] in names
+    }
+
+
+class EventIndexer:
+    """
+    Streams the events of a MIMMinterRouterFactory, its original and clones, and the
+    StrategyReported of their vaults into SQLite. Logs are fetched in bulk per block
+    range, the range halves when the node refuses it and grows back after, and the
+    last indexed block is checkpointed with the rows so a run resumes where it stopped.
+    """
+
+    def __init__(
+        self, factory_address, db_path="indexer.db", from_block=0, max_range=10_000
+    ):
+        self.factory = MIMMinterRouterFactory.at(factory_address)
+        self.db = sqlite3.connect(db_path)
+        self.db.executescript(SCHEMA)
+        self.max_range = max_range
+        self.range = max_range
+
+        self.factory_events = _events(
+            MIMMinterRouterFactory.abi, {"Cloned", "Deployed"}
+        )
+        self.strategy_events = _events(
+            MIMMinterRouterStrategy.abi, {"Harvested", "Rebalanced"}
+        )
+        self.vault_events = _events(VAULT_ABI, {"StrategyReported"})
+
+        row = self.db.execute(
+            "SELECT block FROM checkpoints WHERE factory = ?", (self.factory.address,)
+        ).fetchone()
+        self.next_block = row[0] + 1 if row else int(from_block)
+
+        self.strategies = {
+            address: vault
+            for address, vault in self.db.execute(
+                "SELECT address, vault FROM strategies WHERE factory = ?",
+                (self.factory.address,),
+            )
+        }
+        self._gas_used = {}
+
+        # the Deployed event is missed when indexing starts after the factory
+        with self.db:
+            self._add_strategy(self.factory.original(), self.next_block, True)
+
+    def _get_logs(self, addresses, topics, from_block, to_block):
+        if not addresses:
+            return []
+        try:
+            return web3.eth.get_logs(
+                {
+                    "address": addresses,
+                    "topics": topics,
+                    "fromBlock": from_block,
+                    "toBlock": to_block,
+                }
+            )
+        except ValueError:
+            # too many results or a range the node will not serve, split it
+            if from_block == to_block:
+                raise
+            middle = (from_block + to_block) // 2
+            self.range = max(1, (to_block - from_block + 1) // 2)
+            return self._get_logs(
+                addresses, topics, from_block, middle
+            ) + self._get_logs(addresses, topics, middle + 1, to_block)
+
+    def _add_strategy(self, address, block, is_original):
+        if address in self.strategies:
+            return
+        vault = MIMMinterRouterStrategy.at(address).vault()
+        self.strategies[address] = vault
+        self.db.execute(
+            "INSERT INTO strategies VALUES (?, ?, ?, ?, ?)",
+            (address, self.factory.address, vault, int(is_original), block),
+        )
+
+    def _harvest_gas(self, tx_hash):
+        if tx_hash not in self._gas_used:
+            self._gas_used[tx_hash] = web3.eth.get_transaction_receipt(tx_hash)[
+                "gasUsed"
+            ]
+        return self._gas_used[tx_hash]
+
+    def _index_range(self, from_block, to_block):
+        # clones first, their own events may be in the same range
+        for log in self._get_logs(
+            [self.factory.address], [list(self.factory_events)], from_block, to_block
+        ):
+            event = self.factory_events[web3.toHex(log["topics"][0])].processLog(log)
+            if event.event == "Deployed":
+                self._add_strategy(event.args.original, log["blockNumber"], True)
+            else:
+                self._add_strategy(event.args.clone, log["blockNumber"], False)
+
+        for log in self._get_logs(
+            list(self.strategies), [list(self.strategy_events)], from_block, to_block
+        ):
+            event = self.strategy_events[web3.toHex(log["topics"][0])].processLog(log)
+            key = (
+                log["address"],
+                log["blockNumber"],
+                web3.toHex(log["transactionHash"]),
+                log["logIndex"],
+            )
+            if event.event == "Harvested":
+                self.db.execute(
+                    "INSERT OR IGNORE INTO harvests VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    key
+                    + (
+                        str(event.args.profit),
+                        str(event.args.loss),
+                        str(event.args.debtPayment),
+                        str(event.args.debtOutstanding),
+                        self._harvest_gas(log["transactionHash"]),
+                    ),
+                )
+            else:
+                self.db.execute(
+                    "INSERT OR IGNORE INTO rebalances VALUES (?, ?, ?, ?, ?, ?)",
+                    key + (event.args.action, event.args.collatRate),
+                )
+
+        strategy_topics = [
+            "0x" + address[2:].lower().rjust(64, "0") for address in self.strategies
+        ]
+        for log in self._get_logs(
+            sorted(set(self.strategies.values())),
+            [list(self.vault_events), strategy_topics],
+            from_block,
+            to_block,
+        ):
+            event = self.vault_events[web3.toHex(log["topics"][0])].processLog(log)
+            self.db.execute(
+                "INSERT OR IGNORE INTO reports VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    event.args.strategy,
+                    log["address"],
+                    log["blockNumber"],
+                    web3.toHex(log["transactionHash"]),
+                    log["logIndex"],
+                    str(event.args.gain),
+                    str(event.args.loss),
+                    str(event.args.debtPaid),
+                    str(event.args.totalDebt),
+                    event.args.debtRatio,
+                ),
+            )
+
+    def sync(self, to_block=None, confirmations=0):
+        """Indexes up to `to_block`, `confirmations` blocks behind the head by default."""
+        to_block = chain.height - confirmations if to_block is None else to_block
+        while self.next_block <= to_block:
+            end = min(self.next_block + self.range - 1, to_block)
+            # rows and checkpoint commit together, a failed range is redone whole
+            with self.db:
+                self._index_range(self.next_block, end)
+                self.db.execute(
+                    "INSERT OR REPLACE INTO checkpoints VALUES (?, ?)",
+                    (self.factory.address, end),
+                )
+            self.next_block = end + 1
+            self.range = min(self.max_range, self.range * 2)
+            self._gas_used.clear()
+        return self.next_block - 1
+
+    def pnl(self):
+        """Gain, loss and net of each strategy over all its vault reports."""
+        result = {
+            address: {"gain": 0, "loss": 0, "reports": 0} for address in self.strategies
+        }
+        for strategy, gain, loss in self.db.execute(
+            "SELECT strategy, gain, loss FROM reports"
+        ):
+            result[strategy]["gain"] += int(gain)
+            result[strategy]["loss"] += int(loss)
+            result[strategy]["reports"] += 1
+        for row in result.values():
+            row["net"] = row["gain"] - row["loss"]
+        return result
+
+    def harvest_gas(self, strategy=None):
+        query = "SELECT strategy, block, tx_hash, gas_used FROM harvests"
+        params = ()
+        if strategy is not None:
+            query += " WHERE strategy = ?"
+            params = (str(strategy),)
+        return [
+            {"strategy": row[0], "block": row[1], "tx_hash": row[2], "gas_used": row[3]}
+            for row in self.db.execute(query + " ORDER BY block, log_index", params)
+        ]
+
+    def collat_rate_history(self, strategy):
+        return [
+            {"block": row[0], "action": row[1], "collatRate": row[2]}
+            for row in self.db.execute(
+                "SELECT block, action, collat_rate FROM rebalances WHERE strategy = ? ORDER BY block, log_index",
+                (str(strategy),),
+            )
+        ]
+
+
+def main(factory_address, db_path="indexer.db", from_block=0, confirmations=5):
+    """brownie run indexer main <factory> [indexer.db] [from_block] [confirmations] --network mainnet"""
+    print(f"You are using the '{network.show_active()}' network")
+    indexer = EventIndexer(factory_address, db_path, from_block)
+    last = indexer.sync(confirmations=int(confirmations))
+    print(f"indexed {len(indexer.strategies)} strategies up to block {last}")
+    for strategy, row in indexer.pnl().items():
+        print(
+            f"{strategy} gain {row['gain'] / 1e18:.4f} loss {row['loss'] / 1e18:.4f} reports {row['reports']}"
+        )
@@ -0,0 +1,158 @@
+import asyncio
+import functools
+import os
+import time
+from dataclasses import dataclass
+
+from brownie import accounts, network, web3
+
+from scripts.monitor import FleetMonitor
+
+# gas the triggers are asked to be worth, at the current gas price
+HARVEST_GAS = 2_000_000
+TEND_GAS = 1_500_000
+
+
+@dataclass
+class Job:
+    strategy: object
+    action: str  # "harvest" or "tend"
+    liquidation_distance: int
+
+    @property
+    def priority(self):
+        # closest to maxCollatRate first, a tend before a harvest at the same distance
+        return (self.liquidation_distance, self.action != "tend")
+
+
+class Keeper:
+    """
+    Harvests and tends every strategy of a MIMMinterRouterFactory when its triggers
+    say so. A round reads the fleet in one Multicall, asks the triggers of all
+    strategies concurrently, then sends the work most urgent first with locally
+    assigned nonces and waits for the confirmations together.
+
+    Above `max_gas_price` only strategies within `urgent_distance` of maxCollatRate
+    are served, up to `urgent_gas_price`. With exporter Metrics, confirmation times
+    are observed too.
+    """
+
+    def __init__(
+        self,
+        factory_address,
+        account,
+        max_gas_price,
+        urgent_gas_price=None,
+        urgent_distance=5_000,
+        from_block=0,
+        metrics=None,
+    ):
+        self.monitor = FleetMonitor(factory_address, from_block)
+        self.account = account
+        self.max_gas_price = int(max_gas_price)
+        self.urgent_gas_price = int(urgent_gas_price or max_gas_price)
+        self.urgent_distance = urgent_distance
+        self.nonce = None
+        self.pending = {}
+        self.metrics = metrics
+        self._nonce_lock = None
+
+    async def _call(self, fn, *args):
+        # brownie is blocking, every RPC runs on the loop's executor
+        return await asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(fn, *args)
+        )
+
+    async def _job(self, strategy, row, gas_price):
+        if strategy.address in self.pending:
+            return None
+        # a harvest also rebalances, there is no need to tend on top of it
+        if await self._call(strategy.harvestTrigger, gas_price * HARVEST_GAS):
+            return Job(strategy, "harvest", row["liquidationDistance"])
+        if await self._call(strategy.tendTrigger, gas_price * TEND_GAS):
+            return Job(strategy, "tend", row["liquidationDistance"])
+        return None
+
+    async def jobs(self, gas_price):
+        rows = await self._call(self.monitor.poll)
+        jobs = await asyncio.gather(
+            *[
+                self._job(strategy, row, gas_price)
+                for strategy, row in zip(self.monitor.strategies, rows)
+            ]
+        )
+        return sorted((job for job in jobs if job), key=lambda job: job.priority)
+
+    def allowed(self, job, gas_price):
+        if gas_price <= self.max_gas_price:
+            return True
+        return (
+            job.liquidation_distance <= self.urgent_distance
+            and gas_price <= self.urgent_gas_price
+        )
+
+    async def submit(self, job, gas_price):
+        address = job.strategy.address
+        async with self._nonce_lock:
+            if self.nonce is None:
+                self.nonce = await self._call(
+                    web3.eth.get_transaction_count, self.account.address, "pending"
+                )
+            try:
+                tx = await self._call(
+                    getattr(job.strategy, job.action),
+                    {
+                        "from": self.account,
+                        "nonce": self.nonce,
+                        "gas_price": gas_price,
+                        "required_confs": 0,
+                    },
+                )
+            except Exception:
+                # the nonce may or may not be used, take it from the chain again
+                self.nonce = None
+                raise
+            self.nonce += 1
+            self.pending[address] = tx
+            sent = time.perf_counter()
+
+        try:
+            await self._call(tx.wait, 1)
+        finally:
+            del self.pending[address]
+        if self.metrics is not None:
+            self.metrics.confirmation_seconds.labels(job.action).observe(
+                time.perf_counter() - sent
+            )
+        return tx
+
+    async def run_once(self):
+        """One round: returns (job, receipt or exception) for everything sent."""
+        # a lock per round, tied to the loop running it: callers may start a new loop each round
+        self._nonce_lock = asyncio.Lock()
+
+        gas_price = await self._call(lambda: web3.eth.gas_price)
+        jobs = [
+            job for job in await self.jobs(gas_price) if self.allowed(job, gas_price)
+        ]
+
+        # tasks take the lock in creation order, so nonces follow the priority
+        results = await asyncio.gather(
+            *[self.submit(job, gas_price) for job in jobs], return_exceptions=True
+        )
+        return list(zip(jobs, results))
+
+    async def run(self, interval=60):
+        while True:
+            for job, result in await self.run_once():
+                outcome = result if isinstance(result, Exception) else result.txid
+                print(f"{job.action} {job.strategy.address}: {outcome}")
+            await asyncio.sleep(interval)
+
+
+def main(factory_address, account_id, max_gas_price_gwei=100, interval=60):
+    """brownie run keeper main <factory> <account> [max_gas_price_gwei] [interval] --network mainnet"""
+    print(f"You are using the '{network.show_active()}' network")
+    account = accounts.load(account_id, password=os.environ.get("KEEPER_PASSWORD"))
+    keeper = Keeper(factory_address, account, int(max_gas_price_gwei) * 10 ** 9)
+    asyncio.run(keeper.run(int(interval)))
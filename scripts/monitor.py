@@ -0,0 +1,141 @@
+import json
+
+from brownie import (
+    Contract,
+    MIMMinterRouterFactory,
+    MIMMinterRouterStrategy,
+    chain,
+    multicall,
+    network,
+)
+
+# the part of the Yearn Vault ABI the monitor reads
+VAULT_ABI = [
+    {
+        "name": "strategies",
+        "type": "function",
+        "stateMutability": "view",
+        "inputs": [{"name": "arg0", "type": "address"}],
+        "outputs": [
+            {
+                "name": "",
+                "type": "tuple",
+                "components": [
+                    {"name": "performanceFee", "type": "uint256"},
+                    {"name": "activation", "type": "uint256"},
+                    {"name": "debtRatio", "type": "uint256"},
+                    {"name": "minDebtPerHarvest", "type": "uint256"},
+                    {"name": "maxDebtPerHarvest", "type": "uint256"},
+                    {"name": "lastReport", "type": "uint256"},
+                    {"name": "totalDebt", "type": "uint256"},
+                    {"name": "totalGain", "type": "uint256"},
+                    {"name": "totalLoss", "type": "uint256"},
+                ],
+            }
+        ],
+    }
+]
+
+COLUMNS = [
+    ("strategy", 42),
+    ("collatRate", 10),
+    ("liqDistance", 11),
+    ("totalAssets", 14),
+    ("totalDebt", 14),
+    ("investment", 14),
+    ("borrowed", 14),
+]
+
+
+class FleetMonitor:
+    """
+    Watches the original strategy of a MIMMinterRouterFactory and all of its clones.
+    Every poll reads the whole fleet in one Multicall round trip on a single block.
+    """
+
+    def __init__(self, factory_address, from_block=0):
+        self.factory = MIMMinterRouterFactory.at(factory_address)
+        self.strategies = [MIMMinterRouterStrategy.at(self.factory.original())]
+        self.vaults = {}
+        self._next_block = int(from_block)
+
+    def discover(self, to_block=None):
+        """Picks up clones created since the last discovery from the factory's Cloned events."""
+        to_block = chain.height if to_block is None else to_block
+        if to_block < self._next_block:
+            return []
+
+        events = self.factory.events.get_sequence(
+            from_block=self._next_block, to_block=to_block, event_type="Cloned"
+        )
+        clones = [MIMMinterRouterStrategy.at(event.args.clone) for event in events]
+        self.strategies += clones
+        self._next_block = to_block + 1
+        return clones
+
+    def _vault(self, strategy):
+        # strategy.vault() never changes, so it is only read on first sight
+        if strategy.address not in self.vaults:
+            self.vaults[strategy.address] = Contract.from_abi(
+                "Vault", strategy.vault(), VAULT_ABI
+            )
+        return self.vaults[strategy.address]
+
+    def poll(self, block=None):
+        block = chain.height if block is None else block
+        self.discover(block)
+        vaults = [self._vault(strategy) for strategy in self.strategies]
+
+        with multicall(block_identifier=block):
+            infos = [strategy.positionInfo() for strategy in self.strategies]
+            params = [
+                vault.strategies(strategy)
+                for vault, strategy in zip(vaults, self.strategies)
+            ]
+
+        rows = []
+        for strategy, info, param in zip(self.strategies, infos, params):
+            row = {"block": block, "strategy": strategy.address}
+            row.update(info.dict())
+            row["totalDebt"] = param[6]
+            row["lastReport"] = param[5]
+            rows.append(row)
+        return rows
+
+
+def format_table(rows):
+    lines = [" ".join(name.rjust(width) for name, width in COLUMNS)]
+    for row in rows:
+        values = {
+            "strategy": row["strategy"],
+            "collatRate": f"{row['collatRate'] / 1e3:.2f}%",
+            "liqDistance": f"{row['liquidationDistance'] / 1e3:.2f}%",
+            "totalAssets": f"{row['estimatedTotalAssets'] / 1e18:.4f}",
+            "totalDebt": f"{row['totalDebt'] / 1e18:.4f}",
+            "investment": f"{row['valueOfInvestment'] / 1e18:.2f}",
+            "borrowed": f"{row['borrowedAmount'] / 1e18:.2f}",
+        }
+        lines.append(" ".join(values[name].rjust(width) for name, width in COLUMNS))
+    return "\n".join(lines)
+
+
+def _output(rows, output):
+    if output == "json":
+        print(json.dumps(rows))
+    else:
+        print(f"block {rows[0]['block'] if rows else chain.height}")
+        print(format_table(rows))
+
+
+def main(factory_address, output="table", from_block=0):
+    """brownie run monitor main <factory> [table|json] [from_block] --network mainnet"""
+    if output != "json":
+        print(f"You are using the '{network.show_active()}' network")
+    _output(FleetMonitor(factory_address, from_block).poll(), output)
+
+
+def watch(factory_address, output="json", from_block=0):
+    """Polls the fleet on every new block."""
+    monitor = FleetMonitor(factory_address, from_block)
+    for block in chain.new_blocks():
+        _output(monitor.poll(block.number), output)
@@ -0,0 +1,408 @@
+"""
+Vectorised model of the AbracadabraBorrower / RouterStrategy accounting.
+
+The accounting helpers mirror the contracts integer for integer when given Python
+ints or `dtype=object` arrays, and work on float arrays for Monte Carlo runs that
+step thousands of price, interest and yield paths at once.
+
+    brownie run simulation
+"""
+from dataclasses import dataclass, replace
+
+import numpy as np
+
+C_RATE_PRECISION = 10 ** 5
+EXCHANGE_RATE_PRECISION = 10 ** 18
+# MIM lost to rounding when repaying through a BentoBox share, see AbracadabraBorrower
+REPAY_ROUNDING = 2
+
+
+def _array(*xs):
+    # ints become object arrays so the math is as exact as uint256, floats stay floats
+    arrays = [np.asarray(x) for x in xs]
+    return [x if x.dtype.kind == "f" else x.astype(object) for x in arrays]
+
+
+def _where(condition, x, y):
+    # arithmetic on 0-d object arrays gives back Python ints, which np.where would
+    # squeeze into int64
+    x, y = np.asarray(x), np.asarray(y)
+    if "f" not in (x.dtype.kind, y.dtype.kind):
+        x, y = x.astype(object), y.astype(object)
+    return np.where(condition, x, y)
+
+
+def _nonzero(x):
+    return _where(np.equal(x, 0), 1, x)
+
+
+# BoringRebase.sol
+
+
+def to_base(total_elastic, total_base, elastic, round_up=False):
+    total_elastic, total_base, elastic = _array(total_elastic, total_base, elastic)
+    base = elastic * total_base // _nonzero(total_elastic)
+    if round_up:
+        base = base + _where(
+            base * total_elastic // _nonzero(total_base) < elastic, 1, 0
+        )
+    return _where(np.equal(total_elastic, 0), elastic, base)
+
+
+def to_elastic(total_elastic, total_base, base, round_up=False):
+    total_elastic, total_base, base = _array(total_elastic, total_base, base)
+    elastic = base * total_elastic // _nonzero(total_base)
+    if round_up:
+        elastic = elastic + _where(
+            elastic * total_base // _nonzero(total_elastic) < base, 1, 0
+        )
+    return _where(np.equal(total_base, 0), base, elastic)
+
+
+# AbracadabraBorrower.sol
+
+
+def mim_to_collateral(exchange_rate, mim_amount):
+    exchange_rate, mim_amount = _array(exchange_rate, mim_amount)
+    return mim_amount * exchange_rate // EXCHANGE_RATE_PRECISION
+
+
+def collateral_to_mim(exchange_rate, collateral_amount):
+    exchange_rate, collateral_amount = _array(exchange_rate, collateral_amount)
+    return collateral_amount // exchange_rate * EXCHANGE_RATE_PRECISION
+
+
+def collateral_amount(exchange_rate, collateral_share, totals_elastic, totals_base):
+    """collateralAmount(), in MIM"""
+    return to_elastic(
+        totals_elastic, totals_base, collateral_to_mim(exchange_rate, collateral_share)
+    )
+
+
+def borrowed_amount(borrow_part, total_borrow_elastic, total_borrow_base):
+    """borrowedAmount()"""
+    borrow_part, total_borrow_elastic, total_borrow_base = _array(
+        borrow_part, total_borrow_elastic, total_borrow_base
+    )
+    owed = borrow_part * total_borrow_elastic // _nonzero(total_borrow_base)
+    return _where(np.equal(borrow_part, 0), 0, owed)
+
+
+def collat_rate(borrowed, collateral):
+    """currentCRate()"""
+    borrowed, collateral = _array(borrowed, collateral)
+    return _where(
+        np.equal(collateral, 0), 0, borrowed * C_RATE_PRECISION // _nonzero(collateral)
+    )
+
+
+# Deleverage planning, for one position in Python ints
+
+MAX_BPS = 10_000
+FLASH_LOAN_FEE = 50
+FLASH_LOAN_FEE_PRECISION = 10 ** 5
+
+
+@dataclass
+class Position:
+    """CauldronPosition, as _loadPosition() reads it"""
+
+    exchange_rate: int
+    borrow_part: int
+    collateral_share: int
+    total_borrow: tuple  # (elastic, base)
+    collateral_totals: tuple  # (elastic, base)
+
+    @property
+    def collateral_amount(self):
+        return int(
+            collateral_amount(
+                self.exchange_rate, self.collateral_share, *self.collateral_totals
+            )
+        )
+
+    @property
+    def borrowed_amount(self):
+        return int(borrowed_amount(self.borrow_part, *self.total_borrow))
+
+
+@dataclass
+class DeleveragePlan:
+    part: int = 0
+    mim_to_repay: int = 0
+    collateral_share: int = 0
+
+
+def collat_rate_to_keep(target_collat_rate, max_collat_rate):
+    """_collatRateToKeep()"""
+    return target_collat_rate or max_collat_rate - 500
+
+
+def repay_amount(position, part):
+    """_repayAmountOf(): MIM to hold for repaying `part`"""
+    if part == 0:
+        return 0
+    return int(to_elastic(*position.total_borrow, part, round_up=True)) + REPAY_ROUNDING
+
+
+def excess_debt(position, rate):
+    """_excessDebtOf(): MIM owed beyond what `rate` allows"""
+    max_borrow = position.collateral_amount * rate // C_RATE_PRECISION
+    return max(position.borrowed_amount - max_borrow, 0)
+
+
+def plan_deleverage(position, collateral_to_free, rate_to_keep):
+    """_planDeleverage(): repays just enough to keep `rate_to_keep` once the collateral leaves"""
+    plan = DeleveragePlan()
+    plan.collateral_share = min(
+        int(to_base(*position.collateral_totals, collateral_to_free, round_up=True)),
+        position.collateral_share,
+    )
+    if plan.collateral_share == position.collateral_share:
+        # nothing left to borrow against
+        plan.part = position.borrow_part
+    else:
+        left = replace(
+            position, collateral_share=position.collateral_share - plan.collateral_share
+        )
+        max_borrow = left.collateral_amount * rate_to_keep // C_RATE_PRECISION
+        if left.borrowed_amount > max_borrow:
+            plan.part = min(
+                int(
+                    to_base(
+                        *position.total_borrow,
+                        left.borrowed_amount - max_borrow,
+                        round_up=True,
+                    )
+                ),
+                position.borrow_part,
+            )
+    plan.mim_to_repay = repay_amount(position, plan.part)
+    return plan
+
+
+def plan_liquidation(position, collateral_needed, mim_assets, rate_to_keep):
+    """
+    _planLiquidationOf(): MIM held beyond the debt is sold first, the rest of
+    `collateral_needed` is freed by plan_deleverage. Returns (mim_to_sell, plan).
+    """
+    mim_to_sell = 0
+    borrowed = position.borrowed_amount
+    if mim_assets > borrowed:
+        mim_to_sell = min(
+            mim_assets - borrowed,
+            int(collateral_to_mim(position.exchange_rate, collateral_needed)),
+        )
+        covered = int(mim_to_collateral(position.exchange_rate, mim_to_sell))
+        collateral_needed = max(collateral_needed - covered, 0)
+
+    plan = DeleveragePlan()
+    if collateral_needed > 0:
+        plan = plan_deleverage(position, collateral_needed, rate_to_keep)
+    return mim_to_sell, plan
+
+
+def flash_loan_fee(amount):
+    return amount * FLASH_LOAN_FEE // FLASH_LOAN_FEE_PRECISION
+
+
+def collateral_to_repay_loan(exchange_rate, mim_owed, swap_slippage):
+    """_collateralToRepayLoan(): grossed up so a sale at the slippage bound covers the loan"""
+    collateral = int(mim_to_collateral(exchange_rate, mim_owed))
+    return collateral * MAX_BPS // (MAX_BPS - swap_slippage)
+
+
+def flash_loaned_collateral(position, plan, mim_assets, swap_slippage):
+    """Collateral sold to pay back the flash loan of what `mim_assets` does not cover"""
+    if plan.mim_to_repay <= mim_assets:
+        return 0
+    shortfall = plan.mim_to_repay - mim_assets
+    return collateral_to_repay_loan(
+        position.exchange_rate, shortfall + flash_loan_fee(shortfall), swap_slippage
+    )
+
+
+def repay_to_collat_rate(position, rate, balance_of_mim):
+    """_repayToCollatRate(): repays, with the MIM held, the debt above `rate`"""
+    plan = DeleveragePlan()
+    if balance_of_mim <= REPAY_ROUNDING:
+        return plan
+    to_repay = min(excess_debt(position, rate), balance_of_mim - REPAY_ROUNDING)
+    plan.part = min(
+        int(to_base(*position.total_borrow, to_repay)), position.borrow_part
+    )
+    plan.mim_to_repay = repay_amount(position, plan.part)
+    return plan
+
+
+# RouterStrategy.sol
+
+
+def prepare_return(total_debt, total_assets, debt_outstanding, amount_freed, loss):
+    """
+    Profit / loss netting of prepareReturn(), given what liquidatePosition()
+    freed and lost for `debt_outstanding + profit`.
+    """
+    profit = _where(total_debt <= total_assets, total_assets - total_debt, 0)
+    debt_payment = np.minimum(debt_outstanding, amount_freed)
+
+    loss_exceeds = loss > profit
+    net_loss = _where(loss_exceeds, loss - profit, 0)
+    net_profit = _where(loss_exceeds, 0, profit - loss)
+    return net_profit, net_loss, debt_payment
+
+
+# Monte Carlo
+
+
+@dataclass
+class SimulationResult:
+    liquidated: np.ndarray  # per path
+    pnl: np.ndarray  # per path, harvested profit minus reported loss, in collateral
+    harvests: int
+
+    @property
+    def liquidation_probability(self):
+        return float(self.liquidated.mean())
+
+    @property
+    def expected_pnl(self):
+        return float(self.pnl.mean())
+
+    def pnl_percentile(self, q):
+        return float(np.percentile(self.pnl, q))
+
+
+def simulate(
+    n_paths=10_000,
+    n_days=365,
+    steps_per_day=4,
+    harvest_every_days=7,
+    initial_collateral=100.0,
+    initial_price=2_000.0,  # MIM per collateral
+    collateral_volatility=0.8,  # annualised
+    collateral_drift=0.0,
+    borrow_apr=0.015,  # cauldron interest
+    yield_apr=0.05,  # yVault MIM yield
+    max_collat_rate=75_000,
+    target_collat_rate=60_000,
+    band_up=2_500,
+    band_down=2_500,
+    liquidation_penalty=0.1,
+    seed=0,
+):
+    """
+    Steps every path with a lognormal collateral price. The cauldron liquidates a
+    path as soon as its c-rate goes over max_collat_rate. Every harvest reports the
+    profit/loss against the vault debt, then rebalances to the target when the c-rate
+    is out of the band, as adjustPosition does. Amounts are floats in token units.
+    """
+    rng = np.random.default_rng(seed)
+    n_steps = n_days * steps_per_day
+    harvest_every = harvest_every_days * steps_per_day
+    dt = 1 / (365 * steps_per_day)
+
+    price = np.full(n_paths, initial_price)
+    collateral = np.full(n_paths, initial_collateral)
+    debt = collateral * price * target_collat_rate / C_RATE_PRECISION
+    investment = debt.copy()
+    total_debt = collateral.copy()  # vault debt of the strategy, in collateral
+
+    alive = np.ones(n_paths, dtype=bool)
+    liquidated = np.zeros(n_paths, dtype=bool)
+    pnl = np.zeros(n_paths)
+
+    shocks = rng.standard_normal((n_steps, n_paths))
+    drift = (collateral_drift - collateral_volatility ** 2 / 2) * dt
+    diffusion = collateral_volatility * np.sqrt(dt)
+
+    for step in range(1, n_steps + 1):
+        price *= np.exp(drift + diffusion * shocks[step - 1])
+        debt *= 1 + borrow_apr * dt
+        investment *= 1 + yield_apr * dt
+
+        rate = debt / (collateral * price) * C_RATE_PRECISION
+        hit = alive & (rate > max_collat_rate)
+        if hit.any():
+            # the liquidator takes collateral for the debt plus the penalty
+            left = np.maximum(collateral - debt * (1 + liquidation_penalty) / price, 0)
+            assets = left + investment / price
+            pnl = np.where(hit, pnl + assets - total_debt, pnl)
+            liquidated |= hit
+            alive &= ~hit
+
+        if step % harvest_every:
+            continue
+
+        # prepareReturn: profit is taken from the yVault surplus, losses are reported
+        assets = collateral + (investment - debt) / price
+        gain = assets - total_debt
+        realised = np.minimum(
+            np.maximum(gain, 0), np.maximum(investment - debt, 0) / price
+        )
+        reported_loss = np.minimum(gain, 0)
+        investment = np.where(alive, investment - realised * price, investment)
+        pnl = np.where(alive, pnl + realised + reported_loss, pnl)
+        total_debt = np.where(alive, total_debt + reported_loss, total_debt)
+
+        # adjustPosition: back to the target only outside the band
+        rate = debt / (collateral * price) * C_RATE_PRECISION
+        out_of_band = alive & (
+            (rate > target_collat_rate + band_up)
+            | (rate + band_down < target_collat_rate)
+        )
+        delta = collateral * price * target_collat_rate / C_RATE_PRECISION - debt
+        delta = np.maximum(
+            delta, -investment
+        )  # can only repay with what the yVault holds
+        debt = np.where(out_of_band, debt + delta, debt)
+        investment = np.where(out_of_band, investment + delta, investment)
+
+    # still open positions count their unreported result
+    assets = collateral + (investment - debt) / price
+    pnl = np.where(alive, pnl + assets - total_debt, pnl)
+
+    return SimulationResult(
+        liquidated=liquidated, pnl=pnl, harvests=n_steps // harvest_every
+    )
+
+
+def sensitivity(max_collat_rates, target_collat_rates, **kwargs):
+    """
+    Liquidation probability and expected P&L for every (max, target) pair, on the
+    same random paths. Pairs with target + band_up >= max are left as nan.
+    """
+    band_up = kwargs.get("band_up", 2_500)
+    probability = np.full((len(max_collat_rates), len(target_collat_rates)), np.nan)
+    expected_pnl = np.full_like(probability, np.nan)
+
+    for i, max_rate in enumerate(max_collat_rates):
+        for j, target_rate in enumerate(target_collat_rates):
+            if target_rate + band_up >= max_rate:
+                continue
+            result = simulate(
+                max_collat_rate=max_rate, target_collat_rate=target_rate, **kwargs
+            )
+            probability[i, j] = result.liquidation_probability
+            expected_pnl[i, j] = result.expected_pnl
+    return probability, expected_pnl
+
+
+def main(n_paths=10_000):
+    max_rates = [75_000, 85_000, 90_000]
+    target_rates = [40_000, 50_000, 60_000, 70_000]
+    probability, expected_pnl = sensitivity(
+        max_rates, target_rates, n_paths=int(n_paths)
+    )
+
+    header = "max \\ target " + " ".join(f"{t / 1e3:>16.1f}%" for t in target_rates)
+    print("liquidation probability / expected P&L per 100 collateral")
+    print(header)
+    for i, max_rate in enumerate(max_rates):
+        cells = [
+            "{:>17}".format("-")
+            if np.isnan(probability[i, j])
+            else f"{probability[i, j]:>7.2%} {expected_pnl[i, j]:>+9.3f}"
+            for j in range(len(target_rates))
+        ]
+        print(f"{max_rate / 1e3:>12.1f}% " + " ".join(cells))
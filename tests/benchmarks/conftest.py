@@ -0,0 +1,72 @@
+import json
+from pathlib import Path
+
+import pytest
+from brownie import network
+
+BASELINE_PATH = Path(__file__).parent / "gas_baseline.json"
+
+# a path fails once it costs this much more than its recorded baseline
+GAS_TOLERANCE = 0.05
+
+
+class GasBaseline:
+    def __init__(self, path, network_name, update):
+        self.path = path
+        self.network_name = network_name
+        self.update = update
+        self.data = json.loads(path.read_text()) if path.exists() else {}
+        self.measured = {}
+
+    def check(self, name, size, gas_used):
+        key = str(size)
+        self.measured.setdefault(name, {})[key] = gas_used
+        if self.update:
+            return
+
+        baseline = self.data.get(self.network_name, {}).get(name, {}).get(key)
+        if baseline is None:
+            pytest.fail(
+                f"no gas baseline for {name}[{key}] on {self.network_name}, record it with --update-gas-baseline"
+            )
+
+        limit = int(baseline * (1 + GAS_TOLERANCE))
+        assert (
+            gas_used <= limit
+        ), f"{name}[{key}] used {gas_used} gas, baseline {baseline} (+{GAS_TOLERANCE:.0%} = {limit})"
+
+    def save(self):
+        recorded = self.data.setdefault(self.network_name, {})
+        for name, sizes in self.measured.items():
+            recorded.setdefault(name, {}).update(sizes)
+        self.path.write_text(json.dumps(self.data, indent=2, sort_keys=True) + "\n")
+
+
+class GasCheck:
+    """ GasBaseline.check for one test, recording the gas in the junit report """
+
+    def __init__(self, baseline, record_property):
+        self.baseline = baseline
+        self.record_property = record_property
+
+    def check(self, name, size, gas_used):
+        self.record_property(f"gas_{name}[{size}]", gas_used)
+        self.baseline.check(name, size, gas_used)
+
+
+@pytest.fixture(scope="session")
+def gas_baselines(request):
+    # fork and mock gas differ, so baselines are kept per network
+    baseline = GasBaseline(
+        BASELINE_PATH,
+        network.show_active(),
+        request.config.getoption("--update-gas-baseline"),
+    )
+    yield baseline
+    if baseline.update:
+        baseline.save()
+
+
+@pytest.fixture
+def gas_baseline(gas_baselines, record_property):
+    yield GasCheck(gas_baselines, record_property)
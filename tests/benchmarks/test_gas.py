@@ -0,0 +1,199 @@
+import pytest
+from brownie import chain
+
+# position sizes in yvcrvsteth
+SIZES = [10, 100, 500]
+
+
+def produce_gains(mim, mim_whale, destination_vault):
+    mim.transfer(destination_vault, 2_000 * (10 ** mim.decimals()), {"from": mim_whale})
+    chain.sleep(360 + 1)
+    chain.mine(1)
+
+
+@pytest.fixture
+def position(funded_vault, strategy, gov, yvcrvsteth, yvcrvsteth_whale):
+    """ funded_vault resized to `size` yvcrvsteth, then harvested into a position """
+
+    def _open(size):
+        deposited = funded_vault.totalAssets()
+        target = size * 10 ** yvcrvsteth.decimals()
+        if target > deposited:
+            funded_vault.deposit(target - deposited, {"from": yvcrvsteth_whale})
+        elif target < deposited:
+            shares = (
+                funded_vault.balanceOf(yvcrvsteth_whale)
+                * (deposited - target)
+                // deposited
+            )
+            funded_vault.withdraw(
+                shares, yvcrvsteth_whale, 10_000, {"from": yvcrvsteth_whale}
+            )
+        return strategy.harvest({"from": gov})
+
+    yield _open
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_first_harvest(size, position, gas_baseline):
+    tx = position(size)
+    gas_baseline.check("first_harvest", size, tx.gas_used)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_profit_harvest(
+    size, position, strategy, mim, gov, mim_whale, destination_vault, gas_baseline
+):
+    position(size)
+    produce_gains(mim, mim_whale, destination_vault)
+
+    tx = strategy.harvest({"from": gov})
+    assert tx.events["Harvested"]["profit"] > 0
+    gas_baseline.check("profit_harvest", size, tx.gas_used)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_partial_liquidate_position(
+    size, position, vault, yvcrvsteth_whale, gas_baseline
+):
+    position(size)
+
+    # vault has no idle funds, so the withdrawal goes through liquidatePosition
+    tx = vault.withdraw(
+        vault.balanceOf(yvcrvsteth_whale) // 10,
+        yvcrvsteth_whale,
+        10_000,
+        {"from": yvcrvsteth_whale},
+    )
+    gas_baseline.check("partial_liquidate_position", size, tx.gas_used)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_revoke_harvest(
+    size,
+    position,
+    strategy,
+    vault,
+    mim,
+    gov,
+    mim_whale,
+    destination_vault,
+    gas_baseline,
+):
+    position(size)
+    produce_gains(mim, mim_whale, destination_vault)
+
+    vault.revokeStrategy(strategy, {"from": gov})
+    tx = strategy.harvest({"from": gov})
+    gas_baseline.check("revoke_harvest", size, tx.gas_used)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_emergency_exit_harvest(
+    size, position, strategy, mim, gov, mim_whale, destination_vault, gas_baseline
+):
+    position(size)
+    produce_gains(mim, mim_whale, destination_vault)
+
+    # harvest in emergency exit goes through liquidateAllPositions
+    strategy.setEmergencyExit({"from": gov})
+    tx = strategy.harvest({"from": gov})
+    gas_baseline.check("emergency_exit_harvest", size, tx.gas_used)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_prepare_migration(
+    size,
+    position,
+    strategy,
+    vault,
+    destination_vault,
+    strategist,
+    rewards,
+    keeper,
+    abracadabra,
+    factory,
+    collateral_adapter,
+    gov,
+    gas_baseline,
+):
+    position(size)
+
+    clone_tx = factory.cloneMIMMinter(
+        vault,
+        strategist,
+        rewards,
+        keeper,
+        destination_vault,
+        abracadabra,
+        75_000,
+        60_000,
+        collateral_adapter,
+        "ClonedStrategy",
+        {"from": strategist},
+    )
+
+    tx = vault.migrateStrategy(
+        strategy, clone_tx.events["Cloned"]["clone"], {"from": gov}
+    )
+    gas_baseline.check("prepare_migration", size, tx.gas_used)
+
+
+def test_clone_mim_minter(
+    vault,
+    destination_vault,
+    strategist,
+    rewards,
+    keeper,
+    abracadabra,
+    factory,
+    collateral_adapter,
+    gas_baseline,
+):
+    tx = factory.cloneMIMMinter(
+        vault,
+        strategist,
+        rewards,
+        keeper,
+        destination_vault,
+        abracadabra,
+        75_000,
+        60_000,
+        collateral_adapter,
+        "ClonedStrategy",
+        {"from": strategist},
+    )
+    gas_baseline.check("clone_mim_minter", 0, tx.gas_used)
+
+
+@pytest.mark.parametrize("count", [1, 5])
+def test_clone_mim_minter_batch(
+    vault,
+    destination_vault,
+    strategist,
+    rewards,
+    keeper,
+    abracadabra,
+    factory,
+    collateral_adapter,
+    gas_baseline,
+    count,
+):
+    params = [
+        (
+            vault,
+            strategist,
+            rewards,
+            keeper,
+            destination_vault,
+            abracadabra,
+            75_000,
+            60_000,
+            collateral_adapter,
+            f"ClonedStrategy{i}",
+        )
+        for i in range(count)
+    ]
+    salts = [i.to_bytes(32, "big") for i in range(count)]
+    tx = factory.cloneMIMMinterBatch(params, salts, {"from": strategist})
+    gas_baseline.check("clone_mim_minter_batch", count, tx.gas_used)
@@ -1,68 +1,293 @@
 import pytest
-from brownie import config, Contract, ZERO_ADDRESS
+from pathlib import Path
+from types import SimpleNamespace
+
+from brownie import config, network, chain, Contract, ZERO_ADDRESS
+
+# mainnet-fork wiring of the exchangers, see ExchangeAddresses in AbracadabraBorrower.sol
+MAINNET_EXCHANGE_ADDRESSES = (
+    "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2",  # weth
+    "0x6B175474E89094C44Da98b954EedeAC495271d0F",  # dai
+    "0xd9e1cE17f2641f24aE83637ab66a2cca9C378B9F",  # sushiswap router
+    "0x5a6A4D54456819380173272A5E8E9B9904BdF41B",  # curve mim-3crv
+)
+MAINNET_CRV_STETH = "0xDC24316b9AE028F1497c275EB9192a3Ea0f67022"
+
+# mock protocol pricing: 1 yvcrvsteth = 1 steCRV = 1 ETH = 2000 DAI = 2000 MIM
+MOCK_ETH_PRICE = 2_000
+MOCK_EXCHANGE_RATE = 10 ** 18 // MOCK_ETH_PRICE
+
+
+BENCHMARKS_DIR = Path(__file__).parent / "benchmarks"
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--gas-benchmarks",
+        action="store_true",
+        help="run the gas benchmarks in tests/benchmarks against their baseline",
+    )
+    parser.addoption(
+        "--update-gas-baseline",
+        action="store_true",
+        help="rewrite tests/benchmarks/gas_baseline.json with the measured gas",
+    )
+
+
+def pytest_ignore_collect(path, config):
+    # benchmarks only run on request, their baseline is recorded per network
+    if Path(str(path)) == BENCHMARKS_DIR:
+        return not (
+            config.getoption("--gas-benchmarks")
+            or config.getoption("--update-gas-baseline")
+        )
+
+
+def pytest_configure(config):
+    # every xdist worker has its own chain, brownie offsets its port by the worker id,
+    # but they would all rewrite the same gas baseline file
+    if config.getoption("--update-gas-baseline") and config.getoption(
+        "numprocesses", None
+    ):
+        raise pytest.UsageError("record gas baselines without -n")
+
+
+# Stateful fixtures, each one built on the one before it. A test using one reverts
+# to its snapshot, it is built again only once a test has reverted below it.
+STATEFUL_FIXTURES = ["funded_vault", "harvested_strategy"]
+
+
+class ChainStates:
+    """
+    Snapshots of the session deployments and of the stateful fixtures built on them.
+
+    EVM snapshots form a stack, reverting to one drops every one taken after it, so
+    only the stateful fixtures of the last test are kept.
+    """
+
+    def __init__(self):
+        self.names = []  # stateful fixtures built, in STATEFUL_FIXTURES order
+        self.ids = []  # snapshot of the deployments, then one per name
+        self.height = None
+
+    def enter(self, fixturenames):
+        if chain.height != self.height:
+            # session fixtures first set up for this test transacted, they are
+            # deployments too and must not end up in a stateful snapshot
+            if self.names:
+                raise RuntimeError(
+                    f"session fixtures transacted on top of {self.names[-1]}, "
+                    "make it depend on them"
+                )
+            self.ids = [self._snapshot()]
+        names = [name for name in STATEFUL_FIXTURES if name in fixturenames]
+        if len(names) < len(self.names):
+            del self.names[len(names) :]
+            del self.ids[len(names) + 1 :]
+            self.revert()
+        return names
+
+    def push(self, name):
+        self.names.append(name)
+        self.ids.append(self._snapshot())
+
+    def revert(self):
+        # reverting consumes the snapshot, brownie takes a new one of the same state
+        self.ids[-1] = chain._revert(self.ids[-1])
+        self.height = chain.height
+
+    def _snapshot(self):
+        chain.snapshot()
+        return chain._snapshot_id
 
 
-@pytest.fixture(scope="function", autouse=True)
-def isolate(fn_isolation):
-    pass
+@pytest.fixture(scope="session")
+def chain_states():
+    yield ChainStates()
 
 
-@pytest.fixture(scope="function", autouse=True)
-def isolate(fn_isolation):
-    pass
+@pytest.fixture(autouse=True)
+def isolate(request, chain_states):
+    # unlike fn_isolation this never resets the chain between modules, session
+    # fixtures are deployed once and every test reverts to them or to the stateful
+    # fixtures it uses
+    for name in chain_states.enter(request.fixturenames):
+        # before any other fixture of the test, which must not be in the snapshot
+        request.getfixturevalue(name)
+    yield
+    chain_states.revert()
 
 
-@pytest.fixture
-def gov(accounts):
-    yield accounts.at("0xFEB4acf3df3cDEA7399794D0869ef76A6EfAff52", force=True)
+@pytest.fixture(scope="session")
+def use_mocks():
+    # anything that is not a fork runs against the local protocol stand-ins
+    yield "fork" not in network.show_active()
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
+def gov(accounts, use_mocks):
+    if use_mocks:
+        yield accounts[6]
+    else:
+        yield accounts.at("0xFEB4acf3df3cDEA7399794D0869ef76A6EfAff52", force=True)
+
+
+@pytest.fixture(scope="session")
 def user(accounts):
     yield accounts[0]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def rewards(accounts):
     yield accounts[1]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def guardian(accounts):
     yield accounts[2]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def management(accounts):
     yield accounts[3]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def strategist(accounts):
     yield accounts[4]
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def keeper(accounts):
     yield accounts[5]
 
-@pytest.fixture
-def weth_whale(accounts):
-    yield accounts.at("0xc1aae9d18bbe386b102435a8632c8063d31e747c", True)
 
-@pytest.fixture
-def mim_whale(accounts):
-    yield accounts.at("0x5a6a4d54456819380173272a5e8e9b9904bdf41b", True)
+@pytest.fixture(scope="session")
+def mock_protocol(
+    use_mocks,
+    accounts,
+    pm,
+    gov,
+    rewards,
+    guardian,
+    management,
+    MockERC20,
+    MockWETH,
+    MockBentoBox,
+    MockCauldron,
+    MockCurveMetaPool,
+    MockCurveStETHPool,
+    MockUniswapRouter,
+):
+    if not use_mocks:
+        yield None
+        return
 
-@pytest.fixture
+    deployer = accounts[9]
+    mim = deployer.deploy(MockERC20, "Magic Internet Money", "MIM", 18)
+    dai = deployer.deploy(MockERC20, "Dai Stablecoin", "DAI", 18)
+    steth = deployer.deploy(MockERC20, "Liquid staked Ether 2.0", "stETH", 18)
+    weth = deployer.deploy(MockWETH)
+
+    crv_steth = deployer.deploy(MockCurveStETHPool, steth)
+    deployer.transfer(crv_steth, "40 ether")
+    lp_token = MockERC20.at(crv_steth.lp_token())
+
+    Vault = pm(config["dependencies"][0]).Vault
+    yvcrvsteth = guardian.deploy(Vault)
+    yvcrvsteth.initialize(lp_token, gov, rewards, "", "", guardian, management)
+    yvcrvsteth.setDepositLimit(2 ** 256 - 1, {"from": gov})
+
+    crv_mim = deployer.deploy(MockCurveMetaPool, [mim, dai])
+    mim.mint(crv_mim, 10_000_000 * 10 ** 18, {"from": deployer})
+    dai.mint(crv_mim, 10_000_000 * 10 ** 18, {"from": deployer})
+
+    router = deployer.deploy(MockUniswapRouter, weth)
+    router.setRate(weth, dai, MOCK_ETH_PRICE * 10 ** 18, {"from": deployer})
+    router.setRate(dai, weth, MOCK_EXCHANGE_RATE, {"from": deployer})
+    dai.mint(router, 10_000_000 * 10 ** 18, {"from": deployer})
+    deployer.transfer(router, "40 ether")
+
+    bento_box = deployer.deploy(MockBentoBox)
+    cauldron = deployer.deploy(
+        MockCauldron, bento_box, yvcrvsteth, mim, MOCK_EXCHANGE_RATE, 75_000
+    )
+
+    yield SimpleNamespace(
+        mim=mim,
+        dai=dai,
+        steth=steth,
+        weth=weth,
+        lp_token=lp_token,
+        yvcrvsteth=yvcrvsteth,
+        crv_steth=crv_steth,
+        crv_mim=crv_mim,
+        router=router,
+        bento_box=bento_box,
+        cauldron=cauldron,
+    )
+
+
+@pytest.fixture(scope="session")
+def exchange_addresses(mock_protocol):
+    if mock_protocol is None:
+        yield MAINNET_EXCHANGE_ADDRESSES
+    else:
+        yield (
+            mock_protocol.weth,
+            mock_protocol.dai,
+            mock_protocol.router,
+            mock_protocol.crv_mim,
+        )
+
+
+@pytest.fixture(scope="session")
+def collateral_adapter(strategist, yvcrvsteth, mock_protocol, CurveLPYVaultAdapter):
+    crv_steth = MAINNET_CRV_STETH if mock_protocol is None else mock_protocol.crv_steth
+    yield strategist.deploy(CurveLPYVaultAdapter, yvcrvsteth, crv_steth)
+
+
+@pytest.fixture(scope="session")
+def weth_whale(accounts, mock_protocol):
+    if mock_protocol is None:
+        yield accounts.at("0xc1aae9d18bbe386b102435a8632c8063d31e747c", True)
+    else:
+        whale = accounts[7]
+        mock_protocol.weth.deposit({"from": whale, "value": "10 ether"})
+        yield whale
+
+
+@pytest.fixture(scope="session")
+def mim_whale(accounts, mock_protocol):
+    if mock_protocol is None:
+        yield accounts.at("0x5a6a4d54456819380173272a5e8e9b9904bdf41b", True)
+    else:
+        whale = accounts[7]
+        mock_protocol.mim.mint(whale, 10_000_000 * 10 ** 18, {"from": whale})
+        yield whale
+
+
+@pytest.fixture(scope="session")
 def yvusdc_whale(accounts):
     yield accounts.at("0x5934807cc0654d46755ebd2848840b616256c6ef", True)
 
-@pytest.fixture
-def yvcrvsteth_whale(accounts):
-    yield accounts.at("0xf5bce5077908a1b7370b9ae04adc565ebd643966", True)
 
-@pytest.fixture
+@pytest.fixture(scope="session")
+def yvcrvsteth_whale(accounts, mock_protocol):
+    if mock_protocol is None:
+        yield accounts.at("0xf5bce5077908a1b7370b9ae04adc565ebd643966", True)
+    else:
+        whale = accounts[8]
+        amount = 1_000 * 10 ** 18
+        mock_protocol.lp_token.mint(whale, amount, {"from": whale})
+        mock_protocol.lp_token.approve(
+            mock_protocol.yvcrvsteth, amount, {"from": whale}
+        )
+        mock_protocol.yvcrvsteth.deposit(amount, {"from": whale})
+        yield whale
+
+
+@pytest.fixture(scope="session")
 def destination_vault(pm, gov, rewards, guardian, management, mim):
     Vault = pm(config["dependencies"][0]).Vault
     vault = guardian.deploy(Vault)
@@ -70,27 +295,37 @@ def destination_vault(pm, gov, rewards, guardian, management, mim):
     vault.setDepositLimit(2 ** 256 - 1, {"from": gov})
     vault.setManagement(management, {"from": gov})
     yield vault
-    #yield Contract("0x9d409a0A012CFbA9B15F6D4B36Ac57A46966Ab9a")
+    # yield Contract("0x9d409a0A012CFbA9B15F6D4B36Ac57A46966Ab9a")
 
-@pytest.fixture
-def token():
-    token_address = "0xdCD90C7f6324cfa40d7169ef80b12031770B4325" # yvcrvsteth
-    yield Contract(token_address)
 
-@pytest.fixture
+@pytest.fixture(scope="session")
+def token(yvcrvsteth):
+    yield yvcrvsteth
+
+
+@pytest.fixture(scope="session")
 def yvusdc():
-    token_address = "0x5f18c75abdae578b483e5f43f12a39cf75b973a9" # yvusdc
+    token_address = "0x5f18c75abdae578b483e5f43f12a39cf75b973a9"  # yvusdc
     yield Contract(token_address)
 
-@pytest.fixture
-def yvcrvsteth():
-    token_address = "0xdCD90C7f6324cfa40d7169ef80b12031770B4325" # yvcrvsteth
-    yield Contract(token_address)
 
-@pytest.fixture
-def mim():
-    token_address = "0x99d8a9c45b2eca8864373a26d1459e3dff1e17f3"
-    yield Contract(token_address)
+@pytest.fixture(scope="session")
+def yvcrvsteth(mock_protocol):
+    if mock_protocol is None:
+        token_address = "0xdCD90C7f6324cfa40d7169ef80b12031770B4325"  # yvcrvsteth
+        yield Contract(token_address)
+    else:
+        yield mock_protocol.yvcrvsteth
+
+
+@pytest.fixture(scope="session")
+def mim(mock_protocol):
+    if mock_protocol is None:
+        token_address = "0x99d8a9c45b2eca8864373a26d1459e3dff1e17f3"
+        yield Contract(token_address)
+    else:
+        yield mock_protocol.mim
+
 
 @pytest.fixture
 def amount(accounts, token, user):
@@ -101,13 +336,21 @@ def amount(accounts, token, user):
     token.transfer(user, amount, {"from": reserve})
     yield amount
 
-@pytest.fixture
-def abracadabra():
-    yield Contract("0x0BCa8ebcB26502b013493Bf8fE53aA2B1ED401C1")
 
-@pytest.fixture
-def weth():
-    yield Contract("0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2")
+@pytest.fixture(scope="session")
+def abracadabra(mock_protocol):
+    if mock_protocol is None:
+        yield Contract("0x0BCa8ebcB26502b013493Bf8fE53aA2B1ED401C1")
+    else:
+        yield mock_protocol.cauldron
+
+
+@pytest.fixture(scope="session")
+def weth(mock_protocol):
+    if mock_protocol is None:
+        yield Contract("0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2")
+    else:
+        yield mock_protocol.weth
 
 
 @pytest.fixture
@@ -117,12 +360,15 @@ def weth_amout(user, weth):
     yield weth_amout
 
 
-@pytest.fixture
-def health_check():
-    yield Contract("0xddcea799ff1699e98edf118e0629a974df7df012")
+@pytest.fixture(scope="session")
+def health_check(use_mocks):
+    if use_mocks:
+        yield ZERO_ADDRESS
+    else:
+        yield Contract("0xddcea799ff1699e98edf118e0629a974df7df012")
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def vault(pm, gov, rewards, guardian, management, token):
     Vault = pm(config["dependencies"][0]).Vault
     vault = guardian.deploy(Vault)
@@ -131,27 +377,34 @@ def vault(pm, gov, rewards, guardian, management, token):
     vault.setManagement(management, {"from": gov})
     yield vault
 
-@pytest.fixture
-def factory(strategist,
+
+@pytest.fixture(scope="session")
+def factory(
+    strategist,
     vault,
     MIMMinterRouterFactory,
     destination_vault,
-    abracadabra
+    abracadabra,
+    collateral_adapter,
+    exchange_addresses,
 ):
-    factory = strategist.deploy(MIMMinterRouterFactory, vault, destination_vault, "yvcrvsteth-MIM-Minter",
-        abracadabra, 75_000, 65_000, True)
+    factory = strategist.deploy(
+        MIMMinterRouterFactory,
+        vault,
+        destination_vault,
+        "yvcrvsteth-MIM-Minter",
+        abracadabra,
+        75_000,
+        65_000,
+        collateral_adapter,
+        exchange_addresses,
+    )
 
     yield factory
 
-@pytest.fixture
-def strategy(
-    strategist,
-    keeper,
-    vault,
-    gov,
-    health_check,
-    factory
-):
+
+@pytest.fixture(scope="session")
+def strategy(strategist, keeper, vault, gov, health_check, factory):
 
     strategy = Contract(factory.original())
 
@@ -173,3 +426,49 @@ def strategy(
 @pytest.fixture(scope="session")
 def RELATIVE_APPROX():
     yield 1e-5
+
+
+@pytest.fixture
+def funded_vault(
+    chain_states,
+    vault,
+    strategy,
+    mim,
+    mim_whale,
+    yvcrvsteth,
+    yvcrvsteth_whale,
+    abracadabra,
+):
+    """ 100 yvcrvsteth deposited in the vault and MIM to borrow in the cauldron """
+    if "funded_vault" not in chain_states.names:
+        bb = Contract(abracadabra.bentoBox())
+
+        yvcrvsteth.approve(vault, 2 ** 256 - 1, {"from": yvcrvsteth_whale})
+
+        # we need to add money to abra
+        mim.approve(bb, 2 ** 256 - 1, {"from": mim_whale})
+        bb.deposit(
+            mim,
+            mim_whale,
+            abracadabra,
+            1_000_000 * (10 ** mim.decimals()),
+            0,
+            {"from": mim_whale},
+        )
+        vault.deposit(100 * (10 ** yvcrvsteth.decimals()), {"from": yvcrvsteth_whale})
+
+        chain.sleep(360)
+        chain.mine(1)
+        chain_states.push("funded_vault")
+
+    yield vault
+
+
+@pytest.fixture
+def harvested_strategy(chain_states, funded_vault, strategy, gov):
+    """ funded_vault after the first harvest opened the position """
+    if "harvested_strategy" not in chain_states.names:
+        strategy.harvest({"from": gov})
+        chain_states.push("harvested_strategy")
+
+    yield strategy
@@ -2,11 +2,13 @@ import pytest
 from brownie import chain, Wei, reverts, Contract, ZERO_ADDRESS
 
 DUST_THRESHOLD = 1e13
+
+
 def move_funds(vault, dest_vault, strategy, gov, mim, mim_whale):
     print(strategy.name())
 
     tx = strategy.harvest({"from": gov})
-    print(tx.events['Harvested'])
+    print(tx.events["Harvested"])
     assert strategy.balanceOfWant() == 0
     assert strategy.valueOfInvestment() > 0
 
@@ -14,12 +16,12 @@ def move_funds(vault, dest_vault, strategy, gov, mim, mim_whale):
     chain.mine(1)
 
     prev_value = strategy.valueOfInvestment()
-    #produce gains
-    mim.transfer(dest_vault, 2_000*(10**mim.decimals()), {"from": mim_whale})
+    # produce gains
+    mim.transfer(dest_vault, 2_000 * (10 ** mim.decimals()), {"from": mim_whale})
     assert strategy.valueOfInvestment() > prev_value
 
     tx = strategy.harvest({"from": gov})
-    print(tx.events['Harvested'])
+    print(tx.events["Harvested"])
     chain.sleep(360 + 1)
     chain.mine(1)
     assert strategy.balanceOfWant() < DUST_THRESHOLD
@@ -32,7 +34,7 @@ def move_funds(vault, dest_vault, strategy, gov, mim, mim_whale):
 
     vault.revokeStrategy(strategy, {"from": gov})
     tx = strategy.harvest({"from": gov})
-    print(tx.events['Harvested'])
+    print(tx.events["Harvested"])
     total_gain += tx.events["Harvested"]["profit"]
     chain.sleep(360 + 1)
     chain.mine(1)
@@ -42,26 +44,21 @@ def move_funds(vault, dest_vault, strategy, gov, mim, mim_whale):
     assert vault.strategies(strategy).dict()["totalDebt"] == 0
 
 
-def test_original_strategy(strategy, mim, gov, mim_whale, yvcrvsteth_whale, yvcrvsteth, vault, destination_vault):
-
-    vault_token = Contract(vault.token())
-
-    steth = Contract("0xae7ab96520DE3A18E5e111B5EaAb095312D7fE84")
-    abracadabra = Contract("0x0BCa8ebcB26502b013493Bf8fE53aA2B1ED401C1")
-    bb = Contract(abracadabra.bentoBox())
+def test_original_strategy(
+    funded_vault,
+    strategy,
+    mim,
+    gov,
+    mim_whale,
+    yvcrvsteth_whale,
+    yvcrvsteth,
+    vault,
+    destination_vault,
+    abracadabra,
+):
 
-    initial_amount = 100*(10**yvcrvsteth.decimals())
-    # check that address has more than 100 yvusdc
-    assert yvcrvsteth.balanceOf(yvcrvsteth_whale) > 100 * (10 ** yvcrvsteth.decimals())
-
-    vault_token.approve(vault, 2 ** 256 - 1, {"from":yvcrvsteth_whale})
     assert destination_vault.totalAssets() == 0
 
-    #we need to add money to abra
-    mim.approve(bb, 2**256-1, {"from":mim_whale})
-    bb.deposit(mim, mim_whale, abracadabra, 1_000_000*(10**mim.decimals()), 0, {"from":mim_whale})
-    vault.deposit(initial_amount/(yvcrvsteth.pricePerShare()/(10**yvcrvsteth.decimals())), {'from': yvcrvsteth_whale})
-
     assert mim.balanceOf(strategy) == 0
 
     chain.sleep(360)
@@ -70,27 +67,40 @@ def test_original_strategy(strategy, mim, gov, mim_whale, yvcrvsteth_whale, yvcr
     move_funds(vault, destination_vault, strategy, gov, mim, mim_whale)
 
 
-def test_cloned_strategy(strategy, mim, gov, mim_whale, yvcrvsteth_whale, yvcrvsteth, vault, destination_vault, strategist, rewards, keeper, abracadabra, factory):
-
-    vault_token = Contract(vault.token())
-    bb = Contract(abracadabra.bentoBox())
-
-    initial_amount = 100*(10**yvcrvsteth.decimals())
-    # check that address has more than 100 yvusdc
-    assert yvcrvsteth.balanceOf(yvcrvsteth_whale) > 100 * (10 ** yvcrvsteth.decimals())
+def test_cloned_strategy(
+    funded_vault,
+    strategy,
+    mim,
+    gov,
+    mim_whale,
+    yvcrvsteth_whale,
+    yvcrvsteth,
+    vault,
+    destination_vault,
+    strategist,
+    rewards,
+    keeper,
+    abracadabra,
+    factory,
+    collateral_adapter,
+):
 
-    vault_token.approve(vault, 2 ** 256 - 1, {"from":yvcrvsteth_whale})
     assert destination_vault.totalAssets() == 0
 
-    #we need to add money to abra
-    mim.approve(bb, 2**256-1, {"from":mim_whale})
-    bb.deposit(mim, mim_whale, abracadabra, 1_000_000*(10**mim.decimals()), 0, {"from":mim_whale})
-    vault.deposit(initial_amount/(yvcrvsteth.pricePerShare()/(10**yvcrvsteth.decimals())), {'from': yvcrvsteth_whale})
-
     assert mim.balanceOf(strategy) == 0
 
     clone_tx = factory.cloneMIMMinter(
-        vault, strategist, rewards, keeper, destination_vault, abracadabra, 75_000, 60_000, True, "ClonedStrategy", {"from":strategist}
+        vault,
+        strategist,
+        rewards,
+        keeper,
+        destination_vault,
+        abracadabra,
+        75_000,
+        60_000,
+        collateral_adapter,
+        "ClonedStrategy",
+        {"from": strategist},
     )
 
     cloned_strategy = Contract.from_abi(
@@ -116,11 +126,35 @@ def test_cloned_strategy(strategy, mim, gov, mim_whale, yvcrvsteth_whale, yvcrvs
     )
 
 
-
-def test_double_initialize(strategy, mim, gov, mim_whale, yvcrvsteth_whale, yvcrvsteth, vault, destination_vault, strategist, rewards, keeper, abracadabra, factory):
+def test_double_initialize(
+    strategy,
+    mim,
+    gov,
+    mim_whale,
+    yvcrvsteth_whale,
+    yvcrvsteth,
+    vault,
+    destination_vault,
+    strategist,
+    rewards,
+    keeper,
+    abracadabra,
+    factory,
+    collateral_adapter,
+):
 
     clone_tx = factory.cloneMIMMinter(
-        vault, strategist, rewards, keeper, destination_vault, abracadabra, 75_000, 60_000, True, "ClonedStrategy", {"from":strategist}
+        vault,
+        strategist,
+        rewards,
+        keeper,
+        destination_vault,
+        abracadabra,
+        75_000,
+        60_000,
+        collateral_adapter,
+        "ClonedStrategy",
+        {"from": strategist},
     )
 
     cloned_strategy = Contract.from_abi(
@@ -138,3 +172,125 @@ def test_double_initialize(strategy, mim, gov, mim_whale, yvcrvsteth_whale, yvcr
             "name",
             {"from": strategist},
         )
+
+
+def test_copy_configuration(
+    strategy,
+    gov,
+    vault,
+    destination_vault,
+    strategist,
+    rewards,
+    keeper,
+    abracadabra,
+    factory,
+    collateral_adapter,
+):
+    clone_tx = factory.cloneMIMMinter(
+        vault,
+        strategist,
+        rewards,
+        keeper,
+        destination_vault,
+        abracadabra,
+        75_000,
+        60_000,
+        collateral_adapter,
+        "ClonedStrategy",
+        {"from": strategist},
+    )
+
+    cloned_strategy = Contract.from_abi(
+        "Strategy", clone_tx.events["Cloned"]["clone"], strategy.abi
+    )
+
+    strategy.setTargetCollateralRate(55_000, {"from": gov})
+    strategy.setCollateralRateBands(5_000, 4_000, {"from": gov})
+    strategy.setSwapSlippage(150, {"from": gov})
+    strategy.setMaxLoss(10, {"from": gov})
+
+    cloned_strategy.copyConfigurationFrom(strategy, {"from": gov})
+
+    assert cloned_strategy.borrowerConfig() == strategy.borrowerConfig()
+    assert cloned_strategy.targetCollatRate() == 55_000
+    assert cloned_strategy.collatRateBandUp() == 5_000
+    assert cloned_strategy.collatRateBandDown() == 4_000
+    assert cloned_strategy.swapSlippage() == 150
+    assert cloned_strategy.maxLoss() == 10
+    assert cloned_strategy.swapRoutesLength() == strategy.swapRoutesLength()
+    assert cloned_strategy.swapRoutes(0) == strategy.swapRoutes(0)
+
+    # the c-rates only fit within their own range
+    with reverts():
+        strategy.setTargetCollateralRate(75_000, {"from": gov})
+    with reverts():
+        strategy.setMaxLoss(10_001, {"from": gov})
+
+
+def test_copy_configuration_checks_min_mim_to_sell(
+    strategy, gov, strategist, MockBorrowerConfig
+):
+    source = strategist.deploy(MockBorrowerConfig)
+    config = strategy.borrowerConfig().dict()
+
+    # minMIMToSell is stored in 96 bits
+    for min_mim_to_sell in (2 ** 96, 2 ** 256 - 1):
+        config["minMIMToSell"] = min_mim_to_sell
+        source.setBorrowerConfig(tuple(config.values()), {"from": strategist})
+        with reverts("SafeCast: value doesn't fit in 96 bits"):
+            strategy.copyConfigurationFrom(source, {"from": gov})
+
+
+def test_batch_deterministic_clones(
+    strategy,
+    gov,
+    vault,
+    destination_vault,
+    strategist,
+    rewards,
+    keeper,
+    abracadabra,
+    factory,
+    collateral_adapter,
+):
+    params = [
+        (
+            vault,
+            strategist,
+            rewards,
+            keeper,
+            destination_vault,
+            abracadabra,
+            75_000,
+            60_000,
+            collateral_adapter,
+            f"ClonedStrategy{i}",
+        )
+        for i in range(3)
+    ]
+    salts = [i.to_bytes(32, "big") for i in range(3)]
+    predicted = [
+        factory.predictDeterministicAddress(strategist, salt) for salt in salts
+    ]
+
+    # addresses are known, and bound to the deployer, before anything is deployed
+    assert len(set(predicted)) == 3
+    assert factory.predictDeterministicAddress(gov, salts[0]) != predicted[0]
+
+    tx = factory.cloneMIMMinterBatch(params, salts, {"from": strategist})
+    assert [event["clone"] for event in tx.events["Cloned"]] == predicted
+
+    for i, clone in enumerate(predicted):
+        cloned_strategy = Contract.from_abi("Strategy", clone, strategy.abi)
+        assert cloned_strategy.vault() == vault
+        assert cloned_strategy.yVault() == destination_vault
+        assert cloned_strategy.targetCollatRate() == 60_000
+        assert cloned_strategy.exchangeAddresses() == strategy.exchangeAddresses()
+
+    # a salt is used once per deployer
+    with reverts():
+        factory.cloneMIMMinterDeterministic(params[0], salts[0], {"from": strategist})
+
+    salt = (42).to_bytes(32, "big")
+    tx = factory.cloneMIMMinterDeterministic(params[0], salt, {"from": gov})
+    assert tx.return_value == factory.predictDeterministicAddress(gov, salt)
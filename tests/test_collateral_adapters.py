@@ -0,0 +1,86 @@
+import pytest
+from brownie import Contract, config, reverts
+
+
+def round_trip(adapter, collateral, user):
+    tx = adapter.wrap({"from": user, "value": "1 ether"})
+    wrapped = tx.return_value
+    assert wrapped > 0
+    assert collateral.balanceOf(user) == wrapped
+
+    collateral.approve(adapter, wrapped, {"from": user})
+    balance = user.balance()
+    tx = adapter.unwrap(wrapped, {"from": user})
+    eth_out = tx.return_value
+    assert user.balance() == balance + eth_out - tx.gas_used * tx.gas_price
+    assert collateral.balanceOf(user) == 0
+    assert adapter.balance() == 0
+    return eth_out
+
+
+def test_curve_lp_yvault_adapter(collateral_adapter, yvcrvsteth, user):
+    assert collateral_adapter.collateral() == yvcrvsteth
+    eth_out = round_trip(collateral_adapter, yvcrvsteth, user)
+    assert eth_out == pytest.approx(10 ** 18, rel=1e-2)
+
+
+def test_erc20_adapter(
+    strategist, user, weth, exchange_addresses, ERC20Adapter, MockERC20
+):
+    # WETH is wrapped directly, without the router
+    adapter = strategist.deploy(ERC20Adapter, weth, exchange_addresses[2], weth)
+    assert round_trip(adapter, weth, user) == 10 ** 18
+
+    dai = Contract.from_abi("DAI", exchange_addresses[1], MockERC20.abi)
+    adapter = strategist.deploy(ERC20Adapter, dai, exchange_addresses[2], weth)
+    round_trip(adapter, dai, user)
+
+
+def test_yvault_adapter(
+    pm,
+    gov,
+    rewards,
+    guardian,
+    management,
+    strategist,
+    user,
+    weth,
+    exchange_addresses,
+    YVaultAdapter,
+    MockERC20,
+):
+    dai = Contract.from_abi("DAI", exchange_addresses[1], MockERC20.abi)
+    yvdai = guardian.deploy(pm(config["dependencies"][0]).Vault)
+    yvdai.initialize(dai, gov, rewards, "", "", guardian, management)
+    yvdai.setDepositLimit(2 ** 256 - 1, {"from": gov})
+
+    adapter = strategist.deploy(YVaultAdapter, yvdai, exchange_addresses[2], weth)
+    round_trip(adapter, yvdai, user)
+
+
+def test_set_collateral_adapter(
+    strategy,
+    gov,
+    strategist,
+    user,
+    weth,
+    exchange_addresses,
+    collateral_adapter,
+    ERC20Adapter,
+    CurveLPYVaultAdapter,
+):
+    # an adapter of another collateral would break the exchangers
+    adapter = strategist.deploy(ERC20Adapter, weth, exchange_addresses[2], weth)
+    with reverts():
+        strategy.setCollateralAdapter(adapter, {"from": gov})
+
+    replacement = strategist.deploy(
+        CurveLPYVaultAdapter,
+        collateral_adapter.collateral(),
+        collateral_adapter.curvePool(),
+    )
+    with reverts():
+        strategy.setCollateralAdapter(replacement, {"from": user})
+    strategy.setCollateralAdapter(replacement, {"from": gov})
+    assert strategy.collateralAdapter() == replacement
+    assert strategy.borrowerConfig()["collateralAdapter"] == replacement
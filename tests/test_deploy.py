@@ -0,0 +1,47 @@
+import json
+
+from brownie import accounts, history
+from scripts import deploy
+
+
+def test_batch_deployment(
+    factory, vault, destination_vault, abracadabra, collateral_adapter, tmp_path
+):
+    manifest = {
+        "account": 0,
+        "batch_size": 2,
+        "factory": {"address": factory.address},
+        "defaults": {
+            "vault": vault.address,
+            "yVault": destination_vault.address,
+            "abracadabra": abracadabra.address,
+            "max_collat_rate": 75_000,
+            "target_collat_rate": 60_000,
+            "collateral_adapter": collateral_adapter.address,
+        },
+        "strategies": [{"name": f"Strategy{i}"} for i in range(3)],
+    }
+    path = tmp_path / "manifest.json"
+    path.write_text(json.dumps(manifest))
+
+    deployed = deploy.batch(str(path))
+    assert list(deployed) == ["Strategy0", "Strategy1", "Strategy2"]
+    for name, address in deployed.items():
+        assert address == factory.predictDeterministicAddress(
+            accounts[0], deploy._salt(name)
+        )
+
+    # everything is in the state file, a rerun sends nothing
+    txs = len(history)
+    assert deploy.batch(str(path)) == deployed
+    assert len(history) == txs
+
+    # clones mined by a run that died before saving are picked up, not redeployed
+    state_path = tmp_path / "manifest.json.state.json"
+    state = json.loads(state_path.read_text())
+    for network_state in state.values():
+        del network_state["strategies"]["Strategy2"]
+    state_path.write_text(json.dumps(state))
+
+    assert deploy.batch(str(path)) == deployed
+    assert len(history) == txs
@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+from brownie import chain, web3
+from prometheus_client import generate_latest
+from scripts.exporter import Exporter, Metrics
+from scripts.keeper import Keeper
+
+
+def test_exporter(funded_vault, strategy, gov, keeper, factory, tmp_path):
+    metrics = Metrics()
+    exporter = Exporter(factory, metrics, str(tmp_path / "indexer.db"))
+    bot = Keeper(factory, keeper, max_gas_price=10 ** 15, metrics=metrics)
+
+    results = asyncio.run(bot.run_once())
+    harvest = results[0][1]
+    exporter.scrape()
+    exporter.scrape()
+
+    def value(name, **labels):
+        return metrics.registry.get_sample_value(name, labels)
+
+    labels = {"strategy": strategy.address, "vault": strategy.vault()}
+    assert value("mim_strategy_collat_rate", **labels) == pytest.approx(
+        strategy.currentCRate() / 1e5
+    )
+    assert value("mim_strategy_estimated_total_assets", **labels) == pytest.approx(
+        strategy.estimatedTotalAssets() / 1e18
+    )
+    assert value("mim_strategy_bentobox_balance", token="mim", **labels) is not None
+    assert value("mim_strategy_liquidation_distance", **labels) > 0
+
+    # the harvest is counted once, however many scrapes saw it
+    assert value("mim_strategy_harvests_total", strategy=strategy.address) == 1
+    assert (
+        value("mim_strategy_harvest_gas_sum", strategy=strategy.address)
+        == harvest.gas_used
+    )
+    assert value("mim_keeper_confirmation_seconds_count", action="harvest") == 1
+
+    # RPC latency is observed per method once the middleware is in
+    web3.middleware_onion.add(metrics.rpc_middleware, "metrics")
+    try:
+        exporter.scrape()
+    finally:
+        web3.middleware_onion.remove("metrics")
+    assert value("mim_exporter_rpc_seconds_count", method="eth_call") > 0
+    assert b"mim_exporter_block" in generate_latest(metrics.registry)
@@ -0,0 +1,21 @@
+import pytest
+from scripts.gas_profile import profile
+
+
+def test_gas_profile(funded_vault, strategy, gov):
+    tx = strategy.harvest({"from": gov})
+    result = profile(tx)
+
+    # every frame's self gas adds up to what the trace executed, refunds aside
+    assert result.traced_gas == pytest.approx(tx.gas_used, rel=0.2)
+
+    # the harvest is the root, the Cauldron cook is an external call under it
+    root = next(iter(result.stacks)).split(";")[0]
+    assert root.endswith("harvest")
+    assert any(label.endswith(".cook") for label in result.external)
+    assert all(
+        result.inclusive[label] >= result.self_gas[label] for label in result.inclusive
+    )
+
+    folded = result.collapsed()
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in folded.splitlines())
@@ -0,0 +1,78 @@
+from brownie import Contract, chain
+from scripts.indexer import EventIndexer
+
+
+def test_indexer(
+    funded_vault,
+    strategy,
+    mim,
+    gov,
+    mim_whale,
+    vault,
+    destination_vault,
+    strategist,
+    rewards,
+    keeper,
+    abracadabra,
+    factory,
+    collateral_adapter,
+    tmp_path,
+):
+    db_path = str(tmp_path / "indexer.db")
+
+    first = strategy.harvest({"from": gov})
+    clone_tx = factory.cloneMIMMinter(
+        vault,
+        strategist,
+        rewards,
+        keeper,
+        destination_vault,
+        abracadabra,
+        75_000,
+        60_000,
+        collateral_adapter,
+        "ClonedStrategy",
+        {"from": strategist},
+    )
+    clone = clone_tx.events["Cloned"]["clone"]
+
+    # produce gains
+    mim.transfer(destination_vault, 2_000 * (10 ** mim.decimals()), {"from": mim_whale})
+    chain.sleep(360 + 1)
+    chain.mine(1)
+    second = strategy.harvest({"from": gov})
+
+    # small ranges so the sync walks several checkpoints
+    indexer = EventIndexer(factory, db_path, max_range=5)
+    assert indexer.sync() == chain.height
+    assert set(indexer.strategies) == {strategy.address, clone}
+
+    harvests = indexer.harvest_gas(strategy)
+    assert [h["tx_hash"] for h in harvests] == [first.txid, second.txid]
+    assert [h["gas_used"] for h in harvests] == [first.gas_used, second.gas_used]
+    assert indexer.harvest_gas(clone) == []
+
+    pnl = indexer.pnl()
+    params = vault.strategies(strategy).dict()
+    assert pnl[strategy.address]["gain"] == params["totalGain"]
+    assert pnl[strategy.address]["loss"] == params["totalLoss"]
+    assert pnl[strategy.address]["reports"] == 2
+    assert pnl[clone]["reports"] == 0
+
+    history = indexer.collat_rate_history(strategy)
+    assert [row["collatRate"] for row in history] == [
+        first.events["Rebalanced"]["collatRate"],
+        second.events["Rebalanced"]["collatRate"],
+    ]
+
+    # a new indexer on the same database resumes from the checkpoint
+    third = strategy.harvest({"from": gov})
+    resumed = EventIndexer(factory, db_path)
+    assert resumed.next_block == indexer.next_block
+    resumed.sync()
+    assert [h["tx_hash"] for h in resumed.harvest_gas(strategy)] == [
+        first.txid,
+        second.txid,
+        third.txid,
+    ]
+    assert resumed.pnl()[strategy.address]["reports"] == 3
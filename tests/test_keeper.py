@@ -0,0 +1,55 @@
+import asyncio
+
+from scripts.keeper import Job, Keeper
+
+
+def test_keeper(funded_vault, strategy, gov, keeper, factory):
+    bot = Keeper(factory, keeper, max_gas_price=10 ** 15)
+
+    # funds wait in the vault, the keeper harvests them
+    results = asyncio.run(bot.run_once())
+    assert [(job.strategy.address, job.action) for job, _ in results] == [
+        (strategy.address, "harvest")
+    ]
+    assert results[0][1].status == 1
+    assert bot.pending == {}
+
+    # on target, nothing to do
+    assert asyncio.run(bot.run_once()) == []
+
+    # target lowered, the position is now above the band and must repay
+    strategy.setTargetCollateralRate(
+        strategy.targetCollatRate() - 10_000, {"from": gov}
+    )
+    borrowed = strategy.borrowedAmount()
+    results = asyncio.run(bot.run_once())
+    assert [(job.strategy.address, job.action) for job, _ in results] == [
+        (strategy.address, "tend")
+    ]
+    assert strategy.borrowedAmount() < borrowed
+
+
+def test_keeper_gas_limits(funded_vault, strategy, keeper, factory):
+    # above the gas price cap only positions close to liquidation are served
+    bot = Keeper(
+        factory, keeper, max_gas_price=0, urgent_gas_price=10 ** 15, urgent_distance=0
+    )
+    assert asyncio.run(bot.run_once()) == []
+
+    urgent = Job(None, "harvest", 0)
+    assert bot.allowed(urgent, 10 ** 9)
+    assert not bot.allowed(urgent, 10 ** 16)
+    assert not bot.allowed(Job(None, "harvest", 1), 10 ** 9)
+
+    # closest to maxCollatRate first, tends first at equal distance
+    jobs = [
+        Job(None, "harvest", 20_000),
+        Job(None, "harvest", 5_000),
+        Job(None, "tend", 5_000),
+    ]
+    ordered = sorted(jobs, key=lambda job: job.priority)
+    assert [(job.action, job.liquidation_distance) for job in ordered] == [
+        ("tend", 5_000),
+        ("harvest", 5_000),
+        ("harvest", 20_000),
+    ]
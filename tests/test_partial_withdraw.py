@@ -0,0 +1,27 @@
+import pytest
+
+DUST_THRESHOLD = 10_000
+
+
+def test_partial_withdraw(harvested_strategy, mim, yvcrvsteth_whale, vault):
+    """ A partial withdrawal should repay only the matching share of the debt """
+    strategy = harvested_strategy
+
+    prev_borrowed = strategy.borrowedAmount()
+    prev_collateral = strategy.collateralAmount()
+    prev_c_rate = strategy.currentCRate()
+    assert prev_borrowed > 0
+
+    # vault holds no idle funds, so this goes through liquidatePosition
+    vault.withdraw(
+        vault.balanceOf(yvcrvsteth_whale) // 10,
+        yvcrvsteth_whale,
+        10_000,
+        {"from": yvcrvsteth_whale},
+    )
+
+    # about a tenth of the debt is repaid and the position stays on its c-rate
+    assert strategy.borrowedAmount() == pytest.approx(prev_borrowed * 0.9, rel=1e-2)
+    assert strategy.collateralAmount() == pytest.approx(prev_collateral * 0.9, rel=1e-2)
+    assert strategy.currentCRate() == pytest.approx(prev_c_rate, rel=1e-2)
+    assert mim.balanceOf(strategy) < DUST_THRESHOLD
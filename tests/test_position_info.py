@@ -0,0 +1,27 @@
+import pytest
+from brownie import Contract
+
+
+def test_position_info(harvested_strategy, mim, yvcrvsteth, abracadabra):
+    strategy = harvested_strategy
+    bb = Contract(abracadabra.bentoBox())
+
+    info = strategy.positionInfo().dict()
+
+    # one call matches every separate view
+    assert info["collatRate"] == strategy.currentCRate()
+    assert info["collateralAmount"] == strategy.collateralAmount()
+    assert info["borrowedAmount"] == strategy.borrowedAmount()
+    assert info["valueOfInvestment"] == strategy.valueOfInvestment()
+    assert info["balanceOfWant"] == strategy.balanceOfWant()
+    assert info["balanceOfMIM"] == mim.balanceOf(strategy)
+    assert info["balanceOfMIMInBentoBox"] == bb.balanceOf(mim, strategy)
+    assert info["balanceOfCollateralInBentoBox"] == bb.balanceOf(yvcrvsteth, strategy)
+    assert info["estimatedTotalAssets"] == strategy.estimatedTotalAssets()
+    assert info["exchangeRate"] == abracadabra.exchangeRate()
+
+    # 65% c-rate against a 75% max leaves about 13% of price drop
+    assert info["liquidationDistance"] == pytest.approx(
+        100_000 - info["collatRate"] * 100_000 // 75_000, abs=1
+    )
+    assert info["liquidationDistance"] > 0
@@ -0,0 +1,92 @@
+import pytest
+from brownie import chain
+
+
+def test_preview_harvest(
+    harvested_strategy, mim, gov, mim_whale, vault, destination_vault
+):
+    strategy = harvested_strategy
+
+    # produce gains
+    mim.transfer(destination_vault, 2_000 * (10 ** mim.decimals()), {"from": mim_whale})
+    chain.sleep(360 + 1)
+    chain.mine(1)
+
+    preview = strategy.previewHarvest().dict()
+    tx = strategy.harvest({"from": gov})
+    assert preview["profit"] == pytest.approx(
+        tx.events["Harvested"]["profit"], rel=1e-2
+    )
+    assert preview["loss"] == tx.events["Harvested"]["loss"] == 0
+    assert preview["debtPayment"] == tx.events["Harvested"]["debtPayment"] == 0
+
+    # half of the debt is called back, the preview sizes the repayment
+    vault.updateStrategyDebtRatio(strategy, 5_000, {"from": gov})
+    chain.sleep(360 + 1)
+    chain.mine(1)
+
+    borrowed = strategy.borrowedAmount()
+    preview = strategy.previewHarvest().dict()
+    assert preview["mimToRepay"] > 0
+    tx = strategy.harvest({"from": gov})
+    assert preview["debtPayment"] == pytest.approx(
+        tx.events["Harvested"]["debtPayment"], rel=1e-2
+    )
+    assert preview["mimToRepay"] == pytest.approx(
+        borrowed - strategy.borrowedAmount(), rel=1e-2
+    )
+
+    # emergency exit previews a full unwind
+    strategy.setEmergencyExit({"from": gov})
+    preview = strategy.previewHarvest().dict()
+    tx = strategy.harvest({"from": gov})
+    assert preview["debtPayment"] == pytest.approx(
+        tx.events["Harvested"]["debtPayment"], rel=1e-2
+    )
+
+
+def test_preview_emergency_exit(
+    harvested_strategy, mim, gov, mim_whale, destination_vault
+):
+    strategy = harvested_strategy
+
+    # the yVault covers the whole debt, the MIM over it is sold back
+    mim.transfer(destination_vault, 2_000 * (10 ** mim.decimals()), {"from": mim_whale})
+    strategy.setEmergencyExit({"from": gov})
+
+    borrowed = strategy.borrowedAmount()
+    preview = strategy.previewHarvest().dict()
+    assert preview["mimToRepay"] == pytest.approx(borrowed, rel=1e-3)
+    assert preview["collateralToSell"] == 0
+
+    tx = strategy.harvest({"from": gov})
+    assert strategy.borrowedAmount() == 0
+    assert preview["profit"] == pytest.approx(
+        tx.events["Harvested"]["profit"], rel=1e-2
+    )
+    assert preview["loss"] == tx.events["Harvested"]["loss"] == 0
+    assert preview["debtPayment"] == pytest.approx(
+        tx.events["Harvested"]["debtPayment"], rel=1e-2
+    )
+
+
+def test_preview_emergency_exit_with_shortfall(
+    harvested_strategy, use_mocks, mim, gov, destination_vault
+):
+    if not use_mocks:
+        pytest.skip("burns MIM out of the destination vault")
+    strategy = harvested_strategy
+
+    # the yVault lost a tenth, a flash loan repays the rest of the debt
+    mim.burn(destination_vault, mim.balanceOf(destination_vault) // 10, {"from": gov})
+    strategy.setEmergencyExit({"from": gov})
+
+    preview = strategy.previewHarvest().dict()
+    assert preview["collateralToSell"] > 0
+
+    tx = strategy.harvest({"from": gov})
+    assert strategy.borrowedAmount() == 0
+    assert preview["loss"] == pytest.approx(tx.events["Harvested"]["loss"], rel=1e-2)
+    assert preview["debtPayment"] == pytest.approx(
+        tx.events["Harvested"]["debtPayment"], rel=1e-2
+    )
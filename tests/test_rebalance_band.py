@@ -0,0 +1,73 @@
+import pytest
+from brownie import chain, reverts
+
+PARK, LEVER, DELEVERAGE = 0, 1, 2
+
+
+def test_rebalance_band(funded_vault, strategy, gov, yvcrvsteth_whale, yvcrvsteth):
+    vault = funded_vault
+    initial_amount = 100 * (10 ** yvcrvsteth.decimals())
+
+    # empty position levers up to the target
+    tx = strategy.harvest({"from": gov})
+    assert tx.events["Rebalanced"]["action"] == LEVER
+    assert strategy.currentCRate() == pytest.approx(
+        strategy.targetCollatRate(), rel=1e-3
+    )
+
+    # a small deposit keeps the c-rate inside the band, the collateral is only parked
+    borrowed = strategy.borrowedAmount()
+    vault.deposit(initial_amount // 100, {"from": yvcrvsteth_whale})
+    chain.sleep(360)
+    chain.mine(1)
+
+    tx = strategy.harvest({"from": gov})
+    assert tx.events["Rebalanced"]["action"] == PARK
+    assert strategy.borrowedAmount() == pytest.approx(borrowed, rel=1e-3)
+    assert strategy.currentCRate() < strategy.targetCollatRate()
+
+    # target raised, the position is now below the band and levers up
+    strategy.setTargetCollateralRate(strategy.targetCollatRate() + 5_000, {"from": gov})
+    tx = strategy.harvest({"from": gov})
+    assert tx.events["Rebalanced"]["action"] == LEVER
+    assert strategy.currentCRate() == pytest.approx(
+        strategy.targetCollatRate(), rel=1e-3
+    )
+
+    # target lowered, the position is now above the band and repays down to it
+    strategy.setTargetCollateralRate(
+        strategy.targetCollatRate() - 10_000, {"from": gov}
+    )
+    tx = strategy.harvest({"from": gov})
+    assert tx.events["Rebalanced"]["action"] == DELEVERAGE
+    assert strategy.currentCRate() == pytest.approx(
+        strategy.targetCollatRate(), rel=1e-3
+    )
+
+    # widening the band leaves the position alone
+    strategy.setCollateralRateBands(9_000, 9_000, {"from": gov})
+    strategy.setTargetCollateralRate(strategy.targetCollatRate() + 5_000, {"from": gov})
+    tx = strategy.harvest({"from": gov})
+    assert tx.events["Rebalanced"]["action"] == PARK
+
+
+def test_collat_rate_band_bounds(strategy, gov):
+    max_collat_rate = strategy.borrowerConfig()["maxCollatRate"]
+    band_up, band_down = strategy.collatRateBandUp(), strategy.collatRateBandDown()
+
+    # a target moving the band past the max c-rate or below zero is rejected
+    with reverts():
+        strategy.setTargetCollateralRate(max_collat_rate - band_up, {"from": gov})
+    with reverts():
+        strategy.setTargetCollateralRate(band_down - 1, {"from": gov})
+
+    strategy.setTargetCollateralRate(max_collat_rate - band_up - 1, {"from": gov})
+    assert strategy.targetCollatRate() == max_collat_rate - band_up - 1
+    strategy.setTargetCollateralRate(band_down, {"from": gov})
+    assert strategy.targetCollatRate() == band_down
+
+    # and so are bands doing the same around the target
+    with reverts():
+        strategy.setCollateralRateBands(max_collat_rate - band_down, 0, {"from": gov})
+    with reverts():
+        strategy.setCollateralRateBands(0, band_down + 1, {"from": gov})
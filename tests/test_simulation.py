@@ -0,0 +1,185 @@
+import numpy as np
+import pytest
+from brownie import Contract, chain
+from scripts import simulation
+
+
+def test_simulation_matches_contracts(
+    harvested_strategy,
+    mim,
+    gov,
+    mim_whale,
+    yvcrvsteth,
+    vault,
+    destination_vault,
+    abracadabra,
+):
+    """ The model reproduces the on-chain accounting to the wei """
+    strategy = harvested_strategy
+    bb = Contract(abracadabra.bentoBox())
+
+    # let interest accrue so totalBorrow elastic and base diverge
+    chain.sleep(30 * 24 * 3600)
+    chain.mine(1)
+    abracadabra.accrue({"from": gov})
+
+    exchange_rate = abracadabra.exchangeRate()
+    borrow_part = abracadabra.userBorrowPart(strategy)
+    collateral_share = abracadabra.userCollateralShare(strategy)
+    total_borrow = abracadabra.totalBorrow()
+    totals = bb.totals(yvcrvsteth)
+
+    borrowed = simulation.borrowed_amount(borrow_part, total_borrow[0], total_borrow[1])
+    collateral = simulation.collateral_amount(
+        exchange_rate, collateral_share, totals[0], totals[1]
+    )
+    assert borrowed == strategy.borrowedAmount()
+    assert collateral == strategy.collateralAmount()
+    assert simulation.collat_rate(borrowed, collateral) == strategy.currentCRate()
+
+    # the same shares through BentoBox itself
+    for amount in [1, 10 ** 9 + 7, 12_345 * 10 ** 18]:
+        assert simulation.to_base(totals[0], totals[1], amount, True) == bb.toShare(
+            yvcrvsteth, amount, True
+        )
+        assert simulation.to_elastic(
+            totals[0], totals[1], amount, False
+        ) == bb.toAmount(yvcrvsteth, amount, False)
+
+    # produce gains, the harvest preview nets them the way the model does
+    mim.transfer(destination_vault, 2_000 * (10 ** mim.decimals()), {"from": mim_whale})
+    chain.sleep(360 + 1)
+    chain.mine(1)
+
+    total_debt = vault.strategies(strategy).dict()["totalDebt"]
+    total_assets = strategy.estimatedTotalAssets()
+    expected_profit, expected_loss, _ = simulation.prepare_return(
+        total_debt, total_assets, 0, 0, 0
+    )
+    preview = strategy.previewHarvest().dict()
+    assert expected_profit > 0
+    assert preview["profit"] == expected_profit
+    assert preview["loss"] == expected_loss == 0
+
+
+YEAR = 365 * 24 * 3600
+
+
+def load_position(strategy, abracadabra, bb, yvcrvsteth):
+    """ _loadPosition() """
+    return simulation.Position(
+        abracadabra.exchangeRate(),
+        abracadabra.userBorrowPart(strategy),
+        abracadabra.userCollateralShare(strategy),
+        tuple(abracadabra.totalBorrow()),
+        tuple(bb.totals(yvcrvsteth)),
+    )
+
+
+@pytest.fixture
+def accrued_position(harvested_strategy, use_mocks, abracadabra, gov):
+    """ harvested_strategy with a month of interest, accrued, then interest stopped """
+    if not use_mocks:
+        pytest.skip("sets the interest of the mock cauldron")
+    abracadabra.setInterestPerSecond(10 ** 18 // 10 // YEAR, {"from": gov})
+    chain.sleep(30 * 24 * 3600)
+    # accrues the month, nothing accrues after it
+    abracadabra.setInterestPerSecond(0, {"from": gov})
+    total_borrow = abracadabra.totalBorrow()
+    assert total_borrow[0] > total_borrow[1]
+    yield harvested_strategy
+
+
+def test_liquidation_planning_matches_contracts(
+    accrued_position, mim, gov, yvcrvsteth, vault, destination_vault, abracadabra
+):
+    """ _planLiquidationOf and the flash loan sizing, as previewHarvest reports them """
+    strategy = accrued_position
+    bb = Contract(abracadabra.bentoBox())
+    config = strategy.borrowerConfig().dict()
+    rate_to_keep = simulation.collat_rate_to_keep(
+        config["targetCollatRate"], config["maxCollatRate"]
+    )
+
+    def planned():
+        position = load_position(strategy, abracadabra, bb, yvcrvsteth)
+        debt_outstanding = vault.debtOutstanding(strategy)
+        total_debt = vault.strategies(strategy).dict()["totalDebt"]
+        profit, _, _ = simulation.prepare_return(
+            total_debt, strategy.estimatedTotalAssets(), debt_outstanding, 0, 0
+        )
+        mim_assets = (
+            strategy.valueOfInvestment()
+            + mim.balanceOf(strategy)
+            + bb.balanceOf(mim, strategy)
+        )
+        _, plan = simulation.plan_liquidation(
+            position,
+            debt_outstanding + int(profit) - yvcrvsteth.balanceOf(strategy),
+            mim_assets,
+            rate_to_keep,
+        )
+        collateral_to_sell = simulation.flash_loaned_collateral(
+            position, plan, mim_assets, config["swapSlippage"]
+        )
+        return plan.mim_to_repay, collateral_to_sell
+
+    # half of the debt is called back, the yVault covers the repayment
+    vault.updateStrategyDebtRatio(strategy, 5_000, {"from": gov})
+    mim_to_repay, collateral_to_sell = planned()
+    preview = strategy.previewHarvest().dict()
+    assert mim_to_repay > 0
+    assert preview["mimToRepay"] == mim_to_repay
+    assert preview["collateralToSell"] == collateral_to_sell == 0
+
+    # the yVault lost most of its MIM, only the shortfall is flash loaned
+    mim.burn(
+        destination_vault, mim.balanceOf(destination_vault) * 9 // 10, {"from": gov}
+    )
+    mim_to_repay, collateral_to_sell = planned()
+    preview = strategy.previewHarvest().dict()
+    assert collateral_to_sell > 0
+    assert preview["mimToRepay"] == mim_to_repay
+    assert preview["collateralToSell"] == collateral_to_sell
+
+
+def test_repay_to_collat_rate_matches_contracts(
+    accrued_position, mim, gov, keeper, yvcrvsteth, abracadabra
+):
+    """ the part a tend repays once the target moved below the c-rate """
+    strategy = accrued_position
+    bb = Contract(abracadabra.bentoBox())
+    strategy.setTargetCollateralRate(
+        strategy.targetCollatRate() - 10_000, {"from": gov}
+    )
+
+    # no idle collateral to park, the position is the one the repay sees
+    assert yvcrvsteth.balanceOf(strategy) == 0
+    position = load_position(strategy, abracadabra, bb, yvcrvsteth)
+    # the tend frees at least the excess debt from the yVault
+    plan = simulation.repay_to_collat_rate(
+        position, strategy.targetCollatRate(), strategy.valueOfInvestment()
+    )
+    assert plan.part > 0
+
+    strategy.tend({"from": keeper})
+    assert abracadabra.userBorrowPart(strategy) == position.borrow_part - plan.part
+
+
+def test_simulation_is_vectorised():
+    collateral_share = np.array([10 ** 20, 0, 5 * 10 ** 19], dtype=object)
+    collateral = simulation.collateral_amount(
+        10 ** 18 // 2_000, collateral_share, 10 ** 21, 10 ** 21
+    )
+    assert list(collateral) == [200_000 * 10 ** 18, 0, 100_000 * 10 ** 18]
+
+    result = simulation.simulate(n_paths=1_000, n_days=30)
+    assert result.liquidated.shape == (1_000,)
+    assert 0 <= result.liquidation_probability <= 1
+
+    # more leverage can only liquidate more of the same paths
+    probability, _ = simulation.sensitivity(
+        [75_000], [40_000, 60_000, 80_000], n_paths=1_000, n_days=30
+    )
+    assert probability[0, 0] <= probability[0, 1]
+    assert np.isnan(probability[0, 2])
@@ -0,0 +1,288 @@
+import time
+from collections import Counter
+
+import pytest
+from brownie import Contract, chain
+from brownie.test import strategy as st
+from scripts import simulation
+
+DUST_THRESHOLD = 10_000
+WAD = 10 ** 18
+# exchange-rate moves stay within this band around the starting price, so a
+# position at the top of its c-rate band is never worth less than its debt
+MAX_RATE_UP = 115
+MAX_RATE_DOWN = 87
+YEAR = 365 * 24 * 3600
+
+
+class StrategyStateMachine:
+    """
+    Random sequences of vault, strategy and market operations on the mock
+    protocol, checking the accounting invariants after every step. A revoke or
+    emergency exit retires the strategy; the next harvest unwinds it.
+    """
+
+    st_amount = st("uint256", min_value=1, max_value=20)  # yvcrvsteth
+    st_percent = st("uint256", min_value=1, max_value=100)
+    st_gain = st("uint256", min_value=1, max_value=2_000)  # MIM
+    st_loss = st("uint256", min_value=1, max_value=20)  # tenths of a percent
+    st_move = st("int", min_value=-5, max_value=5)  # percent
+    st_apr = st("uint256", min_value=0, max_value=2_000)  # bps
+    st_seconds = st("uint256", min_value=60, max_value=30 * 24 * 3600)
+    st_target = st("uint256", min_value=40_000, max_value=65_000)
+
+    def __init__(
+        cls,
+        accounts,
+        protocol,
+        vault,
+        destination_vault,
+        strategy,
+        factory,
+        collateral_adapter,
+        whales,
+        ops,
+    ):
+        cls.gov, cls.strategist, cls.rewards, cls.keeper = accounts
+        cls.protocol = protocol
+        cls.vault = vault
+        cls.destination_vault = destination_vault
+        cls.original = strategy
+        cls.factory = factory
+        cls.collateral_adapter = collateral_adapter
+        cls.mim_whale, cls.yvcrvsteth_whale = whales
+        cls.ops = ops
+        cls.initial_rate = protocol.cauldron.exchangeRate()
+
+    def setup(self):
+        self.strategy = self.original
+        # revoked or in emergency exit, and whether a harvest has unwound it since
+        self.retired = False
+        self.emergency = False
+        self.unwound = False
+        # only gains happened, so the vault must not have booked a loss
+        self.lossless = True
+        self.clones = 0
+
+    # vault users
+
+    def rule_deposit(self, st_amount):
+        amount = st_amount * WAD
+        if self.protocol.yvcrvsteth.balanceOf(self.yvcrvsteth_whale) < amount:
+            return
+        self.ops["deposit"] += 1
+        self.vault.deposit(amount, {"from": self.yvcrvsteth_whale})
+
+    def rule_withdraw(self, st_percent):
+        shares = self.vault.balanceOf(self.yvcrvsteth_whale) * st_percent // 100
+        if shares == 0:
+            return
+        self.ops["withdraw"] += 1
+        # freeing collateral may pay a flash loan fee, a loss for the depositor
+        self.lossless = False
+        self.vault.withdraw(
+            shares, self.yvcrvsteth_whale, 10_000, {"from": self.yvcrvsteth_whale}
+        )
+
+    # keepers and management
+
+    def rule_harvest(self):
+        self.ops["harvest"] += 1
+        self.strategy.harvest({"from": self.gov})
+        if self.retired:
+            self.unwound = True
+        elif self.strategy.collateralAmount() > 0:
+            assert self.strategy.currentCRate() <= (
+                self.strategy.targetCollatRate() + self.strategy.collatRateBandUp()
+            )
+
+    def rule_tend(self):
+        if self.retired:
+            return
+        self.ops["tend"] += 1
+        self.strategy.tend({"from": self.gov})
+
+    def rule_set_target(self, st_target):
+        self.ops["set_target"] += 1
+        self.lossless = False
+        self.strategy.setTargetCollateralRate(st_target, {"from": self.gov})
+
+    def rule_revoke(self):
+        if self.retired:
+            return
+        self.ops["revoke"] += 1
+        self.retired = True
+        self.vault.revokeStrategy(self.strategy, {"from": self.gov})
+
+    def rule_emergency_exit(self):
+        if self.retired:
+            return
+        self.ops["emergency_exit"] += 1
+        self.retired = self.emergency = True
+        self.strategy.setEmergencyExit({"from": self.gov})
+
+    def rule_migrate(self):
+        if self.retired:
+            return
+        self.ops["migrate"] += 1
+        self.clones += 1
+        tx = self.factory.cloneMIMMinter(
+            self.vault,
+            self.strategist,
+            self.rewards,
+            self.keeper,
+            self.destination_vault,
+            self.protocol.cauldron,
+            75_000,
+            60_000,
+            self.collateral_adapter,
+            f"StatefulClone{self.clones}",
+            {"from": self.strategist},
+        )
+        old = self.strategy
+        self.strategy = Contract.from_abi(
+            "Strategy", tx.events["Cloned"]["clone"], old.abi
+        )
+        self.strategy.copyConfigurationFrom(old, {"from": self.gov})
+        self.vault.migrateStrategy(old, self.strategy, {"from": self.gov})
+
+        # the old strategy unwound and handed everything over
+        assert old.borrowedAmount() == 0
+        assert old.collateralAmount() == 0
+        assert self.protocol.yvcrvsteth.balanceOf(old) == 0
+
+    # markets
+
+    def rule_gain(self, st_gain):
+        self.ops["gain"] += 1
+        self.protocol.mim.transfer(
+            self.destination_vault, st_gain * WAD, {"from": self.mim_whale}
+        )
+
+    def rule_loss(self, st_loss):
+        amount = self.protocol.mim.balanceOf(self.destination_vault) * st_loss // 1_000
+        if amount == 0:
+            return
+        self.ops["loss"] += 1
+        self.lossless = False
+        self.protocol.mim.burn(self.destination_vault, amount, {"from": self.gov})
+
+    def rule_exchange_rate(self, st_move):
+        rate = self.protocol.cauldron.exchangeRate() * (100 + st_move) // 100
+        rate = max(
+            self.initial_rate * MAX_RATE_DOWN // 100,
+            min(rate, self.initial_rate * MAX_RATE_UP // 100),
+        )
+        self.ops["exchange_rate"] += 1
+        self.lossless = False
+        self.protocol.cauldron.setExchangeRate(rate, {"from": self.gov})
+        # the router follows the oracle, or the slippage checks would revert every swap
+        self.protocol.router.setRate(
+            self.protocol.weth, self.protocol.dai, 10 ** 36 // rate, {"from": self.gov}
+        )
+        self.protocol.router.setRate(
+            self.protocol.dai, self.protocol.weth, rate, {"from": self.gov}
+        )
+
+    def rule_interest(self, st_apr):
+        self.ops["interest"] += 1
+        self.lossless = self.lossless and st_apr == 0
+        self.protocol.cauldron.setInterestPerSecond(
+            st_apr * WAD // 10_000 // YEAR, {"from": self.gov}
+        )
+
+    def rule_sleep(self, st_seconds):
+        self.ops["sleep"] += 1
+        chain.sleep(st_seconds)
+        self.protocol.cauldron.accrue({"from": self.gov})
+
+    # invariants
+
+    def invariant_estimated_total_assets(self):
+        # rebuilt from the balances of every contract the position lives in
+        strategy, protocol = self.strategy, self.protocol
+        rate = protocol.cauldron.exchangeRate()
+        collateral = simulation.collateral_amount(
+            rate,
+            protocol.cauldron.userCollateralShare(strategy),
+            *protocol.bento_box.totals(protocol.yvcrvsteth),
+        )
+        borrowed = simulation.borrowed_amount(
+            protocol.cauldron.userBorrowPart(strategy), *protocol.cauldron.totalBorrow()
+        )
+        remaining = 0 if collateral == 0 else int(collateral) - int(borrowed)
+        investment = (
+            self.destination_vault.balanceOf(strategy)
+            * self.destination_vault.pricePerShare()
+            // 10 ** self.destination_vault.decimals()
+        )
+        total_mim = (
+            investment
+            + protocol.bento_box.balanceOf(protocol.mim, strategy)
+            + remaining
+        )
+
+        expected = protocol.yvcrvsteth.balanceOf(strategy) + int(
+            simulation.mim_to_collateral(rate, total_mim)
+        )
+        assert strategy.estimatedTotalAssets() == expected
+
+    def invariant_total_loss(self):
+        if self.lossless:
+            assert (
+                self.vault.strategies(self.strategy).dict()["totalLoss"]
+                < DUST_THRESHOLD
+            )
+
+    def invariant_unwound(self):
+        if not self.unwound:
+            return
+        assert (
+            self.vault.strategies(self.strategy).dict()["totalDebt"] <= DUST_THRESHOLD
+        )
+        if self.emergency:
+            assert self.strategy.borrowedAmount() == 0
+            assert self.strategy.collateralAmount() == 0
+
+
+def test_stateful(
+    state_machine,
+    record_property,
+    use_mocks,
+    mock_protocol,
+    funded_vault,
+    destination_vault,
+    strategy,
+    factory,
+    collateral_adapter,
+    gov,
+    strategist,
+    rewards,
+    keeper,
+    mim_whale,
+    yvcrvsteth_whale,
+):
+    if not use_mocks:
+        pytest.skip("moves the prices of the mock cauldron and router")
+
+    ops = Counter()
+    start = time.perf_counter()
+    state_machine(
+        StrategyStateMachine,
+        (gov, strategist, rewards, keeper),
+        mock_protocol,
+        funded_vault,
+        destination_vault,
+        strategy,
+        factory,
+        collateral_adapter,
+        (mim_whale, yvcrvsteth_whale),
+        ops,
+        settings={"max_examples": 20, "stateful_step_count": 20},
+    )
+    elapsed = time.perf_counter() - start
+
+    # harness throughput, tracked in the junit report
+    total = sum(ops.values())
+    record_property("stateful_operations", total)
+    record_property("stateful_ops_per_second", round(total / elapsed, 2))
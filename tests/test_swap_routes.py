@@ -0,0 +1,145 @@
+import pytest
+from brownie import reverts
+
+DAI_INDEX = 1  # underlying index of DAI in the mock MIM pool
+WAD = 10 ** 18
+
+
+@pytest.fixture(autouse=True)
+def only_mocks(use_mocks):
+    if not use_mocks:
+        pytest.skip("sets the rates of mock routers")
+
+
+@pytest.fixture
+def rates(mock_protocol):
+    """ ETH -> DAI and DAI -> ETH rates of the mock router, at the oracle price """
+    router = mock_protocol.router
+    yield router.rates(mock_protocol.weth, mock_protocol.dai), router.rates(
+        mock_protocol.dai, mock_protocol.weth
+    )
+
+
+@pytest.fixture
+def second_router(mock_protocol, rates, accounts, MockUniswapRouter):
+    """ a second mock router paying 5% more than the oracle both ways """
+    deployer = accounts[9]
+    to_dai, to_weth = rates
+    router = deployer.deploy(MockUniswapRouter, mock_protocol.weth)
+    router.setRate(
+        mock_protocol.weth, mock_protocol.dai, to_dai * 105 // 100, {"from": deployer}
+    )
+    router.setRate(
+        mock_protocol.dai, mock_protocol.weth, to_weth * 105 // 100, {"from": deployer}
+    )
+    mock_protocol.dai.mint(router, 10_000_000 * WAD, {"from": deployer})
+    deployer.transfer(router, "40 ether")
+    yield router
+
+
+def test_set_swap_routes(strategy, mock_protocol, rates, second_router, gov, user):
+    routes = [
+        (mock_protocol.router, mock_protocol.dai, DAI_INDEX),
+        (second_router, mock_protocol.dai, DAI_INDEX),
+    ]
+    with reverts():
+        strategy.setSwapRoutes(routes, {"from": user})
+    with reverts():
+        strategy.setSwapRoutes([], {"from": gov})
+
+    strategy.setSwapRoutes(routes, {"from": gov})
+    assert strategy.swapRoutesLength() == 2
+    assert strategy.swapRoutes(1) == (second_router, mock_protocol.dai, DAI_INDEX)
+    assert mock_protocol.dai.allowance(strategy, second_router) == 2 ** 256 - 1
+
+    # every route quotes both of its legs, the pool trades DAI 1:1
+    to_dai, to_weth = rates
+    assert strategy.quoteSwapRoute(0, WAD, True) == to_dai
+    assert strategy.quoteSwapRoute(1, WAD, True) == to_dai * 105 // 100
+    assert strategy.quoteSwapRoute(1, 2_000 * WAD, False) == 2_000 * (
+        to_weth * 105 // 100
+    )
+
+    # the best route prices the gas cost of the triggers
+    assert strategy.ethToWant(WAD) == strategy.mimToCollateral(to_dai * 105 // 100)
+
+
+def test_route_that_cannot_quote_is_skipped(
+    strategy, mock_protocol, rates, second_router, gov
+):
+    strategy.setSwapRoutes(
+        [
+            (second_router, mock_protocol.dai, DAI_INDEX),
+            (mock_protocol.router, mock_protocol.dai, DAI_INDEX),
+        ],
+        {"from": gov},
+    )
+    # no liquidity on the better router, its quote reverts
+    second_router.setRate(mock_protocol.weth, mock_protocol.dai, 0, {"from": gov})
+    with reverts():
+        strategy.quoteSwapRoute(0, WAD, True)
+    assert strategy.ethToWant(WAD) == strategy.mimToCollateral(rates[0])
+
+    mock_protocol.router.setRate(
+        mock_protocol.weth, mock_protocol.dai, 0, {"from": gov}
+    )
+    assert strategy.ethToWant(WAD) == 0
+
+
+def unwind_with_mim_to_sell(strategy, mim, mim_whale, destination_vault, gov):
+    # a gain leaves MIM over once the debt is repaid, sold back for collateral
+    mim.transfer(destination_vault, 10_000 * WAD, {"from": mim_whale})
+    strategy.setEmergencyExit({"from": gov})
+    return strategy.harvest({"from": gov})
+
+
+def test_best_route_sells_mim(
+    harvested_strategy,
+    mock_protocol,
+    second_router,
+    mim,
+    mim_whale,
+    destination_vault,
+    gov,
+):
+    strategy = harvested_strategy
+    strategy.setSwapRoutes(
+        [
+            (mock_protocol.router, mock_protocol.dai, DAI_INDEX),
+            (second_router, mock_protocol.dai, DAI_INDEX),
+        ],
+        {"from": gov},
+    )
+    dai = mock_protocol.dai
+    first_dai, second_dai = dai.balanceOf(mock_protocol.router), dai.balanceOf(
+        second_router
+    )
+
+    unwind_with_mim_to_sell(strategy, mim, mim_whale, destination_vault, gov)
+
+    assert strategy.borrowedAmount() == 0
+    assert dai.balanceOf(mock_protocol.router) == first_dai
+    assert dai.balanceOf(second_router) > second_dai
+
+
+def test_sale_below_oracle_reverts(
+    harvested_strategy, mock_protocol, rates, mim, mim_whale, destination_vault, gov
+):
+    strategy = harvested_strategy
+    # the only route pays 5% less than the oracle, beyond the 1% slippage
+    mock_protocol.router.setRate(
+        mock_protocol.dai, mock_protocol.weth, rates[1] * 95 // 100, {"from": gov}
+    )
+    with reverts("!slippage"):
+        unwind_with_mim_to_sell(strategy, mim, mim_whale, destination_vault, gov)
+
+
+def test_sale_without_route_reverts(
+    harvested_strategy, mock_protocol, mim, mim_whale, destination_vault, gov
+):
+    strategy = harvested_strategy
+    mock_protocol.router.setRate(
+        mock_protocol.dai, mock_protocol.weth, 0, {"from": gov}
+    )
+    with reverts("!route"):
+        unwind_with_mim_to_sell(strategy, mim, mim_whale, destination_vault, gov)
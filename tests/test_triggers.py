@@ -0,0 +1,78 @@
+import pytest
+from brownie import chain
+
+
+def test_triggers(
+    funded_vault, strategy, mim, gov, keeper, mim_whale, destination_vault
+):
+    # funds still sit in the vault, nothing to rebalance
+    assert strategy.tendTrigger(0) == False
+
+    strategy.harvest({"from": gov})
+
+    # on target, nothing to tend and no profit to harvest
+    assert strategy.tendTrigger(0) == False
+    assert strategy.harvestTrigger(0) == False
+
+    # target lowered, the position is now above the band and must repay whatever the gas
+    strategy.setTargetCollateralRate(
+        strategy.targetCollatRate() - 10_000, {"from": gov}
+    )
+    assert strategy.tendTrigger(10 ** 24) == True
+
+    borrowed = strategy.borrowedAmount()
+    strategy.tend({"from": keeper})
+    assert strategy.borrowedAmount() < borrowed
+    assert strategy.tendTrigger(10 ** 24) == False
+
+    # target raised, the position is now below the band, levering up needs a cheap call
+    strategy.setTargetCollateralRate(
+        strategy.targetCollatRate() + 10_000, {"from": gov}
+    )
+    assert strategy.tendTrigger(0) == True
+    assert strategy.tendTrigger(10 ** 24) == False
+
+    strategy.tend({"from": keeper})
+    assert strategy.tendTrigger(0) == False
+
+    # produce gains
+    mim.transfer(destination_vault, 2_000 * (10 ** mim.decimals()), {"from": mim_whale})
+    chain.sleep(360 + 1)
+    chain.mine(1)
+
+    assert strategy.harvestTrigger(0) == True
+    assert strategy.harvestTrigger(10 ** 24) == False
+
+
+def test_harvest_trigger_on_loss(
+    harvested_strategy, use_mocks, mim, gov, destination_vault
+):
+    if not use_mocks:
+        pytest.skip("burns MIM of the mock token")
+    strategy = harvested_strategy
+    chain.sleep(360 + 1)
+    chain.mine(1)
+
+    # the yVault loses a tenth of its MIM, the strategy is worth less than its debt
+    mim.burn(destination_vault, mim.balanceOf(destination_vault) // 10, {"from": gov})
+
+    assert strategy.harvestTrigger(10 ** 24) == True
+
+
+def test_tend_trigger_without_mim_to_repay(
+    harvested_strategy, use_mocks, mim, gov, destination_vault
+):
+    if not use_mocks:
+        pytest.skip("burns MIM of the mock token")
+    strategy = harvested_strategy
+
+    # the yVault lost all of its MIM, a tend above the band would repay nothing
+    mim.burn(destination_vault, mim.balanceOf(destination_vault), {"from": gov})
+    strategy.setTargetCollateralRate(
+        strategy.targetCollatRate() - 10_000, {"from": gov}
+    )
+    assert strategy.tendTrigger(0) == False
+
+    # MIM held by the strategy is enough to repay
+    mim.mint(strategy, 10_000 * (10 ** mim.decimals()), {"from": gov})
+    assert strategy.tendTrigger(0) == True
@@ -0,0 +1,123 @@
+import pytest
+from brownie import config
+
+DEPOSIT = 10_000 * 10 ** 18
+
+
+@pytest.fixture
+def mim_router(
+    use_mocks,
+    pm,
+    gov,
+    rewards,
+    guardian,
+    management,
+    strategist,
+    mim,
+    mim_whale,
+    destination_vault,
+    RouterStrategy,
+):
+    """ a MIM vault routing to destination_vault, which lends half of it to a strategy """
+    if not use_mocks:
+        pytest.skip("burns MIM out of the yVault strategy")
+    package = pm(config["dependencies"][0])
+
+    vault = guardian.deploy(package.Vault)
+    vault.initialize(mim, gov, rewards, "", "", guardian, management)
+    vault.setDepositLimit(2 ** 256 - 1, {"from": gov})
+    router = strategist.deploy(RouterStrategy, vault, destination_vault, "RouterMIM")
+    vault.addStrategy(router, 10_000, 0, 2 ** 256 - 1, 0, {"from": gov})
+    mim.approve(vault, 2 ** 256 - 1, {"from": mim_whale})
+    vault.deposit(DEPOSIT, {"from": mim_whale})
+    router.harvest({"from": gov})
+
+    lender = strategist.deploy(package.TestStrategy, destination_vault)
+    destination_vault.addStrategy(lender, 5_000, 0, 2 ** 256 - 1, 0, {"from": gov})
+    lender.harvest({"from": gov})
+    assert mim.balanceOf(destination_vault) == DEPOSIT // 2
+
+    yield vault, router, lender
+
+
+def withdraw(vault, router, amount, mim, mim_whale):
+    """ MIM the router got out of its yVault for a vault withdrawal of `amount` """
+    before = mim.balanceOf(mim_whale) + mim.balanceOf(router)
+    # no loss allowed, the router must free the whole amount
+    vault.withdraw(amount, mim_whale, 0, {"from": mim_whale})
+    assert mim.balanceOf(mim_whale) + mim.balanceOf(router) >= before + amount
+    return mim.balanceOf(mim_whale) + mim.balanceOf(router) - before
+
+
+def test_preview_withdraw_from_yvault(
+    harvested_strategy, mim, mim_whale, destination_vault
+):
+    """ The planner redeems the fewest shares worth the amount, as the yVault rounds """
+    strategy = harvested_strategy
+
+    # an odd gain so the share price is not a round number
+    mim.transfer(destination_vault, 1_234_567_891_234_567_891, {"from": mim_whale})
+    # the destination vault has no strategies, all of it is idle and unlocked
+    free_funds = destination_vault.totalAssets()
+    supply = destination_vault.totalSupply()
+    balance = destination_vault.balanceOf(strategy)
+
+    assert strategy.previewWithdrawFromYVault(0) == (0, 0)
+
+    for amount in [1, 10 ** 18 + 7, balance * free_funds // supply // 3]:
+        shares, freed = strategy.previewWithdrawFromYVault(amount)
+        assert freed == shares * free_funds // supply
+        assert freed >= amount
+        # one share less would fall short
+        assert (shares - 1) * free_funds // supply < amount
+
+    # more than the strategy holds redeems every share
+    shares, freed = strategy.previewWithdrawFromYVault(10 ** 30)
+    assert shares == balance
+    assert freed == balance * free_funds // supply
+
+
+def test_withdraw_with_yvault_strategy_loss(
+    mim_router, mim, mim_whale, destination_vault, gov
+):
+    vault, router, lender = mim_router
+    router.setMaxLoss(100, {"from": gov})
+
+    # the lender lost less than maxLoss of what the withdrawal takes out of it
+    loss = mim.balanceOf(lender) // 500
+    mim.burn(lender, loss, {"from": gov})
+
+    # beyond the half the yVault holds idle, the rest is grossed up by maxLoss
+    amount = DEPOSIT * 3 // 4
+    balance = destination_vault.balanceOf(router)
+    shares, freed = router.previewWithdrawFromYVault(amount)
+    assert shares < balance
+    assert freed - loss >= amount
+
+    received = withdraw(vault, router, amount, mim, mim_whale)
+
+    # the lender reports its whole loss on the way out
+    assert destination_vault.balanceOf(router) == balance - shares
+    assert received == freed - loss
+    assert vault.strategies(router).dict()["totalLoss"] == 0
+
+
+def test_withdraw_redeems_all_at_full_max_loss(
+    mim_router, mim, mim_whale, destination_vault, gov
+):
+    vault, router, lender = mim_router
+    router.setMaxLoss(10_000, {"from": gov})
+
+    loss = mim.balanceOf(lender) // 10
+    mim.burn(lender, loss, {"from": gov})
+
+    # whatever the strategies may lose, every share is redeemed
+    amount = DEPOSIT * 3 // 4
+    balance = destination_vault.balanceOf(router)
+    shares, freed = router.previewWithdrawFromYVault(amount)
+    assert shares == balance
+
+    received = withdraw(vault, router, amount, mim, mim_whale)
+
+    assert destination_vault.balanceOf(router) == 0
+    assert received == freed - loss